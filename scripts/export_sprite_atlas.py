@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Sprite Atlas Exporter for Bennie Game
+Writes a character animation into Assets.xcassets for native playback.
+
+Frames are cut from a Ludo.ai sprite sheet with the animation pipeline's
+extract_frames() and written either as a .spriteatlas (SpriteKit:
+SKTextureAtlas) or as a folder of .imagesets (UIImage / SwiftUI frame
+sequence). A <name>_timing.dataset (NSDataAsset) holds the frame order and
+timing, so native playback matches the Lottie version and the two can be
+compared on the loading screen.
+
+Usage:
+    python scripts/export_sprite_atlas.py downloads/bennie_idle.zip
+    python scripts/export_sprite_atlas.py downloads/bennie_idle.zip --mode imageset
+    python scripts/export_sprite_atlas.py sheet.png --name bennie_idle --grid 6x7 --frame-hold 3
+"""
+
+import argparse
+import hashlib
+import json
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+from PIL import Image
+
+from import_assets_to_xcode import (
+    XCASSETS_DIR,
+    create_dataset_contents,
+    create_folder_contents,
+    create_single_scale_imageset_contents,
+    create_sprite_atlas_contents,
+)
+
+# spritesheet_processor.py lives in the Ludo animation pipeline starter kit
+PIPELINE_DIR = Path(__file__).parent.parent / "starter-kits" / "ludo-animation-pipeline"
+sys.path.insert(0, str(PIPELINE_DIR))
+
+from spritesheet_processor import detect_grid, extract_frames, extract_zip, parse_grid  # noqa: E402
+
+# Paths
+ANIMATIONS_DIR = XCASSETS_DIR / "Animations"
+
+# Export settings (same timing defaults as process.py)
+MODES = ("spriteatlas", "imageset")
+SCALES = ("1x", "2x", "3x")
+DEFAULT_FPS = 30
+DEFAULT_FRAME_HOLD = 2
+
+
+def write_contents(directory, contents):
+    """Create a catalog directory with its Contents.json."""
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(directory / "Contents.json", "w") as f:
+        json.dump(contents, f, indent=2)
+
+
+def export_animation(
+    input_path,
+    name,
+    output_dir=ANIMATIONS_DIR,
+    mode="spriteatlas",
+    fps=DEFAULT_FPS,
+    frame_hold=DEFAULT_FRAME_HOLD,
+    grid=None,
+    scale="1x",
+):
+    """
+    Export one animation as native catalog assets plus a timing manifest.
+
+    Identical frames are written once; the manifest repeats the image name
+    wherever the frame repeats.
+
+    Args:
+        input_path: Ludo.ai ZIP or sprite sheet PNG
+        name: Animation name (e.g. bennie_idle), used for every asset name
+        output_dir: Catalog folder to write into (default: Assets.xcassets/Animations)
+        mode: "spriteatlas" or "imageset"
+        fps: Playback frames per second
+        frame_hold: Playback frames each sprite frame is shown for
+        grid: (rows, columns), auto-detected if None
+        scale: Image scale in the catalog (1x = one pixel per point, like Lottie)
+
+    Returns:
+        Timing manifest dict
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode: {mode}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        if input_path.suffix.lower() == ".zip":
+            spritesheet_path = extract_zip(input_path, work_dir / "zip")
+        else:
+            spritesheet_path = input_path
+
+        if grid is None:
+            with Image.open(spritesheet_path) as img:
+                grid = detect_grid(img)
+
+        frame_paths = extract_frames(spritesheet_path, grid, work_dir / "frames")
+        if not frame_paths:
+            raise ValueError("No valid frames extracted from sprite sheet")
+
+        write_contents(output_dir, create_folder_contents())
+
+        # Replace any previous export, in either mode, so removed frames don't
+        # linger and Xcode never bundles both copies next to one timing file
+        containers = {
+            "spriteatlas": output_dir / f"{name}.spriteatlas",
+            "imageset": output_dir / name,
+        }
+        container = containers[mode]
+        for previous in containers.values():
+            # The other mode's folder only if it is an asset catalog entry
+            if previous.exists() and (previous == container or (previous / "Contents.json").exists()):
+                shutil.rmtree(previous)
+        if mode == "spriteatlas":
+            container_contents = create_sprite_atlas_contents()
+        else:
+            container_contents = create_folder_contents()
+        write_contents(container, container_contents)
+
+        image_names = {}  # PNG hash -> image name
+        frames = []
+        total_bytes = 0
+        for frame_path in frame_paths:
+            data = frame_path.read_bytes()
+            digest = hashlib.sha256(data).hexdigest()
+            if digest not in image_names:
+                image_name = f"{name}_{len(image_names):03d}"
+                imageset_dir = container / f"{image_name}.imageset"
+                write_contents(
+                    imageset_dir,
+                    create_single_scale_imageset_contents(f"{image_name}.png", scale)
+                )
+                (imageset_dir / f"{image_name}.png").write_bytes(data)
+                image_names[digest] = image_name
+                total_bytes += len(data)
+            frames.append(image_names[digest])
+
+        with Image.open(frame_paths[0]) as img:
+            width, height = img.size
+
+    frame_duration_ms = frame_hold * 1000 / fps
+    timing = {
+        "animation": name,
+        "mode": mode,
+        "container": container.name,
+        "width": width,
+        "height": height,
+        "scale": scale,
+        "fps": fps,
+        "frame_hold": frame_hold,
+        "frame_duration_ms": round(frame_duration_ms, 3),
+        "duration_ms": round(len(frames) * frame_duration_ms),
+        "loop": True,
+        "frames": frames,
+    }
+
+    # Timing manifest as a data asset next to the frames
+    dataset_dir = output_dir / f"{name}_timing.dataset"
+    write_contents(dataset_dir, create_dataset_contents(f"{name}_timing.json"))
+    with open(dataset_dir / f"{name}_timing.json", "w") as f:
+        json.dump(timing, f, indent=2)
+
+    print(f"  ✓ {container.name}: {len(frames)} frames, {len(image_names)} images, "
+          f"{total_bytes / 1024:.1f} KB")
+    print(f"  ✓ {dataset_dir.name}: {timing['duration_ms']} ms at {fps} fps")
+    return timing
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export a sprite animation as Xcode sprite atlas / imagesets"
+    )
+    parser.add_argument("input", type=Path, help="Ludo.ai ZIP or sprite sheet PNG")
+    parser.add_argument("--name", "-n", default=None,
+                        help="Animation name (default: input file name, e.g. bennie_idle)")
+    parser.add_argument("--mode", choices=MODES, default="spriteatlas",
+                        help="spriteatlas (SKTextureAtlas) or imageset folder (default: spriteatlas)")
+    parser.add_argument("--output", "-o", type=Path, default=ANIMATIONS_DIR,
+                        help="Catalog folder to write into (default: Assets.xcassets/Animations)")
+    parser.add_argument("--fps", type=int, default=DEFAULT_FPS,
+                        help=f"Frames per second (default: {DEFAULT_FPS})")
+    parser.add_argument("--frame-hold", type=int, default=DEFAULT_FRAME_HOLD,
+                        help=f"Playback frames per sprite frame (default: {DEFAULT_FRAME_HOLD})")
+    parser.add_argument("--grid", "-g", default=None,
+                        help="Grid as ROWSxCOLUMNS (auto-detected if omitted)")
+    parser.add_argument("--scale", choices=SCALES, default="1x",
+                        help="Catalog image scale (default: 1x, same size as the Lottie)")
+
+    args = parser.parse_args()
+
+    if not args.input.exists():
+        print(f"[ERROR] File not found: {args.input}")
+        return 1
+
+    name = args.name or args.input.stem.lower().replace("-", "_").replace(" ", "_")
+
+    print("=" * 60)
+    print(f"Exporting {name} ({args.mode})")
+    print("=" * 60)
+    print(f"Source: {args.input}")
+    print(f"Target: {args.output}")
+
+    try:
+        export_animation(
+            input_path=args.input,
+            name=name,
+            output_dir=args.output,
+            mode=args.mode,
+            fps=args.fps,
+            frame_hold=args.frame_hold,
+            grid=parse_grid(args.grid) if args.grid else None,
+            scale=args.scale,
+        )
+    except (ValueError, FileNotFoundError) as e:
+        print(f"[ERROR] {e}")
+        return 1
+
+    print("\n" + "=" * 60)
+    print("Export complete!")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -73,6 +73,49 @@ def create_folder_contents():
     }
 
 
+def create_single_scale_imageset_contents(filename, scale="1x"):
+    """Create Contents.json for an imageset with one image at one scale."""
+    return {
+        "images": [
+            {
+                "filename": filename,
+                "idiom": "universal",
+                "scale": scale
+            }
+        ],
+        "info": {
+            "author": "xcode",
+            "version": 1
+        }
+    }
+
+
+def create_sprite_atlas_contents():
+    """Create Contents.json for a .spriteatlas folder."""
+    return {
+        "info": {
+            "author": "xcode",
+            "version": 1
+        }
+    }
+
+
+def create_dataset_contents(filename):
+    """Create Contents.json for a .dataset (loaded with NSDataAsset)."""
+    return {
+        "data": [
+            {
+                "filename": filename,
+                "idiom": "universal"
+            }
+        ],
+        "info": {
+            "author": "xcode",
+            "version": 1
+        }
+    }
+
+
 def import_character_assets():
     """Import character assets into Assets.xcassets."""
     print("=" * 60)
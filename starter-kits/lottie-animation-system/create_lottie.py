@@ -6,14 +6,18 @@ Create Lottie JSON animations from PNG frames.
 
 Usage:
     python create_lottie.py --frames ./frames/*.png --output animation.json
+    python create_lottie.py frames --frames ./frames/*.png --output animation.lottie --format dotlottie
 """
 
 import argparse
 import base64
 import json
+import os
 import sys
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 try:
     from PIL import Image
@@ -23,6 +27,15 @@ except ImportError:
     sys.exit(1)
 
 
+# Output containers: "json" embeds images as base64, "dotlottie" writes a
+# zip with manifest.json, animations/<name>.json and images/<file> entries
+OUTPUT_FORMATS = ("json", "dotlottie")
+DOTLOTTIE_IMAGE_DIR = "images"
+
+# Threads used to read and base64-encode frames (file reads release the GIL)
+DEFAULT_ENCODE_WORKERS = min(8, os.cpu_count() or 1)
+
+
 def encode_image_base64(image_path: Path) -> str:
     """Encode image to base64 data URL."""
     with open(image_path, "rb") as f:
@@ -30,6 +43,96 @@ def encode_image_base64(image_path: Path) -> str:
     return f"data:image/png;base64,{data}"
 
 
+def image_asset(asset_id: str, image_path: Path, width: int, height: int,
+                output_format: str = "json") -> dict:
+    """Build an image asset, embedded or referencing a dotLottie image entry."""
+    if output_format == "dotlottie":
+        return {
+            "id": asset_id,
+            "w": width,
+            "h": height,
+            "e": 0,  # External file inside the container
+            "u": f"/{DOTLOTTIE_IMAGE_DIR}/",
+            "p": f"{asset_id}.png"
+        }
+    return {
+        "id": asset_id,
+        "w": width,
+        "h": height,
+        "e": 1,  # Embedded
+        "u": "",
+        "p": encode_image_base64(image_path)
+    }
+
+
+def encode_assets(
+    frame_paths: List[Path],
+    width: int,
+    height: int,
+    output_format: str = "json",
+    workers: int = DEFAULT_ENCODE_WORKERS,
+) -> List[dict]:
+    """Build image assets for a frame sequence on a thread pool.
+
+    Results keep the frame order, so the output is byte-identical to
+    encoding the frames one after another (workers=1).
+    """
+    asset_ids = [f"frame_{i:03d}" for i in range(len(frame_paths))]
+    formats = [output_format] * len(frame_paths)
+    sizes = ([width] * len(frame_paths), [height] * len(frame_paths))
+    if workers <= 1:
+        return list(map(image_asset, asset_ids, frame_paths, *sizes, formats))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(image_asset, asset_ids, frame_paths, *sizes, formats))
+
+
+def save_lottie(
+    lottie: dict,
+    output_path: Path,
+    output_format: str = "json",
+    images: Optional[Dict[str, Path]] = None,
+) -> Path:
+    """Write a Lottie animation as compact JSON or as a dotLottie container.
+
+    Args:
+        lottie: Lottie JSON dictionary
+        output_path: Output path (suffix becomes .lottie for dotlottie)
+        output_format: "json" or "dotlottie"
+        images: Asset id -> image path, copied into the container (dotlottie)
+
+    Returns:
+        Path of the written file
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {output_format}")
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if output_format == "dotlottie":
+        output_path = output_path.with_suffix(".lottie")
+        manifest = {
+            "version": "1",
+            "generator": "create_lottie.py",
+            "animations": [
+                {"id": lottie["nm"], "speed": 1, "loop": True, "autoplay": True}
+            ]
+        }
+        with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+            # PNGs are already compressed; store them as-is
+            for asset_id, image_path in (images or {}).items():
+                archive.write(image_path, f"{DOTLOTTIE_IMAGE_DIR}/{asset_id}.png",
+                              compress_type=zipfile.ZIP_STORED)
+            archive.writestr(f"animations/{lottie['nm']}.json",
+                             json.dumps(lottie, separators=(",", ":")))
+    else:
+        with open(output_path, "w") as f:
+            json.dump(lottie, f, separators=(",", ":"))
+
+    print(f"\nCreated: {output_path}")
+    print(f"Size: {output_path.stat().st_size / 1024:.1f} KB")
+    return output_path
+
+
 def get_image_dimensions(image_path: Path) -> tuple:
     """Get image width and height."""
     with Image.open(image_path) as img:
@@ -42,6 +145,8 @@ def create_lottie_from_frames(
     animation_name: str = "animation",
     fps: int = 30,
     frame_hold: int = 2,
+    output_format: str = "json",
+    workers: int = DEFAULT_ENCODE_WORKERS,
 ) -> dict:
     """Create Lottie JSON from a sequence of PNG frames.
 
@@ -51,6 +156,8 @@ def create_lottie_from_frames(
         animation_name: Name for the animation
         fps: Frames per second
         frame_hold: Lottie frames per sprite frame
+        output_format: "json" (base64-embedded frames) or "dotlottie"
+        workers: Threads used to encode frames (1 = serial)
 
     Returns:
         Lottie JSON dictionary
@@ -74,18 +181,10 @@ def create_lottie_from_frames(
     print(f"  Frame hold: {frame_hold}")
     print(f"  Duration: {total_frames / fps:.2f}s")
 
-    # Build assets array
-    assets = []
-    for i, frame_path in enumerate(frame_paths):
-        asset = {
-            "id": f"frame_{i:03d}",
-            "w": width,
-            "h": height,
-            "e": 1,  # Embedded
-            "u": "",
-            "p": encode_image_base64(frame_path)
-        }
-        assets.append(asset)
+    # Build assets array (encoded in parallel, kept in frame order)
+    assets = encode_assets(frame_paths, width, height, output_format, workers)
+    images = {asset["id"]: frame_path for asset, frame_path in zip(assets, frame_paths)}
+    for frame_path in frame_paths:
         print(f"  Embedded: {frame_path.name}")
 
     # Build layers array
@@ -131,12 +230,7 @@ def create_lottie_from_frames(
     }
 
     # Write output
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, "w") as f:
-        json.dump(lottie, f, separators=(",", ":"))
-
-    print(f"\nCreated: {output_path}")
-    print(f"Size: {output_path.stat().st_size / 1024:.1f} KB")
+    save_lottie(lottie, output_path, output_format, images)
 
     return lottie
 
@@ -148,6 +242,7 @@ def create_breathing_animation(
     fps: int = 30,
     duration: float = 3.0,
     scale_amount: float = 3.0,
+    output_format: str = "json",
 ) -> dict:
     """Create a breathing/pulsing animation from a single image.
 
@@ -158,6 +253,7 @@ def create_breathing_animation(
         fps: Frames per second
         duration: Animation duration in seconds
         scale_amount: Percentage to scale (e.g., 3.0 = 3%)
+        output_format: "json" (base64-embedded image) or "dotlottie"
 
     Returns:
         Lottie JSON dictionary
@@ -172,14 +268,8 @@ def create_breathing_animation(
     print(f"  Duration: {duration}s")
 
     # Build asset
-    asset = {
-        "id": "character_img",
-        "w": width,
-        "h": height,
-        "e": 1,
-        "u": "",
-        "p": encode_image_base64(image_path)
-    }
+    asset = image_asset("character_img", image_path, width, height, output_format)
+    images = {"character_img": image_path}
 
     # Build layer with scale animation
     layer = {
@@ -238,12 +328,7 @@ def create_breathing_animation(
     }
 
     # Write output
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, "w") as f:
-        json.dump(lottie, f, separators=(",", ":"))
-
-    print(f"\nCreated: {output_path}")
-    print(f"Size: {output_path.stat().st_size / 1024:.1f} KB")
+    save_lottie(lottie, output_path, output_format, images)
 
     return lottie
 
@@ -261,6 +346,10 @@ def main():
     frames_parser.add_argument("--fps", type=int, default=30, help="Frames per second")
     frames_parser.add_argument("--frame-hold", type=int, default=2,
                                help="Lottie frames per sprite frame")
+    frames_parser.add_argument("--format", choices=OUTPUT_FORMATS, default="json",
+                               help="Output container: json or dotlottie (.lottie)")
+    frames_parser.add_argument("--threads", type=int, default=DEFAULT_ENCODE_WORKERS,
+                               help=f"Frame encoding threads (default: {DEFAULT_ENCODE_WORKERS})")
 
     # Breathing command
     breath_parser = subparsers.add_parser("breathing", help="Create breathing animation")
@@ -272,6 +361,8 @@ def main():
                                help="Duration in seconds")
     breath_parser.add_argument("--scale", type=float, default=3.0,
                                help="Scale percentage")
+    breath_parser.add_argument("--format", choices=OUTPUT_FORMATS, default="json",
+                               help="Output container: json or dotlottie (.lottie)")
 
     args = parser.parse_args()
 
@@ -288,6 +379,8 @@ def main():
                 animation_name=args.name,
                 fps=args.fps,
                 frame_hold=args.frame_hold,
+                output_format=args.format,
+                workers=args.threads,
             )
 
         elif args.command == "breathing":
@@ -298,6 +391,7 @@ def main():
                 fps=args.fps,
                 duration=args.duration,
                 scale_amount=args.scale,
+                output_format=args.format,
             )
 
         return 0
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Grid Detection Benchmark
+========================
+
+Compares the original per-pixel alpha scan against the NumPy projection
+profile engine in spritesheet_processor.py on synthetic Ludo-style sheets.
+
+Each synthetic sheet is a 6x7 grid (42 frames, the Ludo.ai default) of
+soft-edged sprites separated by transparent gutters. Both paths must agree
+on (rows, cols) for every size; timings are printed as a table.
+
+Usage:
+    python benchmark_grid_detection.py                  # 1K/2K/4K/8K sheets
+    python benchmark_grid_detection.py --sizes 1024 2048
+    python benchmark_grid_detection.py --legacy-max 4096  # skip slow legacy runs above 4K
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+from typing import List, Tuple
+
+from PIL import Image, ImageDraw
+
+from spritesheet_processor import (
+    _detect_grid_by_alpha,
+    _estimate_dimension,
+    _fallback_grid_detection,
+    _group_consecutive,
+)
+
+DEFAULT_SIZES = [1024, 2048, 4096, 8192]
+GRID = (6, 7)
+
+
+# =============================================================================
+# LEGACY IMPLEMENTATION (reference for comparison)
+# =============================================================================
+
+def legacy_detect_grid_by_alpha(
+    spritesheet: Image.Image,
+    gap_threshold: float = 0.015,
+    edge_margin: int = 1
+) -> Tuple[int, int]:
+    """Original pure-Python alpha scan, kept verbatim for benchmarking."""
+    width, height = spritesheet.size
+    alpha = spritesheet.getchannel('A')
+    alpha_pixels = alpha.load()
+
+    col_sums = [0] * width
+    row_sums = [0] * height
+
+    for y in range(height):
+        row_sum = 0
+        for x in range(width):
+            val = alpha_pixels[x, y]
+            row_sum += val
+            col_sums[x] += val
+        row_sums[y] = row_sum
+
+    col_threshold = height * 255 * gap_threshold
+    row_threshold = width * 255 * gap_threshold
+
+    gap_cols = [x for x, total in enumerate(col_sums) if total < col_threshold]
+    gap_rows = [y for y, total in enumerate(row_sums) if total < row_threshold]
+
+    col_groups = _group_consecutive(gap_cols)
+    row_groups = _group_consecutive(gap_rows)
+
+    col_groups = [
+        g for g in col_groups
+        if g[0] > edge_margin and g[-1] < width - 1 - edge_margin
+    ]
+    row_groups = [
+        g for g in row_groups
+        if g[0] > edge_margin and g[-1] < height - 1 - edge_margin
+    ]
+
+    cols = len(col_groups) + 1 if col_groups else _estimate_dimension(width)
+    rows = len(row_groups) + 1 if row_groups else _estimate_dimension(height)
+
+    frame_width = width // cols
+    frame_height = height // rows
+
+    if frame_width < 16 or frame_height < 16:
+        return _fallback_grid_detection(width, height)
+
+    if frame_width > width // 2 or frame_height > height // 2:
+        return _fallback_grid_detection(width, height)
+
+    return (rows, cols)
+
+
+# =============================================================================
+# SYNTHETIC SHEETS
+# =============================================================================
+
+def make_synthetic_sheet(size: int, grid: Tuple[int, int] = GRID) -> Image.Image:
+    """Build a square RGBA sheet with one ellipse sprite per cell."""
+    rows, cols = grid
+    sheet = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(sheet)
+
+    cell_w = size // cols
+    cell_h = size // rows
+    inset_x = max(4, cell_w // 10)
+    inset_y = max(4, cell_h // 10)
+
+    for row in range(rows):
+        for col in range(cols):
+            left = col * cell_w + inset_x
+            top = row * cell_h + inset_y
+            # Vary sprite shape per frame so cells are not identical
+            sway = (row * cols + col) % 5
+            box = (left + sway, top, left + cell_w - 2 * inset_x, top + cell_h - 2 * inset_y)
+            draw.ellipse(box, fill=(139, 90, 43, 255))
+
+    return sheet
+
+
+def _timed(fn, sheet: Image.Image) -> Tuple[Tuple[int, int], float]:
+    """Run a detector with its log output suppressed; return (result, seconds)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = fn(sheet)
+        elapsed = time.perf_counter() - start
+    return result, elapsed
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+def run_benchmark(sizes: List[int], legacy_max: int) -> int:
+    """Benchmark both detectors; returns exit code (1 if results disagree)."""
+    print("=" * 60)
+    print("GRID DETECTION BENCHMARK")
+    print("=" * 60)
+    print(f"{'Sheet':>10} {'Legacy':>12} {'NumPy':>12} {'Speedup':>10}  Result")
+    print("-" * 60)
+
+    mismatches = 0
+    for size in sizes:
+        sheet = make_synthetic_sheet(size)
+
+        new_result, new_time = _timed(_detect_grid_by_alpha, sheet)
+
+        if size <= legacy_max:
+            old_result, old_time = _timed(legacy_detect_grid_by_alpha, sheet)
+            speedup = f"{old_time / new_time:.0f}x" if new_time > 0 else "-"
+            legacy_col = f"{old_time:.3f}s"
+            if old_result != new_result:
+                mismatches += 1
+                verdict = f"MISMATCH {old_result} != {new_result}"
+            else:
+                verdict = f"{new_result[0]}x{new_result[1]}"
+        else:
+            legacy_col = "skipped"
+            speedup = "-"
+            verdict = f"{new_result[0]}x{new_result[1]}"
+
+        print(f"{size:>5}x{size:<4} {legacy_col:>12} {new_time:>11.3f}s {speedup:>10}  {verdict}")
+
+    print("-" * 60)
+    if mismatches:
+        print(f"[ERROR] {mismatches} size(s) produced different grids")
+        return 1
+
+    print("[OK] Legacy and NumPy detectors agree on all compared sizes")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark legacy vs NumPy sprite sheet grid detection'
+    )
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='Square sheet sizes in pixels (default: 1024 2048 4096 8192)')
+    parser.add_argument('--legacy-max', type=int, default=max(DEFAULT_SIZES),
+                        help='Largest size to run the slow legacy scan on (default: all)')
+
+    args = parser.parse_args()
+    return run_benchmark(args.sizes, args.legacy_max)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
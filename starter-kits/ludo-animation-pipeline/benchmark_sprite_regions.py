@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Sprite Region Benchmark
+=======================
+
+Regression check for find_sprite_regions() in spritesheet_processor.py on
+noisy packed sheets.
+
+Each synthetic sheet holds 8 sprites of different sizes (one with detached
+sparkles that must stay attached) on a transparent background sprinkled
+with thousands of faint (alpha 3) and tiny opaque specks, like exports
+from lossy editors. Every sheet must yield exactly 8 sprites; time and
+traced peak memory are printed as a table.
+
+Usage:
+    python benchmark_sprite_regions.py                   # 1K/2K/4K sheets
+    python benchmark_sprite_regions.py --sizes 2048 --specks 12000
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+import tracemalloc
+from typing import List, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from spritesheet_processor import find_sprite_regions
+
+DEFAULT_SIZES = [1024, 2048, 4096]
+DEFAULT_SPECKS = 12000
+SPRITES = 8
+
+
+# =============================================================================
+# SYNTHETIC SHEETS
+# =============================================================================
+
+def make_noisy_sheet(size: int, specks: int, seed: int = 0) -> Image.Image:
+    """Build a square RGBA sheet with SPRITES packed sprites plus speck noise."""
+    rng = np.random.default_rng(seed)
+    sheet = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(sheet)
+
+    # Two rows of four sprites with varying sizes and generous spacing
+    slot = size // 4
+    for index in range(SPRITES):
+        row, col = divmod(index, 4)
+        scale = 0.45 + 0.08 * (index % 4)
+        width, height = int(slot * scale), int(slot * scale * 1.3)
+        left = col * slot + (slot - width) // 2
+        top = row * (size // 2) + (size // 2 - height) // 2
+        draw.ellipse((left, top, left + width, top + height), fill=(139, 90, 43, 255))
+        if index == 0:
+            # Detached sparkles just beside the sprite
+            for offset in range(3):
+                x = left + width + 4 + offset * 6
+                draw.rectangle((x, top + 10, x + 3, top + 13), fill=(255, 240, 120, 255))
+
+    pixels = np.array(sheet)
+    ys = rng.integers(0, size, specks)
+    xs = rng.integers(0, size, specks)
+    empty = pixels[ys, xs, 3] == 0
+    faint = rng.random(specks) < 0.9
+    pixels[ys[empty & faint], xs[empty & faint], 3] = 3
+    pixels[ys[empty & ~faint], xs[empty & ~faint]] = (20, 20, 20, 255)
+    return Image.fromarray(pixels, 'RGBA')
+
+
+def _measured(sheet: Image.Image) -> Tuple[int, float, int]:
+    """Run find_sprite_regions() quietly; return (sprites, seconds, peak bytes)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        tracemalloc.start()
+        start = time.perf_counter()
+        regions = find_sprite_regions(sheet)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return len(regions), elapsed, peak
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+def run_benchmark(sizes: List[int], specks: int) -> int:
+    """Check and time every size; returns exit code (1 if any count is wrong)."""
+    print("=" * 60)
+    print("SPRITE REGION BENCHMARK")
+    print("=" * 60)
+    print(f"{'Sheet':>10} {'Specks':>8} {'Time':>10} {'Peak':>10}  Result")
+    print("-" * 60)
+
+    failures = 0
+    for size in sizes:
+        sheet = make_noisy_sheet(size, specks)
+        found, elapsed, peak = _measured(sheet)
+
+        if found != SPRITES:
+            failures += 1
+            verdict = f"WRONG {found} sprites (expected {SPRITES})"
+        else:
+            verdict = f"{found} sprites"
+
+        print(f"{size:>5}x{size:<4} {specks:>8} {elapsed:>9.3f}s {peak / 2**20:>8.1f}MB  {verdict}")
+
+    print("-" * 60)
+    if failures:
+        print(f"[ERROR] {failures} size(s) found the wrong number of sprites")
+        return 1
+
+    print(f"[OK] All sheets yield {SPRITES} sprites")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Check and time sprite region detection on noisy packed sheets'
+    )
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='Square sheet sizes in pixels (default: 1024 2048 4096)')
+    parser.add_argument('--specks', type=int, default=DEFAULT_SPECKS,
+                        help=f'Noise specks per sheet (default: {DEFAULT_SPECKS})')
+
+    args = parser.parse_args()
+    return run_benchmark(args.sizes, args.specks)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -28,7 +28,6 @@ Dependencies:
 """
 
 import sys
-import json
 import argparse
 from datetime import datetime
 from pathlib import Path
@@ -51,6 +50,7 @@ try:
         get_discovery_script,
     )
     from process import process_zip, show_detailed_status, load_status, save_status
+    from state_store import StateStore
 except ImportError as e:
     print(f"[ERROR] Import failed: {e}", file=sys.stderr)
     print("[INFO] Ensure all modules are in starter-kits/ludo-animation-pipeline/", file=sys.stderr)
@@ -77,7 +77,6 @@ PIPELINE_CONFIG = {
     "keyframes_dir": Path(__file__).parent / "keyframes",
     "downloads_dir": Path(__file__).parent / "downloads",
     "output_dir": Path(__file__).parent / "output",
-    "state_file": Path(__file__).parent / "pipeline_state.json",
 }
 
 
@@ -124,39 +123,25 @@ class PipelineJob:
 # STATE MANAGEMENT
 # =============================================================================
 
+# Jobs live in the shared SQLite store (state_store.py), one row per
+# character/emotion; `state_store.py export` writes pipeline_state.json.
+
 def load_pipeline_state() -> Dict[str, Any]:
-    """Load pipeline state from file."""
-    state_file = PIPELINE_CONFIG["state_file"]
-    if state_file.exists():
-        try:
-            with open(state_file) as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return {"jobs": [], "last_run": None}
-    return {"jobs": [], "last_run": None}
+    """Load pipeline state (jobs and last run) from the state store."""
+    with StateStore() as store:
+        return store.load_pipeline_state()
 
 
 def save_pipeline_state(state: Dict[str, Any]) -> None:
-    """Save pipeline state to file."""
-    state["last_run"] = datetime.now().isoformat()
-    with open(PIPELINE_CONFIG["state_file"], "w") as f:
-        json.dump(state, f, indent=2, default=str)
+    """Upsert every job of a pipeline state dict into the state store."""
+    with StateStore() as store:
+        store.save_pipeline_state(state)
 
 
 def add_job_to_state(job: PipelineJob) -> None:
-    """Add or update job in state file."""
-    state = load_pipeline_state()
-    jobs = state.get("jobs", [])
-
-    # Remove existing job with same character/emotion
-    jobs = [j for j in jobs if not (
-        j.get("character") == job.character and
-        j.get("emotion") == job.emotion
-    )]
-
-    jobs.append(job.to_dict())
-    state["jobs"] = jobs
-    save_pipeline_state(state)
+    """Add or update job in the state store (one atomic row upsert)."""
+    with StateStore() as store:
+        store.save_job(job.to_dict())
 
 
 # =============================================================================
@@ -306,15 +291,15 @@ def continue_pipeline(character: str, emotion: str, zip_path: Path) -> PipelineJ
     )
 
     # Load existing keyframe info if available
-    state = load_pipeline_state()
-    for j in state.get("jobs", []):
-        if j.get("character") == character and j.get("emotion") == emotion:
-            if j.get("keyframe_start"):
-                job.keyframe_start = Path(j["keyframe_start"])
-            if j.get("keyframe_end"):
-                job.keyframe_end = Path(j["keyframe_end"])
-            if j.get("motion_hint"):
-                job.motion_hint = j["motion_hint"]
+    with StateStore() as store:
+        j = store.get_job(character, emotion)
+    if j:
+        if j.get("keyframe_start"):
+            job.keyframe_start = Path(j["keyframe_start"])
+        if j.get("keyframe_end"):
+            job.keyframe_end = Path(j["keyframe_end"])
+        if j.get("motion_hint"):
+            job.motion_hint = j["motion_hint"]
 
     # Phase 3: Process download
     job = phase_process_download(job, zip_path)
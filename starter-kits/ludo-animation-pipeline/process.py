@@ -6,28 +6,42 @@ Ludo.ai Animation Processor
 A quick-start script that simplifies the Ludo.ai sprite sheet to Lottie workflow.
 
 Features:
-- Auto-detects new ZIPs in downloads folder
+- Auto-detects new ZIPs in downloads folder (once, or continuously with --watch)
 - Processes them to Lottie JSON
 - Copies to BennieGame/Resources/Lottie/
 - Tracks animation status
 
 Usage:
     python process.py           # Process all new ZIPs
+    python process.py --watch   # Process new ZIPs as they are downloaded
     python process.py --status  # Just show status
     python process.py --help    # Show help
 """
 
 import argparse
+import contextlib
+import io
 import json
 import os
 import shutil
+import signal
 import sys
+import threading
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Deque, Dict, List, Optional, Tuple
 
 # Import from same directory (spritesheet_processor.py is alongside process.py)
-from spritesheet_processor import process_ludo_asset, detect_grid, extract_zip
+from spritesheet_processor import (
+    LottieOptions, process_ludo_asset, detect_grid, extract_zip, merge_lottie_animations,
+    add_output_arguments, capture_progress, emit_progress, log_level, output_mode,
+    progress_context, progress_stage, relay_progress, set_encode_workers, DEFAULT_ENCODE_WORKERS
+)
+from state_store import StateStore
 
 # =============================================================================
 # CONFIGURATION
@@ -37,7 +51,6 @@ from spritesheet_processor import process_ludo_asset, detect_grid, extract_zip
 SCRIPT_DIR = Path(__file__).parent.resolve()
 DOWNLOADS_DIR = SCRIPT_DIR / "downloads"
 OUTPUT_DIR = SCRIPT_DIR / "output"
-STATUS_FILE = SCRIPT_DIR / "animation_status.json"
 
 # Target directory for final Lottie files
 LOTTIE_TARGET = SCRIPT_DIR.parent.parent / "BennieGame" / "Resources" / "Lottie"
@@ -70,6 +83,11 @@ DEFAULT_FRAME_HOLD = 2
 # Animation specs file for per-animation timing
 ANIMATION_SPECS_FILE = SCRIPT_DIR / "config" / "animation_specs.json"
 
+# Watch mode defaults
+DEFAULT_WATCH_JOBS = 2
+DEFAULT_WATCH_INTERVAL = 2.0  # seconds between folder scans
+DEFAULT_WATCH_SETTLE = 3.0    # seconds a ZIP's size must stay unchanged
+
 
 # =============================================================================
 # ANIMATION TIMING
@@ -98,17 +116,22 @@ def calculate_frame_hold(target_ms: int, frame_count: int, fps: int) -> int:
     return max(1, round(target_seconds * fps / frame_count))
 
 
-def get_animation_frame_hold(character: str, animation: str, frame_count: int = 42) -> int:
-    """Get optimal frame_hold for a specific animation from specs."""
+def get_animation_target_ms(character: str, animation: str) -> int:
+    """Get target_duration_ms for a specific animation from specs."""
     specs = load_animation_specs()
-    defaults = specs.get("defaults", {})
-    fps = defaults.get("fps", DEFAULT_FPS)
-    default_duration = defaults.get("target_duration_ms", 1400)
+    default_duration = specs.get("defaults", {}).get("target_duration_ms", 1400)
 
     # Look up character-specific timing
     char_specs = specs.get("characters", {}).get(character.lower(), {})
     anim_spec = char_specs.get(animation.lower(), {})
-    target_ms = anim_spec.get("target_duration_ms", default_duration)
+    return anim_spec.get("target_duration_ms", default_duration)
+
+
+def get_animation_frame_hold(character: str, animation: str, frame_count: int = 42) -> int:
+    """Get optimal frame_hold for a specific animation from specs."""
+    specs = load_animation_specs()
+    fps = specs.get("defaults", {}).get("fps", DEFAULT_FPS)
+    target_ms = get_animation_target_ms(character, animation)
 
     return calculate_frame_hold(target_ms, frame_count, fps)
 
@@ -172,27 +195,26 @@ def qa_gate(lottie_path: Path) -> Tuple[bool, List[str]]:
 # STATUS TRACKING
 # =============================================================================
 
+# Status lives in the shared SQLite store (state_store.py); the dicts below
+# keep the animation_status.json shape, which export_status() writes back
+# at the end of every run (the JSON is tracked in git, the database is not).
+
 def load_status() -> Dict:
-    """Load animation status from JSON file."""
-    if STATUS_FILE.exists():
-        with open(STATUS_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            # Ensure processed key exists (might be legacy format)
-            if "processed" not in data:
-                data["processed"] = {}
-            return data
-    return {
-        "processed": {},
-        "animations": {},
-        "last_updated": None,
-    }
+    """Load animation status (processed ZIPs and animations) from the state store."""
+    with StateStore() as store:
+        return store.load_status()
 
 
 def save_status(status: Dict) -> None:
-    """Save animation status to JSON file."""
-    status["last_updated"] = datetime.now().isoformat()
-    with open(STATUS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(status, f, indent=2)
+    """Upsert every entry of a status dict into the state store."""
+    with StateStore() as store:
+        store.save_status(status)
+
+
+def export_status() -> None:
+    """Write animation_status.json from the state store (atomically)."""
+    with StateStore() as store:
+        store.export_json(pipeline_file=None)
 
 
 def update_animation_status(status: Dict, char: str, anim: str, lottie_file: str, frame_count: int = 0) -> None:
@@ -261,6 +283,7 @@ def process_zip(
     fps: int = DEFAULT_FPS,
     frame_hold: int = DEFAULT_FRAME_HOLD,
     grid: Optional[Tuple[int, int]] = None,
+    lottie_options: Optional[LottieOptions] = None,
 ) -> Optional[Path]:
     """
     Process a single ZIP file to Lottie JSON.
@@ -270,6 +293,7 @@ def process_zip(
         fps: Frames per second
         frame_hold: Frames to hold each sprite
         grid: Optional grid dimensions (rows, cols)
+        lottie_options: Optional LottieOptions (e.g. decimation)
 
     Returns:
         Path to the created Lottie file, or None if failed
@@ -290,6 +314,8 @@ def process_zip(
             frame_hold=frame_hold,
             grid=grid,
             keep_frames=False,
+            in_memory=True,
+            lottie_options=lottie_options,
         )
         return result
     except Exception as e:
@@ -322,17 +348,153 @@ def copy_to_lottie_folder(lottie_path: Path) -> bool:
         return False
 
 
+def process_one(
+    zip_path: Path,
+    fps: int = DEFAULT_FPS,
+    frame_hold: int = DEFAULT_FRAME_HOLD,
+    grid_tuple: Optional[Tuple[int, int]] = None,
+    decimate: bool = False,
+    job_log_level: str = "warn",
+) -> Optional[Dict]:
+    """
+    Process, QA and deploy one ZIP (see process_all for the options).
+
+    Does not touch the status file, so it can run in a worker process;
+    pass the result to record_processed.
+
+    Returns:
+        The ZIP's "processed" status entry, or None if it failed
+    """
+    job_start = time.perf_counter()
+    entry = None
+
+    # Detect character/animation from filename for per-animation timing
+    char, anim = get_animation_name(zip_path.name)
+    actual_frame_hold = frame_hold
+
+    if char and anim:
+        # Use per-animation timing from specs
+        actual_frame_hold = get_animation_frame_hold(char, anim)
+        if actual_frame_hold != frame_hold:
+            print(f"      Using timing spec: frame_hold={actual_frame_hold}")
+
+    lottie_options = None
+    if decimate:
+        target_ms = get_animation_target_ms(char, anim) if char and anim else \
+            load_animation_specs().get("defaults", {}).get("target_duration_ms", 1400)
+        lottie_options = LottieOptions(decimate=True, target_duration_ms=target_ms)
+        print(f"      Decimating to target duration: {target_ms}ms")
+
+    # Process the ZIP; processor output is filtered down to job_log_level
+    with progress_context(input=zip_path.name), progress_stage("process") as stage:
+        with log_level(job_log_level):
+            result = process_zip(zip_path, fps, actual_frame_hold, grid_tuple, lottie_options)
+        if result:
+            stage["output"] = result.name
+        else:
+            stage["status"] = "error"
+
+    if result and result.exists():
+        # Get file info
+        file_size = result.stat().st_size
+
+        # Try to detect grid info for display
+        grid_info = "auto-detected"
+        if grid_tuple:
+            grid_info = f"{grid_tuple[0]}x{grid_tuple[1]}"
+
+        print(f"      Output: {result.name}")
+        print(f"      Size: {file_size:,} bytes ({file_size / 1024:.1f} KB)")
+
+        # Run QA gate
+        with progress_stage("qa", input=zip_path.name) as stage:
+            qa_passed, qa_issues = qa_gate(result)
+            stage.update(passed=qa_passed, issues=qa_issues)
+        if not qa_passed:
+            print(f"      [QA ISSUES]:")
+            for issue in qa_issues:
+                print(f"        - {issue}")
+
+        # Copy to Lottie folder
+        with progress_stage("deploy", input=zip_path.name) as stage:
+            stage["deployed"] = deployed = copy_to_lottie_folder(result)
+
+        if deployed:
+            print(f"      Copied to: BennieGame/Resources/Lottie/")
+            print("      [OK]")
+
+            entry = {
+                "character": char,
+                "animation": anim,
+                "output": result.name,
+                "processed_at": datetime.now().isoformat(),
+                "size_bytes": file_size,
+                "qa_passed": qa_passed,
+            }
+            job_status = "OK"
+        else:
+            print("      [WARN] Copy failed")
+            job_status = "COPY FAILED"
+    else:
+        print("      [FAILED]")
+        job_status = "FAILED"
+
+    emit_progress("job", input=zip_path.name, status=job_status,
+                  seconds=round(time.perf_counter() - job_start, 3))
+    return entry
+
+
+def record_processed(status: Dict, zip_name: str, entry: Dict) -> None:
+    """
+    Add a process_one result to status (processed ZIPs and animations).
+
+    The ZIP and its animation are committed to the state store right away,
+    in one transaction, so a crash or a concurrent worker loses nothing.
+    """
+    status.setdefault("processed", {})[zip_name] = entry
+    frame_count = 0
+
+    char, anim = entry["character"], entry["animation"]
+    if char and anim:
+        # Try to get frame count from the Lottie file
+        try:
+            with open(OUTPUT_DIR / entry["output"], 'r', encoding='utf-8') as f:
+                lottie_data = json.load(f)
+                frame_count = len(lottie_data.get("assets", []))
+        except Exception:
+            frame_count = 0
+        update_animation_status(status, char, anim, entry["output"], frame_count)
+
+    with StateStore() as store:
+        store.record_processed(zip_name, entry, frame_count)
+
+
 def process_all(
     fps: int = DEFAULT_FPS,
     frame_hold: int = DEFAULT_FRAME_HOLD,
     grid: Optional[str] = None,
+    decimate: bool = False,
+    job_log_level: str = "warn",
 ) -> int:
     """
     Process all new ZIP files in the downloads folder.
 
+    With decimate=True, frames that barely change are not embedded and the
+    remaining frames are held non-uniformly so each animation lasts exactly
+    its target_duration_ms from the specs (frame_hold only rounds to it).
+
+    Each ZIP emits "stage" progress events for process, qa and deploy plus a
+    closing "job" event; the run ends with a "batch" event (see
+    spritesheet_processor.output_mode).
+
+    Args:
+        job_log_level: Least severe spritesheet_processor messages to show
+                       per ZIP (default "warn": only this script's summary)
+
     Returns:
         Number of successfully processed files
     """
+    start = time.perf_counter()
     print()
     print("Ludo.ai Animation Processor")
     print("=" * 60)
@@ -345,7 +507,9 @@ def process_all(
     if not new_zips:
         print("No new ZIP files found in downloads/")
         print()
+        export_status()
         show_status()
+        emit_progress("batch", processed=0, failed=0, seconds=round(time.perf_counter() - start, 3))
         return 0
 
     print(f"Found {len(new_zips)} new ZIP file(s):")
@@ -362,8 +526,6 @@ def process_all(
 
     # Load status for updating
     status = load_status()
-    if "processed" not in status:
-        status["processed"] = {}
 
     # Process each ZIP
     print("Processing...")
@@ -371,79 +533,52 @@ def process_all(
 
     for i, zip_path in enumerate(new_zips, 1):
         print(f"\n[{i}/{len(new_zips)}] {zip_path.name}")
+        entry = process_one(zip_path, fps, frame_hold, grid_tuple, decimate, job_log_level)
+        if entry:
+            record_processed(status, zip_path.name, entry)
+            success_count += 1
 
-        # Detect character/animation from filename for per-animation timing
-        char, anim = get_animation_name(zip_path.name)
-        actual_frame_hold = frame_hold
+    emit_progress("batch", processed=success_count, failed=len(new_zips) - success_count,
+                  seconds=round(time.perf_counter() - start, 3))
 
-        if char and anim:
-            # Use per-animation timing from specs
-            actual_frame_hold = get_animation_frame_hold(char, anim)
-            if actual_frame_hold != frame_hold:
-                print(f"      Using timing spec: frame_hold={actual_frame_hold}")
+    export_status()
+    print()
+    print("=" * 60)
+    show_status()
 
-        # Process the ZIP
-        result = process_zip(zip_path, fps, actual_frame_hold, grid_tuple)
+    return success_count
 
-        if result and result.exists():
-            # Get file info
-            file_size = result.stat().st_size
 
-            # Try to detect grid info for display
-            grid_info = "auto-detected"
-            if grid_tuple:
-                grid_info = f"{grid_tuple[0]}x{grid_tuple[1]}"
+def merge_characters() -> int:
+    """
+    Merge each character's deployed animations into one Lottie per character.
 
-            print(f"      Output: {result.name}")
-            print(f"      Size: {file_size:,} bytes ({file_size / 1024:.1f} KB)")
+    States follow REQUIRED_ANIMATIONS order and become named marker segments
+    (see merge_lottie_animations); states not deployed yet are skipped.
+    Output goes to output/<character>.json.
 
-            # Run QA gate
-            qa_passed, qa_issues = qa_gate(result)
-            if not qa_passed:
-                print(f"      [QA ISSUES]:")
-                for issue in qa_issues:
-                    print(f"        - {issue}")
-
-            # Copy to Lottie folder
-            if copy_to_lottie_folder(result):
-                print(f"      Copied to: BennieGame/Resources/Lottie/")
-                print("      [OK]")
-
-                # Update status
-                status["processed"][zip_path.name] = {
-                    "character": char,
-                    "animation": anim,
-                    "output": result.name,
-                    "processed_at": datetime.now().isoformat(),
-                    "size_bytes": file_size,
-                    "qa_passed": qa_passed,
-                }
-
-                # Also update the animations section
-                if char and anim:
-                    # Try to get frame count from the Lottie file
-                    try:
-                        with open(result, 'r', encoding='utf-8') as f:
-                            lottie_data = json.load(f)
-                            frame_count = len(lottie_data.get("assets", []))
-                    except Exception:
-                        frame_count = 0
-                    update_animation_status(status, char, anim, result.name, frame_count)
-
-                success_count += 1
-            else:
-                print("      [WARN] Copy failed")
-        else:
-            print("      [FAILED]")
+    Returns:
+        Number of merged character files
+    """
+    merged = 0
+    for character, animations in REQUIRED_ANIMATIONS.items():
+        states = [
+            (anim, LOTTIE_TARGET / f"{character}_{anim}.json")
+            for anim in animations
+            if (LOTTIE_TARGET / f"{character}_{anim}.json").exists()
+        ]
+        missing = len(animations) - len(states)
 
-    # Save updated status
-    save_status(status)
+        print(f"\n{character.upper()}: merging {len(states)}/{len(animations)} animations")
+        if missing:
+            print(f"      [WARN] {missing} animation(s) not deployed yet; skipped")
+        if not states:
+            continue
 
-    print()
-    print("=" * 60)
-    show_status()
+        merge_lottie_animations(states, OUTPUT_DIR / f"{character}.json", compact=True)
+        merged += 1
 
-    return success_count
+    return merged
 
 
 def show_status() -> None:
@@ -573,6 +708,254 @@ def show_detailed_status() -> None:
         print()
 
 
+# =============================================================================
+# WATCH MODE
+# =============================================================================
+
+def _zip_signature(zip_path: Path) -> Optional[Tuple[int, int]]:
+    """(size, mtime) of a file, or None if it has disappeared."""
+    try:
+        stat = zip_path.stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def check_zip_ready(zip_path: Path) -> Optional[str]:
+    """
+    Quick integrity check of a downloaded ZIP before processing.
+
+    Reads the central directory, verifies every member's CRC and makes sure
+    there is a PNG to process.
+
+    Returns:
+        None if the ZIP is complete, otherwise the reason it is not
+    """
+    try:
+        with zipfile.ZipFile(zip_path) as zf:
+            bad_member = zf.testzip()
+            if bad_member is not None:
+                return f"CRC mismatch in {bad_member}"
+            if not any(name.lower().endswith('.png') for name in zf.namelist()):
+                return "no PNG sprite sheet in archive"
+    except (zipfile.BadZipFile, OSError) as e:
+        return str(e)
+    return None
+
+
+def _init_watch_worker(encode_workers: int) -> None:
+    """
+    Worker initializer: Ctrl+C is handled by the watcher, not the workers,
+    and frame encoding gets this worker's share of the CPUs.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Forked workers inherit the watcher's SIGTERM handler; restore the
+    # default so _abort_pool() can kill them
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    set_encode_workers(encode_workers)
+
+
+def _abort_pool(pool: ProcessPoolExecutor) -> None:
+    """Cancel queued jobs and kill the workers without waiting for them."""
+    # ProcessPoolExecutor has no public handle on its workers; _processes is
+    # a CPython implementation detail, so a runtime without it only cancels
+    processes = list((getattr(pool, "_processes", None) or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
+
+def _watch_job(zip_path: Path, options: Dict) -> Tuple[Optional[Dict], str, str]:
+    """
+    Run process_one in a worker process with its output captured.
+
+    Returns:
+        Tuple of (entry, log, events) where entry is process_one's result
+    """
+    log = io.StringIO()
+    with capture_progress() as events, \
+            contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            entry = process_one(zip_path, **options)
+        except Exception as e:
+            print(f"[ERROR] Failed to process {zip_path.name}: {e}")
+            entry = None
+    return entry, log.getvalue(), events.getvalue()
+
+
+def watch_downloads(
+    fps: int = DEFAULT_FPS,
+    frame_hold: int = DEFAULT_FRAME_HOLD,
+    grid: Optional[str] = None,
+    decimate: bool = False,
+    job_log_level: str = "warn",
+    jobs: int = DEFAULT_WATCH_JOBS,
+    interval: float = DEFAULT_WATCH_INTERVAL,
+    settle: float = DEFAULT_WATCH_SETTLE,
+) -> int:
+    """
+    Watch the downloads folder and process, QA and deploy ZIPs as they arrive.
+
+    A ZIP is picked up once its size and modification time have not changed
+    for `settle` seconds and it passes check_zip_ready; one that fails the
+    check is retried only after it changes again. At most `jobs` ZIPs are
+    processed at once, each in its own worker process with its share of the
+    encoding threads; status is saved after every job. Ctrl+C (or SIGTERM)
+    stops accepting new ZIPs and waits for running jobs; a second one kills
+    them. Queued and killed ZIPs are picked up by the next run.
+
+    Returns:
+        Number of successfully processed files
+    """
+    start = time.perf_counter()
+    DOWNLOADS_DIR.mkdir(parents=True, exist_ok=True)
+    jobs = max(1, jobs)
+    # Split the encoding threads across workers, as batch_process does
+    encode_workers = min(DEFAULT_ENCODE_WORKERS, max(1, (os.cpu_count() or 1) // jobs))
+
+    grid_tuple = None
+    if grid:
+        parts = grid.lower().split('x')
+        if len(parts) == 2:
+            grid_tuple = (int(parts[0]), int(parts[1]))
+    options = {
+        "fps": fps,
+        "frame_hold": frame_hold,
+        "grid_tuple": grid_tuple,
+        "decimate": decimate,
+        "job_log_level": job_log_level,
+    }
+
+    stop = threading.Event()
+
+    def request_stop(signum, frame):
+        if stop.is_set():
+            raise KeyboardInterrupt
+        print("\n[INFO] Stopping: finishing running jobs (press Ctrl+C again to abort)")
+        stop.set()
+
+    previous_handlers = {
+        sig: signal.signal(sig, request_stop) for sig in (signal.SIGINT, signal.SIGTERM)
+    }
+
+    print()
+    print("Ludo.ai Animation Processor - watching")
+    print("=" * 60)
+    print(f"Folder: {DOWNLOADS_DIR}")
+    print(f"Jobs: {jobs}, scan every {interval:g}s, settle {settle:g}s")
+    print("Press Ctrl+C to stop")
+    print()
+
+    status = load_status()
+    changing: Dict[str, Tuple[Tuple[int, int], float]] = {}  # name -> (signature, since)
+    rejected: Dict[str, Tuple[int, int]] = {}  # name -> signature that failed the check
+    queued: Deque[Path] = deque()
+    running: Dict[Future, Path] = {}
+    success_count = 0
+    failed_count = 0
+    aborted_count = 0
+
+    def finish(future: Future) -> None:
+        nonlocal success_count, failed_count
+        zip_path = running.pop(future)
+        try:
+            entry, log, events = future.result()
+        except Exception as e:
+            # Worker died (e.g. killed or out of memory) before returning
+            entry, log, events = None, f"[ERROR] Worker failed: {e}\n", ""
+            emit_progress("job", input=zip_path.name, status="FAILED")
+
+        print(f"\n{zip_path.name}")
+        print(log.rstrip())
+        relay_progress(events)
+
+        if entry:
+            record_processed(status, zip_path.name, entry)
+            success_count += 1
+        else:
+            # Not recorded as processed: a changed (re-downloaded) file is retried
+            rejected[zip_path.name] = _zip_signature(zip_path)
+            failed_count += 1
+
+    pool = ProcessPoolExecutor(max_workers=jobs, initializer=_init_watch_worker,
+                               initargs=(encode_workers,))
+    try:
+        while not stop.is_set():
+            busy = {path.name for path in queued} | {path.name for path in running.values()}
+            for zip_path in sorted(DOWNLOADS_DIR.glob("*.zip")):
+                name = zip_path.name
+                if name in status["processed"] or name in busy:
+                    continue
+
+                signature = _zip_signature(zip_path)
+                if signature is None or rejected.get(name) == signature:
+                    continue
+                rejected.pop(name, None)
+
+                # Wait until the download has stopped growing
+                now = time.monotonic()
+                seen = changing.get(name)
+                if seen is None or seen[0] != signature:
+                    changing[name] = (signature, now)
+                    continue
+                if now - seen[1] < settle:
+                    continue
+                del changing[name]
+
+                problem = check_zip_ready(zip_path)
+                if problem:
+                    print(f"[WARN] {name}: {problem}; waiting for it to change")
+                    emit_progress("rejected", input=name, reason=problem)
+                    rejected[name] = signature
+                    continue
+
+                print(f"[INFO] Queued: {name}")
+                queued.append(zip_path)
+
+            # Bounded concurrency: only `jobs` ZIPs are ever handed to the pool
+            while queued and len(running) < jobs:
+                zip_path = queued.popleft()
+                running[pool.submit(_watch_job, zip_path, options)] = zip_path
+
+            if running:
+                done, _ = wait(running, timeout=interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(future)
+            else:
+                stop.wait(interval)
+
+        if running:
+            print(f"[INFO] Waiting for {len(running)} running job(s)...")
+            for future in list(wait(running).done):
+                finish(future)
+    except KeyboardInterrupt:
+        # Second Ctrl+C: shutdown(wait=True) would block on the running jobs
+        aborted_count = len(running)
+        print(f"\n[WARN] Aborted: killed {aborted_count} running job(s)")
+        _abort_pool(pool)
+    finally:
+        if not aborted_count:
+            pool.shutdown(wait=True, cancel_futures=True)
+        for sig, handler in previous_handlers.items():
+            signal.signal(sig, handler)
+
+    if queued or aborted_count:
+        print(f"[INFO] {len(queued) + aborted_count} queued or aborted ZIP(s) left for the next run")
+    export_status()
+
+    emit_progress("batch", processed=success_count, failed=failed_count, aborted=aborted_count,
+                  seconds=round(time.perf_counter() - start, 3))
+
+    print()
+    print("=" * 60)
+    print(f"[DONE] Watch stopped: {success_count} processed, {failed_count} failed, "
+          f"{aborted_count} aborted")
+    print()
+    show_status()
+
+    return success_count
+
+
 # =============================================================================
 # CLI
 # =============================================================================
@@ -588,11 +971,17 @@ Examples:
   python process.py --status     # Just show status
   python process.py --fps 24     # Process with custom FPS
   python process.py --grid 6x6   # Force specific grid dimensions
+  python process.py --decimate   # Fewer embedded frames, exact spec durations
+  python process.py --merge      # One Lottie per character, a marker per state
+  python process.py --watch      # Process ZIPs as they finish downloading
+  python process.py --watch --jobs 4 --settle 5
+  python process.py --log-level info   # Also show the processor's per-ZIP output
+  python process.py --progress json    # JSON-lines events on stdout, log on stderr
 
 Workflow:
   1. Download sprite animations from ludo.ai
   2. Save ZIPs to ludo-animation-pipeline/downloads/
-  3. Run: python process.py
+  3. Run: python process.py (or keep python process.py --watch running)
   4. Lottie files are copied to BennieGame/Resources/Lottie/
         """
     )
@@ -630,19 +1019,68 @@ Workflow:
         help='Grid dimensions as ROWSxCOLUMNS (e.g., "6x6"). Auto-detected if not specified.'
     )
 
+    parser.add_argument(
+        '--decimate',
+        action='store_true',
+        help='Drop near-static frames; non-uniform holds keep target_duration_ms'
+    )
+
+    parser.add_argument(
+        '--merge',
+        action='store_true',
+        help='Merge each character\'s deployed animations into output/<character>.json'
+    )
+
     parser.add_argument(
         '--reprocess', '-r',
         action='store_true',
         help='Force reprocess all ZIPs (clear status tracking)'
     )
 
+    parser.add_argument(
+        '--watch', '-w',
+        action='store_true',
+        help='Keep running: process, QA and deploy ZIPs as they land in downloads/'
+    )
+
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=DEFAULT_WATCH_JOBS,
+        help=f'Watch mode: ZIPs processed at once (default: {DEFAULT_WATCH_JOBS})'
+    )
+
+    parser.add_argument(
+        '--interval',
+        type=float,
+        default=DEFAULT_WATCH_INTERVAL,
+        help=f'Watch mode: seconds between folder scans (default: {DEFAULT_WATCH_INTERVAL:g})'
+    )
+
+    parser.add_argument(
+        '--settle',
+        type=float,
+        default=DEFAULT_WATCH_SETTLE,
+        help=f'Watch mode: seconds a ZIP must stay unchanged before processing (default: {DEFAULT_WATCH_SETTLE:g})'
+    )
+
+    # --log-level filters the processor's per-ZIP output, like batch mode
+    add_output_arguments(parser, default_level='warn')
+
     args = parser.parse_args()
 
+    with output_mode('info', args.progress):
+        return run(args)
+
+
+def run(args: argparse.Namespace) -> int:
+    """Run the command selected by the parsed arguments."""
+
     # Clear status if reprocessing
     if args.reprocess:
-        if STATUS_FILE.exists():
-            STATUS_FILE.unlink()
-            print("[INFO] Cleared animation status - will reprocess all ZIPs")
+        with StateStore() as store:
+            store.clear_processed()
+        print("[INFO] Cleared animation status - will reprocess all ZIPs")
 
     # Handle status-only modes
     if args.detailed:
@@ -654,11 +1092,29 @@ Workflow:
         show_status()
         return 0
 
+    if args.merge:
+        return 0 if merge_characters() else 1
+
+    if args.watch:
+        watch_downloads(
+            fps=args.fps,
+            frame_hold=args.frame_hold,
+            grid=args.grid,
+            decimate=args.decimate,
+            job_log_level=args.log_level,
+            jobs=args.jobs,
+            interval=args.interval,
+            settle=args.settle,
+        )
+        return 0
+
     # Process new ZIPs
     count = process_all(
         fps=args.fps,
         frame_hold=args.frame_hold,
         grid=args.grid,
+        decimate=args.decimate,
+        job_log_level=args.log_level,
     )
 
     return 0 if count >= 0 else 1
@@ -25,8 +25,11 @@ Usage:
     # Customize FPS and frame hold
     python spritesheet_processor.py process spritesheet.png --output animation.json --fps 24 --frame-hold 3
 
+    # Process entirely in memory (no temp extraction or frame files)
+    python spritesheet_processor.py process path/to/download.zip --output animation.json --in-memory
+
 Dependencies:
-    pip install Pillow
+    pip install Pillow numpy
 
 Output:
     - Lottie JSON file with embedded base64 frames
@@ -35,12 +38,25 @@ Output:
 
 import argparse
 import base64
+import collections
+import contextlib
+import hashlib
+import io
+import itertools
 import json
 import os
+import re
+import struct
 import sys
+import time
+import tracemalloc
 import zipfile
+import zlib
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import IO, Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
 try:
     from PIL import Image
@@ -48,6 +64,224 @@ except ImportError:
     print("[ERROR] Pillow is required. Install with: pip install Pillow", file=sys.stderr)
     sys.exit(1)
 
+try:
+    import numpy as np
+except ImportError:
+    print("[ERROR] numpy is required. Install with: pip install numpy", file=sys.stderr)
+    sys.exit(1)
+
+try:
+    import resource
+except ImportError:  # Windows: no peak RSS in the bounded-memory summary
+    resource = None
+
+
+# =============================================================================
+# LOGGING & PROGRESS
+# =============================================================================
+
+# Log levels, least to most severe. Messages carry their level in a [TAG]
+# prefix; LogFilter drops the ones below the chosen level.
+LOG_LEVELS = ("debug", "info", "warn", "error")
+
+# Tag -> level. Per-frame detail is debug; untagged lines count as info and
+# indented untagged lines continue the previous message.
+LOG_TAGS = {
+    "EMBED": "debug",
+    "SHARE": "debug",
+    "SKIP": "debug",
+    "PNG": "debug",
+    "INFO": "info",
+    "OK": "info",
+    "DONE": "info",
+    "STATE": "info",
+    "PRUNED": "info",
+    "QA": "info",
+    "WARN": "warn",
+    "QA ISSUES": "warn",
+    "ERROR": "error",
+    "FAILED": "error",
+}
+
+# "text" = human log only; "json" = one JSON event per line on stdout, with
+# the human log moved to stderr
+PROGRESS_MODES = ("text", "json")
+
+_LOG_TAG_PATTERN = re.compile(r'\s*\[([A-Z ]+)\]')
+
+_progress_stream: Optional[IO[str]] = None
+_progress_fields: Dict[str, Any] = {}
+
+
+class LogFilter(io.TextIOBase):
+    """Line-buffered text stream that forwards only lines at or above a level."""
+
+    def __init__(self, stream: IO[str], level: str = "info"):
+        if level not in LOG_LEVELS:
+            raise ValueError(f"Unknown log level: {level}")
+        self.stream = stream
+        self.threshold = LOG_LEVELS.index(level)
+        self._partial = ""
+        self._previous = LOG_LEVELS.index("info")
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        lines = (self._partial + text).split('\n')
+        self._partial = lines.pop()
+        for line in lines:
+            self._write_line(line + '\n')
+        return len(text)
+
+    def flush(self) -> None:
+        if self._partial:
+            self._write_line(self._partial)
+            self._partial = ""
+        self.stream.flush()
+
+    def _write_line(self, line: str) -> None:
+        match = _LOG_TAG_PATTERN.match(line)
+        if match and match.group(1) in LOG_TAGS:
+            level = LOG_LEVELS.index(LOG_TAGS[match.group(1)])
+        elif line[:1] in (' ', '\t') and line.strip():
+            level = self._previous
+        else:
+            level = LOG_LEVELS.index("info")
+        self._previous = level
+        if level >= self.threshold:
+            self.stream.write(line)
+
+
+@contextlib.contextmanager
+def log_level(level: str, stream: Optional[IO[str]] = None) -> Iterator[None]:
+    """
+    Show only messages at or above level while the block runs.
+
+    Everything printed is routed through a LogFilter into stream (default:
+    the current stdout), so nested blocks can only make output quieter.
+    """
+    log = LogFilter(stream or sys.stdout, level)
+    try:
+        with contextlib.redirect_stdout(log):
+            yield
+    finally:
+        log.flush()
+
+
+@contextlib.contextmanager
+def output_mode(level: str = "info", progress: str = "text") -> Iterator[None]:
+    """
+    Configure a command's output: log level plus text or JSON-lines progress.
+
+    In json mode progress events are written to the real stdout and the
+    human log (still filtered by level) goes to stderr, so stdout stays
+    machine-readable.
+    """
+    global _progress_stream
+    if progress not in PROGRESS_MODES:
+        raise ValueError(f"Unknown progress mode: {progress}")
+
+    previous = _progress_stream
+    if progress == "json":
+        _progress_stream = sys.stdout
+    try:
+        with log_level(level, sys.stderr if progress == "json" else sys.stdout):
+            yield
+    finally:
+        _progress_stream = previous
+
+
+@contextlib.contextmanager
+def progress_context(**fields: Any) -> Iterator[None]:
+    """Add fields (e.g. input=zip name) to every progress event in the block."""
+    global _progress_fields
+    previous = _progress_fields
+    _progress_fields = {**previous, **fields}
+    try:
+        yield
+    finally:
+        _progress_fields = previous
+
+
+def emit_progress(event: str, **fields: Any) -> None:
+    """Write one JSON progress event (no-op unless progress mode is json)."""
+    if _progress_stream is None:
+        return
+    record = {"event": event, "time": round(time.time(), 3), **_progress_fields, **fields}
+    _progress_stream.write(json.dumps(record, default=str) + "\n")
+    _progress_stream.flush()
+
+
+@contextlib.contextmanager
+def capture_progress(enabled: bool = True) -> Iterator[io.StringIO]:
+    """
+    Collect progress events in a buffer instead of writing them.
+
+    Used in worker processes: the parent passes the buffer's text to
+    relay_progress, so events from different processes never interleave.
+    """
+    global _progress_stream
+    previous = _progress_stream
+    events = io.StringIO()
+    _progress_stream = events if enabled else None
+    try:
+        yield events
+    finally:
+        _progress_stream = previous
+
+
+def relay_progress(events: str) -> None:
+    """Write events collected by capture_progress (no-op unless json mode)."""
+    if events and _progress_stream is not None:
+        _progress_stream.write(events)
+        _progress_stream.flush()
+
+
+@contextlib.contextmanager
+def progress_stage(stage: str, **fields: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Time one pipeline stage and emit a single "stage" event when it ends.
+
+    The yielded dict can be filled with results (e.g. frames=36); they are
+    added to the event, and a "status" entry overrides the default "ok".
+    Exceptions are reported with status "error" and re-raised.
+    """
+    details = dict(fields)
+    start = time.perf_counter()
+    try:
+        yield details
+    except BaseException as e:
+        emit_progress("stage", stage=stage, status="error", error=str(e),
+                      seconds=round(time.perf_counter() - start, 3), **details)
+        raise
+    status = details.pop("status", "ok")
+    emit_progress("stage", stage=stage, status=status,
+                  seconds=round(time.perf_counter() - start, 3), **details)
+
+
+def add_output_arguments(parser: argparse.ArgumentParser, default_level: str = "info") -> None:
+    """Add the --log-level/--quiet/--progress flags shared with process.py."""
+    parser.add_argument(
+        '--log-level',
+        choices=LOG_LEVELS,
+        default=default_level,
+        help=f'Least severe messages to show (default: {default_level}; debug adds per-frame lines)'
+    )
+    parser.add_argument(
+        '--quiet', '-q',
+        dest='log_level',
+        action='store_const',
+        const='warn',
+        help='Only warnings and errors (same as --log-level warn)'
+    )
+    parser.add_argument(
+        '--progress',
+        choices=PROGRESS_MODES,
+        default='text',
+        help='json: one JSON event per stage on stdout, human log on stderr (default: text)'
+    )
+
 
 # =============================================================================
 # ZIP EXTRACTION
@@ -105,10 +339,80 @@ def extract_zip(zip_path: Path, output_dir: Path) -> Path:
         return spritesheet_path
 
 
+def read_spritesheet_from_zip(zip_path: Path) -> Image.Image:
+    """
+    Decode the sprite sheet PNG straight out of a ZIP without extracting it.
+
+    Only the sprite sheet member is read (via ZipFile.open); other members
+    such as preview GIFs are never touched. Uses the same "largest PNG wins"
+    rule as extract_zip(), based on the uncompressed size in the ZIP index.
+
+    Args:
+        zip_path: Path to the ZIP file
+
+    Returns:
+        Fully loaded PIL Image of the sprite sheet
+
+    Raises:
+        FileNotFoundError: If no PNG file is found in the ZIP
+        zipfile.BadZipFile: If the file is not a valid ZIP
+    """
+    print(f"[INFO] Reading ZIP: {zip_path}")
+
+    with zipfile.ZipFile(zip_path, 'r') as zf:
+        sheet_info = _spritesheet_member(zf, zip_path)
+
+        with zf.open(sheet_info) as fp:
+            img = Image.open(fp)
+            img.load()
+
+    print(f"[OK] Selected sprite sheet: {Path(sheet_info.filename).name}")
+    return img
+
+
+def _spritesheet_member(zf: zipfile.ZipFile, zip_path: Path) -> zipfile.ZipInfo:
+    """Pick the largest PNG in the ZIP index (the sprite sheet) and log the listing."""
+    infos = zf.infolist()
+    print(f"[INFO] Found {len(infos)} file(s) in ZIP")
+
+    png_infos = [i for i in infos if i.filename.lower().endswith('.png') and not i.is_dir()]
+    for info in png_infos:
+        print(f"  [PNG] {info.filename} ({info.file_size:,} bytes)")
+
+    if not png_infos:
+        raise FileNotFoundError(f"No PNG files found in ZIP: {zip_path}")
+
+    return max(png_infos, key=lambda i: i.file_size)
+
+
 # =============================================================================
 # GRID DETECTION
 # =============================================================================
 
+@dataclass
+class GridGap:
+    """A separator band of near-transparent rows or columns between cells."""
+    start: int
+    end: int  # Inclusive
+    confidence: float  # 0-1, how cleanly empty the band is
+
+
+@dataclass
+class GridDetection:
+    """Result of grid analysis: dimensions plus the evidence behind them."""
+    rows: int
+    cols: int
+    method: str = "alpha"
+    row_gaps: List[GridGap] = field(default_factory=list)
+    col_gaps: List[GridGap] = field(default_factory=list)
+    # Periodicity score (0-1) when an axis was measured from the cell pitch
+    confidence: Optional[float] = None
+
+    @property
+    def grid(self) -> Tuple[int, int]:
+        return (self.rows, self.cols)
+
+
 def detect_grid(spritesheet: Image.Image) -> Tuple[int, int]:
     """
     Auto-detect grid dimensions by analyzing transparency gaps between frames.
@@ -126,6 +430,20 @@ def detect_grid(spritesheet: Image.Image) -> Tuple[int, int]:
 
     Note:
         Falls back to common grid sizes (4x4, 6x6, etc.) if detection fails.
+        Use analyze_grid() to also get the detected gaps and their confidence.
+    """
+    return analyze_grid(spritesheet).grid
+
+
+def analyze_grid(spritesheet: Image.Image) -> GridDetection:
+    """
+    Auto-detect grid dimensions and report the separator gaps found.
+
+    Args:
+        spritesheet: PIL Image object of the sprite sheet
+
+    Returns:
+        GridDetection with (rows, cols), detection method and per-gap confidence
     """
     print("[INFO] Auto-detecting grid dimensions...")
 
@@ -136,9 +454,9 @@ def detect_grid(spritesheet: Image.Image) -> Tuple[int, int]:
     if spritesheet.mode != 'RGBA':
         # Try to detect grid from color uniformity instead
         print("[WARN] No alpha channel, attempting color-based detection")
-        return _detect_grid_by_color(spritesheet)
+        return _analyze_grid_by_color(spritesheet)
 
-    return _detect_grid_by_alpha(spritesheet)
+    return _analyze_grid_by_alpha(spritesheet)
 
 
 def _detect_grid_by_alpha(
@@ -151,106 +469,333 @@ def _detect_grid_by_alpha(
 
     Uses alpha sum ratios so tiny stray pixels don't break gap detection.
     """
-    width, height = spritesheet.size
-    alpha = spritesheet.getchannel('A')
-    alpha_pixels = alpha.load()
+    return _analyze_grid_by_alpha(spritesheet, gap_threshold, edge_margin).grid
+
+
+def _analyze_grid_by_alpha(
+    spritesheet: Image.Image,
+    gap_threshold: float = 0.015,
+    edge_margin: int = 1
+) -> GridDetection:
+    """
+    Array-based alpha gap detection using row/column projection profiles.
 
-    col_sums = [0] * width
-    row_sums = [0] * height
+    The alpha channel is summed along each axis in a single NumPy pass; rows
+    and columns whose total stays below gap_threshold of full opacity are
+    separator candidates. Candidates are grouped into bands exactly like
+    _group_consecutive() does, and each interior band is scored.
+    """
+    width, height = spritesheet.size
+    alpha = np.asarray(spritesheet.getchannel('A'), dtype=np.uint8)
 
-    for y in range(height):
-        row_sum = 0
-        for x in range(width):
-            val = alpha_pixels[x, y]
-            row_sum += val
-            col_sums[x] += val
-        row_sums[y] = row_sum
+    col_sums = alpha.sum(axis=0, dtype=np.int64)
+    row_sums = alpha.sum(axis=1, dtype=np.int64)
 
     col_threshold = height * 255 * gap_threshold
     row_threshold = width * 255 * gap_threshold
 
-    gap_cols = [x for x, total in enumerate(col_sums) if total < col_threshold]
-    gap_rows = [y for y, total in enumerate(row_sums) if total < row_threshold]
+    col_gaps = _find_gap_bands(col_sums, col_threshold, edge_margin)
+    row_gaps = _find_gap_bands(row_sums, row_threshold, edge_margin)
 
-    col_groups = _group_consecutive(gap_cols)
-    row_groups = _group_consecutive(gap_rows)
+    return _grid_from_gaps(
+        spritesheet.size, row_gaps, col_gaps, "alpha",
+        lambda rows, cols: _analyze_grid_by_period(spritesheet, rows=rows, cols=cols)
+    )
 
-    # Ignore padding gaps on the outer edges
-    col_groups = [
-        g for g in col_groups
-        if g[0] > edge_margin and g[-1] < width - 1 - edge_margin
-    ]
-    row_groups = [
-        g for g in row_groups
-        if g[0] > edge_margin and g[-1] < height - 1 - edge_margin
-    ]
 
-    print(f"[INFO] Found {len(col_groups)} vertical gaps, {len(row_groups)} horizontal gaps")
+def _grid_from_gaps(
+    size: Tuple[int, int],
+    row_gaps: List[GridGap],
+    col_gaps: List[GridGap],
+    method: str,
+    periodic: Callable[[bool, bool], GridDetection]
+) -> GridDetection:
+    """
+    Turn separator bands into a grid.
 
-    cols = len(col_groups) + 1 if col_groups else _estimate_dimension(width)
-    rows = len(row_groups) + 1 if row_groups else _estimate_dimension(height)
+    Axes without separators (sprites touching or overlapping cell borders)
+    are measured from the cell pitch instead (periodic(rows, cols), normally
+    _analyze_grid_by_period, scores only the axes flagged True); the old
+    size-based guesses are only used when that is not confident.
+    """
+    width, height = size
+    print(f"[INFO] Found {len(col_gaps)} vertical gaps, {len(row_gaps)} horizontal gaps")
+
+    cols = len(col_gaps) + 1 if col_gaps else None
+    rows = len(row_gaps) + 1 if row_gaps else None
+    confidence = None
+
+    if rows is None or cols is None:
+        periodic = periodic(rows is None, cols is None)
+        if periodic.confidence >= PERIOD_MIN_CONFIDENCE:
+            rows = rows or periodic.rows
+            cols = cols or periodic.cols
+            confidence = periodic.confidence
+            method = "periodic" if not (row_gaps or col_gaps) else f"{method}+periodic"
+        else:
+            print(f"[WARN] No clear cell pitch (confidence {periodic.confidence:.2f}), "
+                  f"estimating from image size")
+            rows = rows or _estimate_dimension(height)
+            cols = cols or _estimate_dimension(width)
 
     frame_width = width // cols
     frame_height = height // rows
 
     if frame_width < 16 or frame_height < 16:
         print("[WARN] Detected frames too small, using fallback detection")
-        return _fallback_grid_detection(width, height)
+        rows, cols = _fallback_grid_detection(width, height)
+        return GridDetection(rows=rows, cols=cols, method="fallback")
 
     if frame_width > width // 2 or frame_height > height // 2:
         print("[WARN] Detected frames too large, using fallback detection")
-        return _fallback_grid_detection(width, height)
+        rows, cols = _fallback_grid_detection(width, height)
+        return GridDetection(rows=rows, cols=cols, method="fallback")
 
     print(f"[OK] Detected grid: {rows} rows x {cols} columns")
     print(f"[INFO] Frame size: {frame_width}x{frame_height}")
 
-    return (rows, cols)
+    return GridDetection(
+        rows=rows,
+        cols=cols,
+        method=method,
+        row_gaps=row_gaps,
+        col_gaps=col_gaps,
+        confidence=confidence,
+    )
+
 
+# Minimum periodicity score to trust a pitch-derived grid over size guesses
+PERIOD_MIN_CONFIDENCE = 0.3
 
-def _detect_grid_by_color(spritesheet: Image.Image) -> Tuple[int, int]:
+# Sheet rows per strip when full-sheet projections need a widened temporary
+PROJECTION_STRIP_ROWS = 256
+
+
+def _analyze_grid_by_period(
+    spritesheet: Image.Image,
+    min_cell: int = 16,
+    max_harmonics: int = 4,
+    rows: bool = True,
+    cols: bool = True
+) -> GridDetection:
     """
-    Detect grid by looking for uniform color rows/columns (dividers).
+    Detect the grid from the cell pitch, for sheets with no separator gaps.
+
+    Alpha (premultiplied luminance for opaque sheets too) is projected onto
+    each axis; the normalized autocorrelation of each profile, computed
+    with an FFT, peaks at multiples of the cell pitch and dips halfway
+    between them. Every candidate cell count is scored by that contrast
+    (mean autocorrelation at the first few pitch multiples minus the mean
+    at the half-way lags), so smooth profiles, half pitches and double
+    pitches all score near zero or below.
 
-    Used when the image doesn't have transparency.
+    The projections are integer sums over the 8-bit channels (the weighted
+    product is formed one strip at a time), like analyze_grid_banded(), so
+    no full-sheet float arrays are built.
+
+    Args:
+        rows, cols: Which axes to measure; an axis already split by
+            separator gaps is left out of the score
+
+    Returns:
+        GridDetection with method="periodic" and confidence = the weaker
+        score of the measured axes (0-1)
     """
-    # Convert to RGB if needed
-    if spritesheet.mode != 'RGB':
-        spritesheet = spritesheet.convert('RGB')
+    luminance = np.asarray(spritesheet.convert('L'))
+    if spritesheet.mode == 'RGBA':
+        alpha = np.asarray(spritesheet.getchannel('A'))
+        col_weighted = np.zeros(alpha.shape[1], dtype=np.int64)
+        row_weighted = []
+        for top in range(0, alpha.shape[0], PROJECTION_STRIP_ROWS):
+            strip = slice(top, top + PROJECTION_STRIP_ROWS)
+            weighted = luminance[strip].astype(np.uint32) * alpha[strip]
+            col_weighted += weighted.sum(axis=0, dtype=np.int64)
+            row_weighted.append(weighted.sum(axis=1, dtype=np.int64))
+        row_weighted = np.concatenate(row_weighted)
+
+        col_profiles = [alpha.sum(axis=0, dtype=np.int64).astype(np.float64), col_weighted / 255.0]
+        row_profiles = [alpha.sum(axis=1, dtype=np.int64).astype(np.float64), row_weighted / 255.0]
+    else:
+        # Opaque sheet: a pseudo-alpha of pixels that differ from the
+        # background, plus raw luminance
+        mask = _background_mask(spritesheet)
+        col_profiles = [mask.sum(axis=0, dtype=np.int64) * 255.0,
+                        luminance.sum(axis=0, dtype=np.int64).astype(np.float64)]
+        row_profiles = [mask.sum(axis=1, dtype=np.int64) * 255.0,
+                        luminance.sum(axis=1, dtype=np.int64).astype(np.float64)]
+
+    return _grid_from_period_profiles(
+        spritesheet.size,
+        col_profiles if cols else None,
+        row_profiles if rows else None,
+        min_cell,
+        max_harmonics,
+    )
 
-    width, height = spritesheet.size
 
-    # Look for rows/columns with very low variance (uniform color)
-    def is_uniform(pixels: List) -> bool:
-        if not pixels:
-            return False
-        first = pixels[0]
-        return all(abs(p[0] - first[0]) < 5 and
-                   abs(p[1] - first[1]) < 5 and
-                   abs(p[2] - first[2]) < 5 for p in pixels)
+def _grid_from_period_profiles(
+    size: Tuple[int, int],
+    col_profiles: Optional[List["np.ndarray"]],
+    row_profiles: Optional[List["np.ndarray"]],
+    min_cell: int = 16,
+    max_harmonics: int = 4
+) -> GridDetection:
+    """
+    Score the column/row projection profiles of _analyze_grid_by_period().
 
-    # Sample columns
-    uniform_cols = []
-    for x in range(0, width, max(1, width // 200)):  # Sample every ~0.5%
-        col_pixels = [spritesheet.getpixel((x, y)) for y in range(0, height, max(1, height // 100))]
-        if is_uniform(col_pixels):
-            uniform_cols.append(x)
+    An axis passed as None is not measured (one cell, left out of the
+    confidence).
+    """
+    width, height = size
+    cols, rows = 1, 1
+    scores = {}
+    if col_profiles is not None:
+        cols, scores["horizontal"] = _periodic_cell_count(col_profiles, min_cell, max_harmonics)
+    if row_profiles is not None:
+        rows, scores["vertical"] = _periodic_cell_count(row_profiles, min_cell, max_harmonics)
+    confidence = round(min(scores.values()), 3)
+
+    measured = ", ".join(f"{score:.2f} {axis}" for axis, score in scores.items())
+    print(f"[INFO] Cell pitch: {width / cols:.1f}x{height / rows:.1f}px "
+          f"(periodicity {measured})")
+
+    return GridDetection(rows=rows, cols=cols, method="periodic", confidence=confidence)
+
+
+def _periodic_cell_count(
+    profiles: List["np.ndarray"],
+    min_cell: int,
+    max_harmonics: int
+) -> Tuple[int, float]:
+    """
+    Find how many cells one axis holds from its projection profiles.
 
-    # Sample rows
-    uniform_rows = []
-    for y in range(0, height, max(1, height // 200)):
-        row_pixels = [spritesheet.getpixel((x, y)) for x in range(0, width, max(1, width // 100))]
-        if is_uniform(row_pixels):
-            uniform_rows.append(y)
+    Returns:
+        Tuple of (cell count, score); (1, 0.0) when nothing is periodic
+    """
+    size = profiles[0].shape[0]
+    fft_size = 1 << (2 * size - 1).bit_length()
+
+    acfs = []
+    for profile in profiles:
+        centered = profile - profile.mean()
+        spectrum = np.fft.rfft(centered, fft_size)
+        acf = np.fft.irfft(spectrum * np.conj(spectrum), fft_size)[:size]
+        if acf[0] > 0:
+            acfs.append(acf / acf[0])
+    if not acfs:
+        return 1, 0.0
+    acf = np.mean(acfs, axis=0)
+
+    scores = {}
+    for count in range(2, size // min_cell + 1):
+        pitch = size / count
+        harmonics = min(count - 1, max_harmonics)
+        multiples = np.arange(1, harmonics + 1)
+        peaks = np.rint(pitch * multiples).astype(int)
+        troughs = np.rint(pitch * (multiples - 0.5)).astype(int)
+        scores[count] = float(acf[peaks].mean() - acf[troughs].mean())
+    if not scores:
+        return 1, 0.0
+
+    best_count = max(scores, key=scores.get)
+    best_score = scores[best_count]
+
+    # An odd multiple of the pitch also lands its half-way lags on troughs,
+    # so prefer the finest pitch that divides the winner and scores nearly
+    # as well (a true half pitch scores near zero and never qualifies)
+    for count in range(2 * best_count, size // min_cell + 1, best_count):
+        if scores[count] >= 0.7 * best_score:
+            best_count = count
+
+    return best_count, min(1.0, max(0.0, scores[best_count]))
+
+
+def _find_gap_bands(
+    profile: "np.ndarray",
+    threshold: float,
+    edge_margin: int,
+    merge_distance: int = 5
+) -> List[GridGap]:
+    """
+    Find interior separator bands in a projection profile.
 
-    col_groups = _group_consecutive(uniform_cols)
-    row_groups = _group_consecutive(uniform_rows)
+    Indices below threshold are merged into one band when they are at most
+    merge_distance apart (same rule as _group_consecutive). Bands touching
+    the outer edge are padding, not separators, and are dropped.
 
-    cols = len(col_groups) + 1 if col_groups else _estimate_dimension(width)
-    rows = len(row_groups) + 1 if row_groups else _estimate_dimension(height)
+    Confidence is the fraction of the band that is actually below threshold
+    multiplied by how far below threshold those indices sit on average.
+    """
+    size = profile.shape[0]
+    gap_indices = np.flatnonzero(profile < threshold)
+    if gap_indices.size == 0:
+        return []
 
-    return (max(1, rows), max(1, cols))
+    splits = np.flatnonzero(np.diff(gap_indices) > merge_distance) + 1
 
+    bands = []
+    for group in np.split(gap_indices, splits):
+        start, end = int(group[0]), int(group[-1])
+        if start <= edge_margin or end >= size - 1 - edge_margin:
+            continue
 
+        coverage = group.size / (end - start + 1)
+        emptiness = 1.0 - float(profile[group].mean()) / threshold if threshold > 0 else 1.0
+        bands.append(GridGap(start=start, end=end, confidence=round(coverage * emptiness, 3)))
+
+    return bands
+
+
+def _detect_grid_by_color(
+    spritesheet: Image.Image,
+    color_tolerance: float = 3.0,
+    edge_margin: int = 1
+) -> Tuple[int, int]:
+    """
+    Detect grid by looking for uniform color rows/columns (dividers).
+
+    Used when the image doesn't have transparency.
+    """
+    return _analyze_grid_by_color(spritesheet, color_tolerance, edge_margin).grid
+
+
+def _analyze_grid_by_color(
+    spritesheet: Image.Image,
+    color_tolerance: float = 3.0,
+    edge_margin: int = 1
+) -> GridDetection:
+    """
+    Array-based divider detection for sheets without transparency.
+
+    Every row and column of the full-resolution RGB sheet is scored by its
+    color standard deviation (worst channel), computed from per-axis sums
+    and sums of squares in one pass. Lines below color_tolerance are
+    uniform dividers/background and are banded like alpha gaps, so even
+    1px dividers are found at any resolution.
+    """
+    width, height = spritesheet.size
+    rgb = np.asarray(spritesheet.convert('RGB') if spritesheet.mode != 'RGB' else spritesheet)
+
+    col_std = np.zeros(width)
+    row_std = np.zeros(height)
+    for channel in range(3):
+        values = rgb[..., channel]
+        squares = values.astype(np.uint32) ** 2
+        for axis, std, count in ((0, col_std, height), (1, row_std, width)):
+            mean = values.sum(axis=axis, dtype=np.int64) / count
+            variance = squares.sum(axis=axis, dtype=np.int64) / count - mean ** 2
+            np.maximum(std, np.sqrt(np.clip(variance, 0, None)), out=std)
+
+    col_gaps = _find_gap_bands(col_std, color_tolerance, edge_margin)
+    row_gaps = _find_gap_bands(row_std, color_tolerance, edge_margin)
+
+    return _grid_from_gaps(
+        spritesheet.size, row_gaps, col_gaps, "color",
+        lambda rows, cols: _analyze_grid_by_period(spritesheet, rows=rows, cols=cols)
+    )
+
+
 def _group_consecutive(numbers: List[int], gap_threshold: int = 5) -> List[List[int]]:
     """Group consecutive numbers into ranges."""
     if not numbers:
@@ -327,22 +872,318 @@ def _fallback_grid_detection(width: int, height: int) -> Tuple[int, int]:
     return best_match
 
 
+# =============================================================================
+# PARALLEL ENCODING
+# =============================================================================
+
+# Threads used to PNG/base64-encode the frames of one sheet. Pillow releases
+# the GIL inside zlib, so frames compress concurrently on separate cores.
+DEFAULT_ENCODE_WORKERS = min(8, os.cpu_count() or 1)
+
+_encode_workers = DEFAULT_ENCODE_WORKERS
+
+
+def set_encode_workers(workers: int) -> None:
+    """
+    Set the thread count used for frame encoding (1 = serial, 0 = default).
+
+    Batch workers lower this so that N processes x M threads does not
+    oversubscribe the machine.
+    """
+    global _encode_workers
+    _encode_workers = workers if workers > 0 else DEFAULT_ENCODE_WORKERS
+
+
+def ordered_map(
+    fn: Callable[[Any], Any],
+    items: Iterable[Any],
+    workers: Optional[int] = None
+) -> Iterator[Any]:
+    """
+    Apply fn to items on a thread pool, yielding results in input order.
+
+    Items are pulled lazily and at most 2x workers results are in flight, so
+    a streaming consumer (write_lottie_stream) still holds only a handful of
+    encoded frames. Output order and bytes are the same as map(fn, items);
+    with one worker it is exactly that.
+
+    Args:
+        fn: Function applied to every item (must be thread-safe)
+        items: Input iterable, consumed from the calling thread
+        workers: Thread count (default: set_encode_workers() value)
+
+    Yields:
+        fn(item) for every item, in order
+    """
+    workers = _encode_workers if workers is None else workers
+    if workers <= 1:
+        yield from map(fn, items)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending: Deque[Future] = collections.deque()
+        for item in items:
+            pending.append(pool.submit(fn, item))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
 # =============================================================================
 # FRAME EXTRACTION
 # =============================================================================
 
+@dataclass
+class EncodedFrame:
+    """A sprite frame encoded to PNG bytes, ready to embed in a Lottie file."""
+    name: str
+    png: bytes
+    width: int
+    height: int
+    # Offset of the image inside its grid cell (non-zero only when cropped)
+    x: int = 0
+    y: int = 0
+    # Full grid cell size when the image was cropped; None = image is the cell
+    cell: Optional[Tuple[int, int]] = None
+    # SHA-256 of this image's decoded RGBA pixels and its alpha-premultiplied
+    # mean RGBA, when known from the sheet's cell statistics (see CellStats)
+    digest: Optional[str] = None
+    mean_color: Optional[Tuple[float, float, float, float]] = None
+
+    @property
+    def cell_size(self) -> Tuple[int, int]:
+        return self.cell or (self.width, self.height)
+
+    @classmethod
+    def from_image(
+        cls,
+        name: str,
+        frame: Image.Image,
+        crop: bool = False,
+        bbox: Optional[Tuple[int, int, int, int]] = None
+    ) -> "EncodedFrame":
+        """
+        Encode a PIL image to PNG bytes exactly once.
+
+        With crop=True the image is first trimmed to its alpha bounding box
+        and the trim offset is recorded so the frame can be placed back
+        exactly where it was inside the cell. A precomputed bbox (from
+        CellStats) skips re-scanning the alpha channel.
+        """
+        x, y, cell = 0, 0, None
+        if crop and frame.mode == 'RGBA':
+            if bbox is None:
+                bbox = frame.getchannel('A').getbbox()
+            if bbox and bbox != (0, 0, frame.width, frame.height):
+                x, y, cell = bbox[0], bbox[1], frame.size
+                frame = frame.crop(bbox)
+
+        buffer = io.BytesIO()
+        frame.save(buffer, 'PNG')
+        return cls(
+            name=name,
+            png=buffer.getvalue(),
+            width=frame.width,
+            height=frame.height,
+            x=x,
+            y=y,
+            cell=cell,
+        )
+
+    @classmethod
+    def from_file(cls, frame_path: Path) -> "EncodedFrame":
+        """Load an already-encoded PNG, reading the file a single time."""
+        with open(frame_path, 'rb') as f:
+            png = f.read()
+        with Image.open(io.BytesIO(png)) as img:
+            width, height = img.size
+        return cls(name=frame_path.name, png=png, width=width, height=height)
+
+
+@dataclass
+class CellStats:
+    """Per-cell statistics computed in one pass over the decoded sheet."""
+    row: int
+    col: int
+    index: int  # Grid position index (row * cols + col), used for naming
+    box: Tuple[int, int, int, int]  # Cell rectangle in the sheet (l, t, r, b)
+    coverage: float  # Fraction of pixels with alpha > 10
+    bbox: Optional[Tuple[int, int, int, int]]  # Alpha > 0 bounds, cell coords
+    digest: str  # SHA-256 of the cell's RGBA pixels
+    content_digest: str  # SHA-256 of the pixels inside bbox
+    mean_color: Tuple[float, float, float, float]  # Premultiplied mean RGBA
+    has_alpha: bool = True  # False when the sheet has no alpha channel
+
+    def is_valid(self, threshold: float = 0.001) -> bool:  # Reduced from 0.01 to preserve sparse frames
+        """
+        Check if the cell contains meaningful content (not empty/transparent).
+
+        Args:
+            threshold: Minimum percentage of non-transparent pixels (0-1)
+
+        Returns:
+            True if the cell has content, False if mostly empty
+        """
+        if not self.has_alpha:
+            # Non-transparent images are assumed valid
+            return True
+        return self.coverage > threshold
+
+    def frame_digest(self, crop: bool) -> str:
+        """Digest of the frame image as encoded (trimmed when crop=True)."""
+        if crop and self.bbox and self.bbox != (0, 0, *self.size):
+            return self.content_digest
+        return self.digest
+
+    def frame_mean_color(self, crop: bool) -> Tuple[float, float, float, float]:
+        """
+        Premultiplied mean RGBA over the frame as encoded.
+
+        Pixels outside the alpha bbox premultiply to zero, so the trimmed
+        mean is the cell mean rescaled by the area ratio.
+        """
+        if crop and self.bbox and self.bbox != (0, 0, *self.size):
+            left, top, right, bottom = self.bbox
+            scale = (self.size[0] * self.size[1]) / ((right - left) * (bottom - top))
+            return tuple(channel * scale for channel in self.mean_color)
+        return self.mean_color
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return (self.box[2] - self.box[0], self.box[3] - self.box[1])
+
+
+def compute_cell_stats(
+    spritesheet: Image.Image,
+    grid: Tuple[int, int],
+    alpha_threshold: int = 10
+) -> List[CellStats]:
+    """
+    Compute coverage, bounding box, content hash and mean color of every
+    grid cell from a single decode of the sheet.
+
+    The sheet is viewed as a (rows, cell_h, cols, cell_w, 4) array so each
+    statistic is one NumPy reduction over all cells at once; no pixel is
+    visited in Python.
+
+    Args:
+        spritesheet: Decoded sprite sheet image
+        grid: Tuple of (rows, columns)
+        alpha_threshold: Alpha above which a pixel counts toward coverage
+
+    Returns:
+        List of CellStats in grid order (left-to-right, top-to-bottom)
+    """
+    rows, cols = grid
+    width, height = spritesheet.size
+    cell_w, cell_h = width // cols, height // rows
+
+    has_alpha = spritesheet.mode == 'RGBA'
+    rgba = spritesheet if has_alpha else spritesheet.convert('RGBA')
+    pixels = np.asarray(rgba)[:rows * cell_h, :cols * cell_w]
+    cells = pixels.reshape(rows, cell_h, cols, cell_w, 4)
+    alpha = cells[..., 3]
+
+    area = cell_w * cell_h
+    coverage = (alpha > alpha_threshold).sum(axis=(1, 3)) / area
+
+    # Bounding box of alpha > 0 (same rule as Image.getbbox on the alpha band)
+    opaque = alpha > 0
+    row_any = opaque.any(axis=3)  # (rows, cell_h, cols)
+    col_any = opaque.any(axis=1)  # (rows, cols, cell_w)
+    has_content = row_any.any(axis=1)
+    tops = row_any.argmax(axis=1)
+    bottoms = cell_h - row_any[:, ::-1, :].argmax(axis=1)
+    lefts = col_any.argmax(axis=2)
+    rights = cell_w - col_any[:, :, ::-1].argmax(axis=2)
+
+    # Premultiplied channel sums; uint32 holds 255 * 255 * any cell area
+    alpha_sum = alpha.sum(axis=(1, 3), dtype=np.int64)
+    color_sums = [
+        (cells[..., channel].astype(np.uint32) * alpha).sum(axis=(1, 3), dtype=np.int64)
+        for channel in range(3)
+    ]
+
+    stats = []
+    for row in range(rows):
+        for col in range(cols):
+            cell = cells[row, :, col]
+            bbox = None
+            if has_content[row, col]:
+                bbox = (int(lefts[row, col]), int(tops[row, col]),
+                        int(rights[row, col]), int(bottoms[row, col]))
+
+            trimmed = cell[bbox[1]:bbox[3], bbox[0]:bbox[2]] if bbox else cell
+            left, top = col * cell_w, row * cell_h
+            stats.append(CellStats(
+                row=row,
+                col=col,
+                index=row * cols + col,
+                box=(left, top, left + cell_w, top + cell_h),
+                coverage=float(coverage[row, col]),
+                bbox=bbox,
+                digest=_pixel_digest(cell),
+                content_digest=_pixel_digest(trimmed),
+                mean_color=(
+                    *(float(s[row, col]) / 255.0 / area for s in color_sums),
+                    float(alpha_sum[row, col]) / area,
+                ),
+                has_alpha=has_alpha,
+            ))
+    return stats
+
+
+def _pixel_digest(pixels: "np.ndarray") -> str:
+    """SHA-256 of an RGBA pixel block, qualified by its size."""
+    height, width = pixels.shape[:2]
+    digest = hashlib.sha256(np.ascontiguousarray(pixels).tobytes()).hexdigest()
+    return f"{digest}:{width}x{height}"
+
+
+def _iter_grid_cells(
+    img: Image.Image,
+    grid: Tuple[int, int]
+) -> Iterator[CellStats]:
+    """
+    Compute cell statistics and yield them left-to-right, top-to-bottom.
+
+    Yields:
+        CellStats for every cell in the grid (crop with img.crop(cell.box))
+    """
+    width, height = img.size
+    rows, cols = grid
+
+    frame_width = width // cols
+    frame_height = height // rows
+
+    print(f"[INFO] Frame size: {frame_width}x{frame_height}")
+
+    # Validate grid divides evenly
+    if width % cols != 0 or height % rows != 0:
+        print(f"[WARN] Grid {rows}x{cols} doesn't divide {width}x{height} evenly!")
+        print(f"       Remainder: {width % cols}px horizontal, {height % rows}px vertical")
+
+    # CRITICAL: Cells carry their grid position index to maintain sequence alignment
+    yield from compute_cell_stats(img, grid)
+
+
 def extract_frames(
     spritesheet_path: Path,
     grid: Tuple[int, int],
-    output_dir: Path
+    output_dir: Path,
+    max_memory: Optional[int] = None
 ) -> List[Path]:
     """
     Extract individual frames from a sprite sheet.
 
     Args:
-        spritesheet_path: Path to the sprite sheet PNG
+        spritesheet_path: Path to the sprite sheet PNG (or Ludo.ai ZIP when
+                          max_memory is set)
         grid: Tuple of (rows, columns)
         output_dir: Directory to save extracted frames
+        max_memory: Peak-memory ceiling in bytes; decodes the sheet one band
+                    of cell rows at a time (see iter_band_cells)
 
     Returns:
         List of paths to extracted frame PNGs (in animation order: left-to-right, top-to-bottom)
@@ -352,178 +1193,1507 @@ def extract_frames(
 
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    with Image.open(spritesheet_path) as img:
-        width, height = img.size
-        rows, cols = grid
+    def save(job: Tuple[CellStats, Image.Image]) -> Path:
+        cell, frame = job
+        # Save frame using GRID POSITION index (maintains sequence)
+        return _save_frame((output_dir / f"frame_{cell.index:03d}.png", frame))
+
+    if max_memory is not None:
+        report = MemoryReport(ceiling=max_memory)
+        frames, skipped = _map_valid_cells(
+            iter_band_cells(spritesheet_path, grid, report), save
+        )
+        report.print_report()
+    else:
+        with Image.open(spritesheet_path) as img:
+            frames, skipped = _map_valid_cells(
+                ((cell, img, cell.box) for cell in _iter_grid_cells(img, grid)), save
+            )
 
-        frame_width = width // cols
-        frame_height = height // rows
+    print(f"[OK] Extracted {len(frames)} valid frames to: {output_dir}")
+    if skipped > 0:
+        print(f"[INFO] Skipped {skipped} empty frames")
+    return frames
 
-        print(f"[INFO] Frame size: {frame_width}x{frame_height}")
 
-        frames = []
-        skipped_count = 0
+def _save_frame(job: Tuple[Path, Image.Image]) -> Path:
+    """Write one cropped frame as PNG (ordered_map worker)."""
+    frame_path, frame = job
+    frame.save(frame_path, 'PNG')
+    return frame_path
 
-        # Validate grid divides evenly
-        if width % cols != 0 or height % rows != 0:
-            print(f"[WARN] Grid {rows}x{cols} doesn't divide {width}x{height} evenly!")
-            print(f"       Remainder: {width % cols}px horizontal, {height % rows}px vertical")
 
-        # Extract frames left-to-right, top-to-bottom
-        # CRITICAL: Use grid position for naming to maintain sequence alignment
-        for row in range(rows):
-            for col in range(cols):
-                # Calculate crop box
-                left = col * frame_width
-                top = row * frame_height
-                right = left + frame_width
-                bottom = top + frame_height
-
-                # Crop the frame
-                frame = img.crop((left, top, right, bottom))
-
-                # Calculate frame index from grid position (NOT running counter)
-                grid_index = row * cols + col
-
-                # Check if frame is not empty (has non-transparent pixels)
-                if _is_frame_valid(frame):
-                    # Save frame using GRID POSITION index (maintains sequence)
-                    frame_path = output_dir / f"frame_{grid_index:03d}.png"
-                    frame.save(frame_path, 'PNG')
-                    frames.append(frame_path)
-                else:
-                    skipped_count += 1
-                    print(f"  [SKIP] Empty frame at row {row}, col {col} (index {grid_index})")
+def _map_valid_cells(
+    cells: Iterable[Tuple[CellStats, Image.Image, Tuple[int, int, int, int]]],
+    fn: Callable[[Tuple[CellStats, Image.Image]], Any]
+) -> Tuple[List[Any], int]:
+    """
+    Crop every non-empty cell and run fn((cell, image)) on the thread pool.
+
+    Cropping and the [SKIP] lines for empty cells happen on the calling
+    thread, so the log keeps grid order; results keep it too.
+
+    Args:
+        cells: (cell, source image, cell rectangle in that image) in grid order
+        fn: Encoder for one cropped cell
+
+    Returns:
+        Tuple of (results in grid order, number of empty cells skipped)
+    """
+    skipped = []
 
-        print(f"[OK] Extracted {len(frames)} valid frames to: {output_dir}")
-        if skipped_count > 0:
-            print(f"[INFO] Skipped {skipped_count} empty frames")
-        return frames
+    def valid_cells() -> Iterator[Tuple[CellStats, Image.Image]]:
+        for cell, source, box in cells:
+            # Check if frame is not empty (has non-transparent pixels)
+            if cell.is_valid():
+                yield cell, source.crop(box)
+            else:
+                skipped.append(cell.index)
+                print(f"  [SKIP] Empty frame at row {cell.row}, col {cell.col} (index {cell.index})")
+
+    results = list(ordered_map(fn, valid_cells()))
+    return results, len(skipped)
 
 
-def _is_frame_valid(frame: Image.Image, threshold: float = 0.001) -> bool:  # Reduced from 0.01 to preserve sparse frames
+def encode_frames(
+    spritesheet: Image.Image,
+    grid: Tuple[int, int],
+    crop: bool = False,
+    scale: float = 1.0
+) -> List[EncodedFrame]:
     """
-    Check if a frame contains meaningful content (not empty/transparent).
+    Crop frames from an already-decoded sprite sheet and encode them in memory.
+
+    Same cell order, naming and empty-frame rules as extract_frames(), but
+    each frame is PNG-encoded once into a buffer instead of written to disk.
 
     Args:
-        frame: PIL Image frame
-        threshold: Minimum percentage of non-transparent pixels (0-1)
+        spritesheet: Decoded sprite sheet image
+        grid: Tuple of (rows, columns)
+        crop: If True, trim each frame to its alpha bounding box (see
+              EncodedFrame.from_image)
+        scale: Resample each cell by this factor before encoding; validity
+               is still decided on the full-resolution cell
 
     Returns:
-        True if the frame has content, False if mostly empty
+        List of EncodedFrame (in animation order: left-to-right, top-to-bottom)
     """
-    if frame.mode != 'RGBA':
-        # Non-transparent images are assumed valid
-        return True
+    print("[INFO] Encoding frames in memory")
+    print(f"[INFO] Grid: {grid[0]} rows x {grid[1]} columns")
+    if scale != 1.0:
+        print(f"[INFO] Scale: {scale:g}x")
+
+    frames, skipped = _map_valid_cells(
+        ((cell, spritesheet, cell.box) for cell in _iter_grid_cells(spritesheet, grid)),
+        lambda job: _encode_cell(job, crop, scale),
+    )
+
+    print(f"[OK] Encoded {len(frames)} valid frames")
+    if skipped > 0:
+        print(f"[INFO] Skipped {skipped} empty frames")
+    return frames
+
 
-    # Count non-transparent pixels
-    alpha = frame.getchannel('A')
-    pixels = list(alpha.getdata())
-    non_transparent = sum(1 for p in pixels if p > 10)
+def _encode_cell(job: Tuple[CellStats, Image.Image], crop: bool, scale: float) -> EncodedFrame:
+    """Encode one cropped grid cell (ordered_map worker for encode_frames)."""
+    cell, image = job
+    name = f"frame_{cell.index:03d}.png"
+    if scale != 1.0:
+        return EncodedFrame.from_image(name, scale_image(image, scale), crop)
 
-    ratio = non_transparent / len(pixels)
-    return ratio > threshold
+    frame = EncodedFrame.from_image(name, image, crop, cell.bbox)
+    # Pixels are unchanged by encoding, so the sheet statistics apply
+    trimmed = crop and frame.cell is not None
+    frame.digest = cell.frame_digest(trimmed)
+    frame.mean_color = cell.frame_mean_color(trimmed)
+    return frame
+
+
+def scale_image(image: Image.Image, scale: float) -> Image.Image:
+    """
+    Resample an image by a scale factor with Lanczos filtering.
+
+    RGBA images are resampled premultiplied so transparent pixels don't
+    bleed their (invisible) color into the sprite edges.
+    """
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    if image.mode == 'RGBA':
+        return image.convert('RGBa').resize(size, Image.LANCZOS).convert('RGBA')
+    return image.resize(size, Image.LANCZOS)
 
 
 # =============================================================================
-# LOTTIE GENERATION
+# BOUNDED MEMORY (band-by-band decoding)
 # =============================================================================
 
-def create_lottie(
-    frames: List[Path],
-    output_path: Path,
-    fps: int = 30,
-    frame_hold: int = 3
-) -> Path:
-    """
-    Create a Lottie JSON animation from a sequence of frame images.
+# Working bytes per sheet pixel while one band is decoded and reduced: the
+# inflated rows, the stored PNG handed to Pillow, the decoded band plus its
+# copy, and the NumPy temporaries of compute_cell_stats(). Measured at about
+# 16 B/px on RGBA sheets; the rest is headroom.
+BAND_BYTES_PER_PIXEL = 20
 
-    The animation embeds all frames as base64-encoded images, making it
-    self-contained and portable.
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
 
-    Args:
-        frames: List of paths to frame PNG images (in order)
-        output_path: Path for the output Lottie JSON file
-        fps: Frames per second for playback (default 30)
-        frame_hold: Number of Lottie frames to hold each sprite frame (default 2)
-                    Higher values = slower animation
-                    At 30fps with frame_hold=2, each sprite frame shows for ~67ms
+# Samples per pixel for the 8-bit PNG color types PngBandReader handles
+PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
 
-    Returns:
-        Path to the created Lottie JSON file
 
-    Technical Notes:
-        - Uses Lottie's image sequence feature
-        - Each frame is a separate asset with a separate image layer
-        - Layers are timed to appear/disappear in sequence
-        - frame_hold controls animation speed independent of fps
-    """
-    print(f"[INFO] Creating Lottie animation from {len(frames)} frames")
-    print(f"[INFO] Settings: {fps} fps, {frame_hold} frame hold")
+@dataclass
+class MemoryReport:
+    """Band plan and measured peak of one bounded-memory run."""
+    ceiling: int
+    band_height: int = 0  # Pixel rows per band of the frame pass
+    bands: int = 0
+    planned_bytes: int = 0
+    peak_bytes: int = 0
 
-    if not frames:
-        raise ValueError("No frames provided for Lottie creation")
+    def observe(self, peak: int) -> None:
+        """Record a band's measured peak; exceeding the ceiling is an error."""
+        self.peak_bytes = max(self.peak_bytes, peak)
+        if peak > self.ceiling:
+            raise ValueError(f"Memory ceiling exceeded: {format_bytes(peak)} used, "
+                             f"limit {format_bytes(self.ceiling)}")
 
-    # Load first frame to get dimensions
-    with Image.open(frames[0]) as img:
-        frame_width, frame_height = img.size
+    def print_report(self) -> None:
+        print(f"[INFO] Memory: {self.bands} band(s) of {self.band_height} rows, "
+              f"planned {format_bytes(self.planned_bytes)}, decode peak {format_bytes(self.peak_bytes)} "
+              f"(ceiling {format_bytes(self.ceiling)})")
 
-    # Calculate total animation length
-    total_lottie_frames = len(frames) * frame_hold
-    duration_seconds = total_lottie_frames / fps
 
-    print(f"[INFO] Canvas size: {frame_width}x{frame_height}")
-    print(f"[INFO] Animation duration: {duration_seconds:.2f}s ({total_lottie_frames} frames)")
+def format_bytes(size: int) -> str:
+    """Human-readable size, e.g. 512.0 MB."""
+    return f"{size / (1024 * 1024):.1f} MB"
 
-    # Build assets array (embedded base64 images)
-    assets = []
-    for i, frame_path in enumerate(frames):
-        print(f"  [EMBED] Frame {i + 1}/{len(frames)}: {frame_path.name}")
 
-        with open(frame_path, 'rb') as f:
-            frame_data = base64.b64encode(f.read()).decode('utf-8')
-
-        with Image.open(frame_path) as img:
-            w, h = img.size
-
-        assets.append({
-            "id": f"frame_{i:03d}",
-            "w": w,
-            "h": h,
-            "e": 1,  # 1 = embedded (base64)
-            "u": "",
-            "p": f"data:image/png;base64,{frame_data}"
-        })
+def peak_rss() -> Optional[int]:
+    """Peak resident set size of this process in bytes (None on Windows)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
 
-    # Build layers (one per frame, timed to show in sequence)
-    layers = []
-    for i in range(len(frames)):
-        # Calculate timing for this frame
-        in_point = i * frame_hold
-        out_point = (i + 1) * frame_hold
-
-        # Image layer
-        layer = {
-            "ddd": 0,
-            "ind": i + 1,
-            "ty": 2,  # Image layer type
-            "nm": f"Frame {i + 1}",
-            "refId": f"frame_{i:03d}",
-            "sr": 1,
-            "ks": {
-                "o": {"a": 0, "k": 100},  # Opacity 100%
-                "r": {"a": 0, "k": 0},    # No rotation
-                # Anchor at bottom-center to keep feet planted across frames
-                "a": {"a": 0, "k": [frame_width / 2, frame_height, 0]},
-                "p": {"a": 0, "k": [frame_width / 2, frame_height, 0]},
-                "s": {"a": 0, "k": [100, 100, 100]}  # 100% scale
-            },
-            "ip": in_point,   # Layer appears at this frame
-            "op": out_point,  # Layer disappears at this frame
-            "st": 0
-        }
-
-        layers.append(layer)
+
+class PngBandReader:
+    """
+    Decode a PNG top to bottom, one band of pixel rows at a time.
+
+    The IDAT stream is inflated incrementally. Each band's filtered rows are
+    wrapped in a small stored (uncompressed) PNG and decoded by Pillow; the
+    previous band's last row goes in front as an unfiltered row, so Up,
+    Average and Paeth filters see the right neighbours. Only the band being
+    decoded is ever in memory.
+
+    Supports 8-bit non-interlaced PNGs (every Ludo.ai export); anything else
+    raises ValueError.
+    """
+
+    # Largest piece inflated at once (bounds the temporary output buffer)
+    INFLATE_CHUNK = 1 << 20
+
+    def __init__(self, fp: IO[bytes]):
+        self._fp = fp
+        if fp.read(len(PNG_SIGNATURE)) != PNG_SIGNATURE:
+            raise ValueError("Not a PNG file")
+
+        chunk_type, header = self._read_chunk()
+        if chunk_type != b'IHDR':
+            raise ValueError("PNG does not start with IHDR")
+        width, height, depth, color_type, _, _, interlace = struct.unpack('>IIBBBBB', header)
+        if depth != 8 or interlace or color_type not in PNG_CHANNELS:
+            raise ValueError(f"Banded decoding needs an 8-bit non-interlaced PNG "
+                             f"(got {depth}-bit, color type {color_type}, interlace {interlace})")
+
+        # Palette and transparency chunks are copied into every band
+        self._extra = b""
+        while True:
+            chunk_type, data = self._read_chunk()
+            if chunk_type == b'IDAT':
+                self._idat = data
+                break
+            if chunk_type == b'IEND':
+                raise ValueError("PNG has no image data")
+            if chunk_type in (b'PLTE', b'tRNS'):
+                self._extra += _png_chunk(chunk_type, data)
+
+        self.size = (width, height)
+        self.rows_read = 0
+        self._color_type = color_type
+        self._stride = width * PNG_CHANNELS[color_type]
+        self._inflate = zlib.decompressobj()
+        self._previous: Optional[bytes] = None
+
+    def read_band(self, rows: int) -> Image.Image:
+        """Decode the next rows pixel rows (fewer at the bottom of the image)."""
+        width, height = self.size
+        rows = min(rows, height - self.rows_read)
+        if rows <= 0:
+            raise ValueError("No rows left to read")
+
+        # Filled in place, so the filtered rows exist exactly once
+        skip = int(self._previous is not None)
+        filtered = bytearray((rows + skip) * (self._stride + 1))
+        if self._previous is not None:
+            # Filter type 0 (None) row carrying the previous band's last pixels
+            filtered[1:self._stride + 1] = self._previous
+        with memoryview(filtered) as view:
+            position = skip * (self._stride + 1)
+            while position < len(filtered):
+                data = self._inflate.unconsumed_tail or self._next_idat()
+                chunk = self._inflate.decompress(
+                    data, min(len(filtered) - position, self.INFLATE_CHUNK)
+                )
+                view[position:position + len(chunk)] = chunk
+                position += len(chunk)
+
+        png = self._stored_png(filtered, rows + skip)
+        del filtered
+
+        with Image.open(io.BytesIO(png)) as img:
+            img.load()
+            band = img.crop((0, skip, width, rows + skip))
+        del png
+
+        # Decoded 8-bit samples are the raw row bytes for every supported type
+        self._previous = band.crop((0, rows - 1, width, rows)).tobytes()
+        self.rows_read += rows
+        return band
+
+    def _stored_png(self, filtered: bytearray, rows: int) -> bytes:
+        """
+        Wrap filtered rows in a PNG whose IDAT holds stored deflate blocks.
+
+        The blocks are joined straight from views of the row buffer, so the
+        PNG is the only copy made.
+        """
+        header = struct.pack('>IIBBBBB', self.size[0], rows, 8, self._color_type, 0, 0, 0)
+        block_size = 0xFFFF  # Largest stored deflate block
+        blocks = -(-len(filtered) // block_size)
+
+        with memoryview(filtered) as view:
+            idat = [b'\x78\x01']  # zlib header, no compression
+            for start in range(0, len(filtered), block_size):
+                block = view[start:start + block_size]
+                final = start + block_size >= len(filtered)
+                idat.append(struct.pack('<BHH', final, len(block), len(block) ^ 0xFFFF))
+                idat.append(block)
+            idat.append(struct.pack('>I', zlib.adler32(filtered)))
+
+            crc = zlib.crc32(b'IDAT')
+            for part in idat:
+                crc = zlib.crc32(part, crc)
+
+            return b"".join((
+                PNG_SIGNATURE, _png_chunk(b'IHDR', header), self._extra,
+                struct.pack('>I4s', 2 + 5 * blocks + len(filtered) + 4, b'IDAT'),
+                *idat,
+                struct.pack('>I', crc),
+                _png_chunk(b'IEND', b""),
+            ))
+
+    def _next_idat(self) -> bytes:
+        """Payload of the next IDAT chunk, or the previous leftover."""
+        if self._idat:
+            data, self._idat = self._idat, b""
+            return data
+        chunk_type, data = self._read_chunk()
+        if chunk_type != b'IDAT':
+            raise ValueError("PNG image data ends early")
+        return data
+
+    def _read_chunk(self) -> Tuple[bytes, bytes]:
+        header = self._fp.read(8)
+        if len(header) < 8:
+            raise ValueError("PNG file ends early")
+        length, chunk_type = struct.unpack('>I4s', header)
+        data = self._fp.read(length)
+        crc = self._fp.read(4)
+        if len(data) < length or len(crc) < 4:
+            raise ValueError("PNG file ends early")
+        if zlib.crc32(data, zlib.crc32(chunk_type)) != struct.unpack('>I', crc)[0]:
+            raise ValueError(f"PNG chunk {chunk_type.decode('latin-1')} fails its CRC check")
+        return chunk_type, data
+
+
+def _png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    """Serialize one PNG chunk (length, type, data, CRC)."""
+    crc = zlib.crc32(data, zlib.crc32(chunk_type))
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', crc)
+
+
+@contextlib.contextmanager
+def _open_spritesheet_stream(input_path: Path) -> Iterator[IO[bytes]]:
+    """Open the sheet PNG, or the sprite sheet inside a Ludo.ai ZIP, as a stream."""
+    if input_path.suffix.lower() == '.zip':
+        with zipfile.ZipFile(input_path, 'r') as zf:
+            with zf.open(_spritesheet_member(zf, input_path)) as fp:
+                yield fp
+    else:
+        with open(input_path, 'rb') as fp:
+            yield fp
+
+
+@contextlib.contextmanager
+def _traced_memory() -> Iterator[None]:
+    """Run with tracemalloc on (left running if the caller already started it)."""
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        yield
+    finally:
+        if started:
+            tracemalloc.stop()
+
+
+def _band_peak(base: int, untracked: int) -> int:
+    """
+    Upper bound on the peak bytes of one band phase.
+
+    tracemalloc sees Python and NumPy allocations since the last peak reset;
+    Pillow's own image buffers are invisible to it, so the images the phase
+    holds (untracked) are added by size.
+    """
+    return tracemalloc.get_traced_memory()[1] - base + untracked
+
+
+def plan_band_height(
+    width: int,
+    unit: int,
+    max_memory: int,
+    reserved: int = 0
+) -> int:
+    """
+    Largest band (a multiple of unit pixel rows) that fits under max_memory.
+
+    Args:
+        width: Sheet width in pixels
+        unit: Band granularity in rows (the cell height for the frame pass)
+        max_memory: Peak-memory ceiling in bytes
+        reserved: Bytes needed besides the band (cells being encoded)
+
+    Raises:
+        ValueError: If not even one unit fits
+    """
+    # Inflate output and zlib window, independent of the band size
+    reserved += 2 * PngBandReader.INFLATE_CHUNK
+    unit_bytes = width * unit * BAND_BYTES_PER_PIXEL
+    units = (max_memory - reserved) // unit_bytes
+    if units < 1:
+        raise ValueError(f"--max-memory {format_bytes(max_memory)} is too low: one band of "
+                         f"{unit} rows needs {format_bytes(unit_bytes + reserved)}")
+    return units * unit
+
+
+def analyze_grid_banded(
+    input_path: Path,
+    report: MemoryReport,
+    gap_threshold: float = 0.015,
+    edge_margin: int = 1
+) -> GridDetection:
+    """
+    analyze_grid() for bounded-memory runs.
+
+    The alpha and alpha-weighted luminance projections are summed band by
+    band, then scored exactly like _analyze_grid_by_alpha() (with the
+    periodic fallback). Needs a sheet with an alpha channel.
+
+    Args:
+        input_path: Sprite sheet PNG or Ludo.ai ZIP
+        report: MemoryReport holding the ceiling; the peak is recorded
+
+    Returns:
+        GridDetection
+    """
+    print("[INFO] Auto-detecting grid dimensions (banded)...")
+
+    with _open_spritesheet_stream(input_path) as fp, _traced_memory():
+        reader = PngBandReader(fp)
+        width, height = reader.size
+        print(f"[INFO] Sprite sheet size: {width}x{height}")
+
+        band_height = min(height, plan_band_height(width, 1, report.ceiling))
+        col_alpha = np.zeros(width, dtype=np.int64)
+        col_weighted = np.zeros(width, dtype=np.int64)
+        row_alpha, row_weighted = [], []
+
+        while reader.rows_read < height:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+
+            band = reader.read_band(band_height)
+            band_bytes = width * band.height * 4
+            decode_peak = _band_peak(base, 2 * band_bytes)
+            tracemalloc.reset_peak()
+
+            if band.mode != 'RGBA':
+                raise ValueError("Banded grid detection needs an RGBA sheet; pass --grid")
+            alpha = np.asarray(band.getchannel('A'))
+            weighted = np.asarray(band.convert('L'), dtype=np.uint32) * alpha
+            col_alpha += alpha.sum(axis=0, dtype=np.int64)
+            col_weighted += weighted.sum(axis=0, dtype=np.int64)
+            row_alpha.append(alpha.sum(axis=1, dtype=np.int64))
+            row_weighted.append(weighted.sum(axis=1, dtype=np.int64))
+
+            del band, alpha, weighted
+            report.observe(max(decode_peak, _band_peak(base, band_bytes)))
+
+    row_alpha = np.concatenate(row_alpha)
+    row_weighted = np.concatenate(row_weighted)
+
+    col_gaps = _find_gap_bands(col_alpha, height * 255 * gap_threshold, edge_margin)
+    row_gaps = _find_gap_bands(row_alpha, width * 255 * gap_threshold, edge_margin)
+
+    def periodic(rows: bool, cols: bool) -> GridDetection:
+        return _grid_from_period_profiles(
+            (width, height),
+            [col_alpha.astype(np.float64), col_weighted / 255.0] if cols else None,
+            [row_alpha.astype(np.float64), row_weighted / 255.0] if rows else None,
+        )
+
+    return _grid_from_gaps((width, height), row_gaps, col_gaps, "alpha", periodic)
+
+
+def iter_band_cells(
+    input_path: Path,
+    grid: Tuple[int, int],
+    report: MemoryReport
+) -> Iterator[Tuple[CellStats, Image.Image, Tuple[int, int, int, int]]]:
+    """
+    Decode the sheet one band of cell rows at a time and yield its cells.
+
+    The band height is planned so the band's working set plus the cells
+    being encoded on the thread pool stay under report.ceiling. After each
+    band the measured peak is checked against the ceiling (ValueError when
+    exceeded). Cell rows, indices, boxes and digests match a full decode.
+
+    Args:
+        input_path: Sprite sheet PNG or Ludo.ai ZIP
+        grid: Tuple of (rows, columns)
+        report: MemoryReport holding the ceiling; plan and peak are recorded
+
+    Yields:
+        (cell with sheet coordinates, band image, cell rectangle in the band)
+    """
+    rows, cols = grid
+
+    with _open_spritesheet_stream(input_path) as fp, _traced_memory():
+        reader = PngBandReader(fp)
+        width, height = reader.size
+        cell_w, cell_h = width // cols, height // rows
+
+        print(f"[INFO] Frame size: {cell_w}x{cell_h}")
+        if width % cols != 0 or height % rows != 0:
+            print(f"[WARN] Grid {rows}x{cols} doesn't divide {width}x{height} evenly!")
+            print(f"       Remainder: {width % cols}px horizontal, {height % rows}px vertical")
+
+        # ordered_map keeps up to 2x workers cells in flight (crop + encoder buffers)
+        in_flight = 2 * _encode_workers * 2 * cell_w * cell_h * 4
+        band_rows = min(rows, plan_band_height(width, cell_h, report.ceiling, in_flight) // cell_h)
+        band_height = band_rows * cell_h
+        report.band_height = band_height
+        report.planned_bytes = (width * band_height * BAND_BYTES_PER_PIXEL + in_flight
+                                + 2 * PngBandReader.INFLATE_CHUNK)
+        print(f"[INFO] Decoding {band_rows} cell row(s) per band "
+              f"(ceiling {format_bytes(report.ceiling)})")
+
+        for first_row in range(0, rows, band_rows):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+
+            count = min(band_rows, rows - first_row)
+            band = reader.read_band(count * cell_h)
+            band_bytes = width * band.height * 4
+            decode_peak = _band_peak(base, 2 * band_bytes)
+            tracemalloc.reset_peak()
+
+            top = first_row * cell_h
+            for cell in compute_cell_stats(band, (count, cols)):
+                left, band_top, right, band_bottom = cell.box
+                row = first_row + cell.row
+                yield replace(
+                    cell,
+                    row=row,
+                    index=row * cols + cell.col,
+                    box=(left, band_top + top, right, band_bottom + top),
+                ), band, cell.box
+
+            del band
+            report.bands += 1
+            # Cell crops are Pillow images too; their encoder buffers are tracked
+            report.observe(max(decode_peak, _band_peak(base, band_bytes + in_flight // 2)))
+
+
+def encode_frames_banded(
+    input_path: Path,
+    grid: Tuple[int, int],
+    report: MemoryReport,
+    crop: bool = False,
+    scale: float = 1.0
+) -> List[EncodedFrame]:
+    """
+    Bounded-memory variant of encode_frames(): same frames, same bytes.
+
+    The sheet is never decoded whole; see iter_band_cells().
+
+    Args:
+        input_path: Sprite sheet PNG or Ludo.ai ZIP
+        grid: Tuple of (rows, columns)
+        report: MemoryReport holding the ceiling; plan and peak are recorded
+        crop: If True, trim each frame to its alpha bounding box
+        scale: Resample each cell by this factor before encoding
+
+    Returns:
+        List of EncodedFrame (in animation order: left-to-right, top-to-bottom)
+    """
+    print("[INFO] Encoding frames band by band")
+    print(f"[INFO] Grid: {grid[0]} rows x {grid[1]} columns")
+    if scale != 1.0:
+        print(f"[INFO] Scale: {scale:g}x")
+
+    frames, skipped = _map_valid_cells(
+        iter_band_cells(input_path, grid, report),
+        lambda job: _encode_cell(job, crop, scale),
+    )
+
+    print(f"[OK] Encoded {len(frames)} valid frames")
+    if skipped > 0:
+        print(f"[INFO] Skipped {skipped} empty frames")
+    report.print_report()
+    return frames
+
+
+# =============================================================================
+# SPRITE EXTRACTION (irregular sheets)
+# =============================================================================
+
+# Frame layouts understood by process_ludo_asset()/batch_process()
+LAYOUTS = ("grid", "sprites")
+
+# Detached components whose strongest pixel is at most this alpha are
+# compression/export specks, not sprite parts
+FAINT_ALPHA = 16
+
+
+@dataclass
+class SpriteRegion:
+    """A sprite found by connected-component labeling, in sheet coordinates."""
+    index: int  # Reading-order index, used for naming
+    box: Tuple[int, int, int, int]  # Source rectangle (l, t, r, b), exclusive
+    area: int  # Number of content pixels
+    components: int = 1  # Connected components merged into this sprite
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return (self.box[2] - self.box[0], self.box[3] - self.box[1])
+
+
+def find_sprite_regions(
+    spritesheet: Image.Image,
+    merge_distance: int = 12,
+    min_area: int = 64
+) -> List[SpriteRegion]:
+    """
+    Locate sprites on an irregularly packed sheet.
+
+    Content pixels (alpha > 0, or differing from the background on opaque
+    sheets) are labeled as 8-connected components via run-length encoding:
+    runs are found per row with NumPy, overlapping runs on adjacent rows
+    are paired with searchsorted, and labels are propagated over the pairs
+    with vectorized min-label passes. No pixel is visited in Python.
+
+    Components are then merged into sprites: components whose bounding
+    boxes intersect belong together, and small detached parts (sparkles,
+    shadows) join the nearest sprite within merge_distance pixels. Noise is
+    dropped before merging: components with no pixel above FAINT_ALPHA,
+    and components smaller than min_area (or 1% of a typical sprite part)
+    that are not within merge_distance of a larger part. Merged sprites
+    still below that size are dropped too.
+
+    Args:
+        spritesheet: Decoded sprite sheet image
+        merge_distance: Max gap in pixels for attaching small detached parts
+        min_area: Minimum content pixels for a standalone sprite
+
+    Returns:
+        List of SpriteRegion in reading order (top-to-bottom, left-to-right)
+    """
+    if spritesheet.mode == 'RGBA':
+        alpha = np.asarray(spritesheet.getchannel('A'))
+        _, boxes, areas, peaks = _label_runs(alpha > 0, alpha)
+        solid = peaks > FAINT_ALPHA
+    else:
+        _, boxes, areas, _ = _label_runs(_background_mask(spritesheet))
+        solid = np.ones(len(areas), dtype=bool)
+    if not solid.any():
+        return []
+    print(f"[INFO] Found {len(areas)} connected components")
+
+    # Typical size of a sprite's main body, so thresholds scale with the
+    # sheet resolution rather than with how many specks it has
+    reference = float(np.median(areas[solid & (areas >= 0.1 * areas[solid].max())]))
+
+    # Drop specks before merging unless they sit next to a real part (a
+    # sparkle): left in, they chain sprites together through their
+    # "nearest larger neighbour" links and the merge compares all of them
+    noise_area = max(min_area, 0.01 * reference)
+    boxes, areas = boxes[solid], areas[solid]
+    noise = areas < noise_area
+    first, second, _ = _box_pairs(boxes, merge_distance)
+    near_part = np.zeros(len(areas), dtype=bool)
+    near_part[first[~noise[second]]] = True
+    near_part[second[~noise[first]]] = True
+    keep = ~noise | near_part
+    dropped = len(solid) - int(keep.sum())
+    boxes, areas = boxes[keep], areas[keep]
+
+    boxes, areas, counts = _merge_components(boxes, areas, merge_distance, 0.1 * reference)
+
+    keep = areas >= noise_area
+    dropped += int((~keep).sum())
+    if dropped:
+        print(f"[INFO] Dropped {dropped} noise components "
+              f"(alpha <= {FAINT_ALPHA}, or < {noise_area:.0f}px)")
+    boxes, areas, counts = boxes[keep], areas[keep], counts[keep]
+    if not len(areas):
+        return []
+
+    regions = [
+        SpriteRegion(index=0, box=tuple(int(v) for v in box), area=int(area), components=int(count))
+        for box, area, count in zip(boxes, areas, counts)
+    ]
+    regions = _reading_order(regions)
+    for index, region in enumerate(regions):
+        region.index = index
+
+    print(f"[OK] Found {len(regions)} sprites")
+    return regions
+
+
+def _background_mask(spritesheet: Image.Image, tolerance: int = 8) -> "np.ndarray":
+    """Pixels of an opaque sheet that differ from its (median border) background."""
+    rgb = np.asarray(spritesheet.convert('RGB'))
+    border = np.concatenate([rgb[0], rgb[-1], rgb[:, 0], rgb[:, -1]])
+    background = np.median(border, axis=0).astype(np.int16)
+
+    # Widen to int16 one strip at a time rather than the whole sheet
+    mask = np.empty(rgb.shape[:2], dtype=bool)
+    for top in range(0, rgb.shape[0], PROJECTION_STRIP_ROWS):
+        strip = rgb[top:top + PROJECTION_STRIP_ROWS].astype(np.int16)
+        mask[top:top + PROJECTION_STRIP_ROWS] = np.abs(strip - background).max(axis=2) > tolerance
+    return mask
+
+
+def _label_runs(
+    mask: "np.ndarray",
+    values: Optional["np.ndarray"] = None
+) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray"]:
+    """
+    8-connected component labeling over horizontal runs.
+
+    Args:
+        mask: Boolean content mask
+        values: Optional per-pixel values (e.g. alpha) to take each
+            component's maximum of
+
+    Returns:
+        Tuple of (run labels, component boxes [n, 4] as l/t/r/b, component
+        areas, component peak values; all 1 without values)
+    """
+    height, width = mask.shape
+    stride = width + 2
+
+    # Runs: +1 edges are starts, -1 edges are (exclusive) ends
+    padded = np.zeros((height, width + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    edges = np.diff(padded, axis=1)
+    run_rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    if not run_rows.size:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, np.zeros((0, 4), dtype=np.int64), empty, empty
+
+    # Runs are row-major sorted, so these keys are sorted too
+    start_keys = run_rows.astype(np.int64) * stride + starts
+    end_keys = run_rows.astype(np.int64) * stride + ends
+
+    # Pair each run with the runs of the previous row it touches (diagonals
+    # included): previous.start <= run.end and previous.end >= run.start
+    previous_row = (run_rows.astype(np.int64) - 1) * stride
+    lo = np.searchsorted(end_keys, previous_row + starts, side='left')
+    hi = np.searchsorted(start_keys, previous_row + ends, side='right')
+    counts = np.clip(hi - lo, 0, None)
+    below = np.repeat(np.arange(run_rows.size), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    above = np.repeat(lo, counts) + offsets
+
+    # Min-label propagation with pointer jumping until stable
+    labels = np.arange(run_rows.size)
+    while True:
+        merged = np.minimum(labels[above], labels[below])
+        updated = labels.copy()
+        np.minimum.at(updated, above, merged)
+        np.minimum.at(updated, below, merged)
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            break
+        labels = updated
+
+    roots, labels = np.unique(labels, return_inverse=True)
+    n = roots.size
+    boxes = np.empty((n, 4), dtype=np.int64)
+    boxes[:, 0], boxes[:, 1] = width, height
+    boxes[:, 2:] = 0
+    np.minimum.at(boxes[:, 0], labels, starts)
+    np.minimum.at(boxes[:, 1], labels, run_rows)
+    np.maximum.at(boxes[:, 2], labels, ends)
+    np.maximum.at(boxes[:, 3], labels, run_rows + 1)
+    areas = np.bincount(labels, weights=ends - starts, minlength=n).astype(np.int64)
+
+    peaks = np.ones(n, dtype=np.int64)
+    if values is not None:
+        # Reduce over [start, end) and [end, next start) alternately; only
+        # the even (run) segments are kept
+        flat = values.reshape(-1)
+        run_starts = run_rows.astype(np.int64) * width + starts
+        run_ends = run_rows.astype(np.int64) * width + ends
+        bounds = np.column_stack([run_starts, run_ends]).reshape(-1)
+        if bounds[-1] == flat.size:
+            bounds = bounds[:-1]
+        run_peaks = np.maximum.reduceat(flat, bounds)[::2]
+        peaks[:] = 0
+        np.maximum.at(peaks, labels, run_peaks)
+    return labels, boxes, areas, peaks
+
+
+def _merge_components(
+    boxes: "np.ndarray",
+    areas: "np.ndarray",
+    merge_distance: int,
+    small_area: float
+) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """
+    Merge components that belong to the same sprite.
+
+    Components whose boxes intersect are merged; components smaller than
+    small_area attach to their nearest larger neighbour within
+    merge_distance. Repeats until nothing changes, since merged boxes grow.
+
+    Only box pairs within merge_distance are ever compared (_box_pairs), so
+    memory follows the number of nearby pairs rather than components².
+
+    Returns:
+        Tuple of (boxes, areas, merged component counts) per sprite
+    """
+    counts = np.ones(len(areas), dtype=np.int64)
+    while len(areas) > 1:
+        # Both directions of every nearby pair; gap < 0 = they intersect
+        first, second, gap = _box_pairs(boxes, merge_distance)
+        first, second = np.concatenate([first, second]), np.concatenate([second, first])
+        gap = np.concatenate([gap, gap])
+        link = gap < 0
+
+        # Each small component links to its nearest larger one (lowest index
+        # on ties); gap <= merge_distance holds for every pair already
+        candidate = (areas[first] < small_area) & (areas[second] > areas[first])
+        order = np.lexsort((second[candidate], gap[candidate], first[candidate]))
+        source = first[candidate][order]
+        nearest = np.ones(source.size, dtype=bool)
+        nearest[1:] = source[1:] != source[:-1]
+        link[np.flatnonzero(candidate)[order[nearest]]] = True
+
+        first, second = first[link], second[link]
+        if not first.size:
+            break
+
+        # Connected groups of linked components
+        group = np.arange(len(areas))
+        while True:
+            merged = np.minimum(group[first], group[second])
+            updated = group.copy()
+            np.minimum.at(updated, first, merged)
+            np.minimum.at(updated, second, merged)
+            updated = updated[updated]
+            if np.array_equal(updated, group):
+                break
+            group = updated
+
+        roots, group = np.unique(group, return_inverse=True)
+        merged_boxes = np.empty((roots.size, 4), dtype=np.int64)
+        merged_boxes[:, :2] = np.iinfo(np.int64).max
+        merged_boxes[:, 2:] = 0
+        for column, reduce in ((0, np.minimum), (1, np.minimum), (2, np.maximum), (3, np.maximum)):
+            reduce.at(merged_boxes[:, column], group, boxes[:, column])
+        boxes = merged_boxes
+        areas = np.bincount(group, weights=areas).astype(np.int64)
+        counts = np.bincount(group, weights=counts).astype(np.int64)
+
+    return boxes, areas, counts
+
+
+def _box_pairs(
+    boxes: "np.ndarray",
+    distance: int
+) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """
+    Find box pairs at most distance pixels apart with a sweep over left edges.
+
+    Boxes are sorted by left edge; box i can only be within distance of the
+    boxes after it whose left edge is <= its right edge + distance, which
+    searchsorted finds in one call. The candidates are then checked on both
+    axes.
+
+    Returns:
+        Tuple of (first, second, gap) with first < second; gap is the larger
+        axis gap (negative = the boxes intersect)
+    """
+    order = np.argsort(boxes[:, 0], kind='stable')
+    lefts = boxes[order, 0]
+    hi = np.searchsorted(lefts, boxes[order, 2] + distance, side='right')
+    counts = np.clip(hi - np.arange(len(order)) - 1, 0, None)
+    first = np.repeat(np.arange(len(order)), counts)
+    second = first + 1 + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    first, second = order[first], order[second]
+
+    gap_x = np.maximum(boxes[first, 0], boxes[second, 0]) - np.minimum(boxes[first, 2], boxes[second, 2])
+    gap_y = np.maximum(boxes[first, 1], boxes[second, 1]) - np.minimum(boxes[first, 3], boxes[second, 3])
+    gap = np.maximum(gap_x, gap_y)
+    near = gap <= distance
+    first, second = np.minimum(first[near], second[near]), np.maximum(first[near], second[near])
+    return first, second, gap[near]
+
+
+def _reading_order(regions: List[SpriteRegion]) -> List[SpriteRegion]:
+    """Sort sprites into lines (by vertical overlap), then left-to-right."""
+    lines: List[List[SpriteRegion]] = []
+    line_bottom = None
+    for region in sorted(regions, key=lambda r: (r.box[1], r.box[0])):
+        center_y = (region.box[1] + region.box[3]) / 2
+        if line_bottom is None or center_y >= line_bottom:
+            lines.append([])
+            line_bottom = region.box[3]
+        else:
+            line_bottom = max(line_bottom, region.box[3])
+        lines[-1].append(region)
+    return [region for line in lines for region in sorted(line, key=lambda r: r.box[0])]
+
+
+def _sprite_canvas(regions: List[SpriteRegion]) -> Tuple[int, int]:
+    """Common frame size: every sprite fits with its bottom-center aligned."""
+    return (max(r.size[0] for r in regions), max(r.size[1] for r in regions))
+
+
+def _sprite_offset(region: SpriteRegion, canvas: Tuple[int, int]) -> Tuple[int, int]:
+    """Top-left of a sprite on the canvas (bottom-center aligned, like grid cells)."""
+    width, height = region.size
+    return ((canvas[0] - width) // 2, canvas[1] - height)
+
+
+def extract_sprites(
+    spritesheet_path: Path,
+    output_dir: Path
+) -> List[Path]:
+    """
+    Extract sprites from an irregularly packed sheet.
+
+    Every sprite is placed on a common canvas with its bottom-center aligned
+    (the same anchor the Lottie layers use), saved as frame_NNN.png in
+    reading order, and its source rectangle is written to sprites.json.
+
+    Args:
+        spritesheet_path: Path to the sprite sheet PNG
+        output_dir: Directory to save extracted frames
+
+    Returns:
+        List of paths to extracted frame PNGs (in reading order)
+    """
+    print(f"[INFO] Extracting sprites from: {spritesheet_path.name}")
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    with Image.open(spritesheet_path) as img:
+        regions = find_sprite_regions(img)
+        if not regions:
+            return []
+
+        canvas = _sprite_canvas(regions)
+        print(f"[INFO] Frame size: {canvas[0]}x{canvas[1]}")
+
+        def padded_sprites() -> Iterator[Tuple[Path, Image.Image]]:
+            for region in regions:
+                frame = Image.new(img.mode, canvas)
+                frame.paste(img.crop(region.box), _sprite_offset(region, canvas))
+                yield output_dir / f"frame_{region.index:03d}.png", frame
+
+        frames = list(ordered_map(_save_frame, padded_sprites()))
+
+    _write_sprite_manifest(output_dir / "sprites.json", regions, canvas)
+    print(f"[OK] Extracted {len(frames)} sprites to: {output_dir}")
+    return frames
+
+
+def encode_sprites(
+    spritesheet: Image.Image,
+    crop: bool = False,
+    scale: float = 1.0
+) -> List[EncodedFrame]:
+    """
+    In-memory variant of extract_sprites().
+
+    With crop=True each sprite is encoded at its source size and placed on
+    the canvas through the frame offset instead of being padded.
+
+    Args:
+        spritesheet: Decoded sprite sheet image
+        crop: If True, keep sprites tight (see EncodedFrame.cell)
+        scale: Resample each padded frame by this factor before encoding
+
+    Returns:
+        List of EncodedFrame in reading order
+    """
+    print("[INFO] Encoding sprites in memory")
+
+    regions = find_sprite_regions(spritesheet)
+    if not regions:
+        return []
+
+    canvas = _sprite_canvas(regions)
+    print(f"[INFO] Frame size: {canvas[0]}x{canvas[1]}")
+
+    def encode(region: SpriteRegion) -> EncodedFrame:
+        name = f"frame_{region.index:03d}.png"
+        x, y = _sprite_offset(region, canvas)
+        sprite = spritesheet.crop(region.box)
+        if scale != 1.0:
+            padded = Image.new(spritesheet.mode, canvas)
+            padded.paste(sprite, (x, y))
+            return EncodedFrame.from_image(name, scale_image(padded, scale), crop)
+        if crop and region.size != canvas:
+            frame = EncodedFrame.from_image(name, sprite)
+            frame.x, frame.y, frame.cell = x, y, canvas
+            return frame
+        padded = Image.new(spritesheet.mode, canvas)
+        padded.paste(sprite, (x, y))
+        return EncodedFrame.from_image(name, padded)
+
+    # The sheet is fully decoded by find_sprite_regions(), so workers only read it
+    frames = list(ordered_map(encode, regions))
+
+    print(f"[OK] Encoded {len(frames)} sprites")
+    return frames
+
+
+def _write_sprite_manifest(
+    manifest_path: Path,
+    regions: List[SpriteRegion],
+    canvas: Tuple[int, int]
+) -> None:
+    """Record each frame's source rectangle and canvas offset."""
+    manifest = {
+        "canvas": list(canvas),
+        "sprites": [
+            {
+                "frame": f"frame_{region.index:03d}.png",
+                "source": list(region.box),
+                "offset": list(_sprite_offset(region, canvas)),
+                "area": region.area,
+                "components": region.components,
+            }
+            for region in regions
+        ],
+    }
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+
+# =============================================================================
+# FRAME OPTIMIZATION
+# =============================================================================
+
+# zlib strategies tried per frame. Pillow picks PNG row filters itself
+# (adaptive for RGBA, none for palette images); the zlib strategy and level
+# are the encoder knobs it exposes.
+PNG_ZLIB_STRATEGIES = (
+    0,  # Z_DEFAULT_STRATEGY
+    1,  # Z_FILTERED
+    3,  # Z_RLE
+)
+PNG_COMPRESS_LEVELS = (6, 9)
+
+# Cap on pixels sampled when building the shared palette
+PALETTE_SAMPLE_LIMIT = 1_000_000
+
+
+@dataclass
+class OptimizationReport:
+    """Before/after PNG sizes and worst-case pixel error for one animation."""
+    frames: int = 0
+    palette_frames: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+    max_error: float = 0.0
+
+    def print_report(self) -> None:
+        saved = self.bytes_before - self.bytes_after
+        percent = 100 * saved / self.bytes_before if self.bytes_before else 0
+        print(f"[INFO] Optimize: {self.bytes_before:,} -> {self.bytes_after:,} bytes "
+              f"({percent:.0f}% smaller)")
+        print(f"[INFO] Optimize: {self.palette_frames}/{self.frames} frames indexed, "
+              f"max pixel error {self.max_error:.1f}")
+
+
+def optimize_frames(
+    frames: List[EncodedFrame],
+    max_error: float = 32.0,
+    colors: int = 256
+) -> Tuple[List[EncodedFrame], OptimizationReport]:
+    """
+    Re-encode frames with the smallest PNG that stays within an error bound.
+
+    One palette (with alpha) is built from all frames of the animation. Each
+    frame is then tried as an indexed PNG on that shared palette and as a
+    lossless RGBA PNG, each with every zlib level/strategy combination. The
+    smallest encoding wins, but the indexed one only counts if its worst
+    pixel stays within max_error. Error is the largest per-channel
+    difference in alpha-premultiplied RGBA (0-255), so color changes under
+    fully transparent pixels never count against a frame.
+
+    Args:
+        frames: Encoded frames of one animation
+        max_error: Largest per-channel error allowed for indexed frames
+        colors: Shared palette size (max 256)
+
+    Returns:
+        Tuple of (optimized frames in the same order, OptimizationReport)
+    """
+    report = OptimizationReport(frames=len(frames))
+    if not frames:
+        return [], report
+
+    pixels = list(ordered_map(_decode_frame_pixels, frames))
+    palette = _build_shared_palette(pixels, colors)
+
+    def encode(job: Tuple[EncodedFrame, "np.ndarray"]) -> Tuple[bytes, float, bool]:
+        frame, frame_pixels = job
+        best_png, best_error, indexed = frame.png, 0.0, False
+
+        lossless = _smallest_png(Image.fromarray(frame_pixels))
+        if len(lossless) < len(best_png):
+            best_png = lossless
+
+        indices, error = _map_to_palette(frame_pixels, palette)
+        if error <= max_error:
+            height, width = indices.shape
+            paletted = Image.frombytes('P', (width, height), indices.tobytes())
+            paletted.putpalette(palette.tobytes(), rawmode='RGBA')
+            candidate = _smallest_png(paletted)
+            if len(candidate) < len(best_png):
+                best_png, best_error, indexed = candidate, error, True
+        return best_png, best_error, indexed
+
+    optimized = []
+    for frame, (best_png, best_error, indexed) in zip(
+        frames, ordered_map(encode, zip(frames, pixels))
+    ):
+        report.bytes_before += len(frame.png)
+        report.bytes_after += len(best_png)
+        report.palette_frames += int(indexed)
+        report.max_error = max(report.max_error, best_error)
+        # Quantized pixels no longer match the sheet statistics
+        optimized.append(replace(frame, png=best_png, digest=None, mean_color=None))
+
+    return optimized, report
+
+
+def _decode_frame_pixels(frame: EncodedFrame) -> "np.ndarray":
+    """Decode a frame to RGBA pixels with RGB cleared under zero alpha."""
+    with Image.open(io.BytesIO(frame.png)) as img:
+        pixels = np.array(img.convert('RGBA'))
+    pixels[pixels[..., 3] == 0] = 0
+    return pixels
+
+
+def _build_shared_palette(pixels: List["np.ndarray"], colors: int) -> "np.ndarray":
+    """
+    Quantize the visible pixels of all frames into one RGBA palette.
+
+    Index 0 is reserved for fully transparent pixels.
+    """
+    visible = np.concatenate([p.reshape(-1, 4) for p in pixels])
+    visible = visible[visible[:, 3] > 0]
+    if visible.shape[0] > PALETTE_SAMPLE_LIMIT:
+        visible = visible[::visible.shape[0] // PALETTE_SAMPLE_LIMIT + 1]
+
+    transparent = np.zeros((1, 4), dtype=np.uint8)
+    if visible.shape[0] == 0:
+        return transparent
+
+    # Lay samples out as a 1024-wide image for Pillow's quantizer
+    width = 1024
+    padded = -visible.shape[0] % width
+    if padded:
+        visible = np.concatenate([visible, np.repeat(visible[-1:], padded, axis=0)])
+    sample = Image.frombytes('RGBA', (width, visible.shape[0] // width), visible.tobytes())
+
+    quantized = sample.quantize(colors=colors - 1, method=Image.Quantize.FASTOCTREE)
+    # Keep the entries pixels actually use; they need not start at 0 or be contiguous
+    used = sorted(index for _, index in quantized.getcolors(colors))
+    palette = np.array(quantized.getpalette('RGBA'), dtype=np.uint8).reshape(-1, 4)[used]
+
+    return np.concatenate([transparent, palette])
+
+
+def _map_to_palette(
+    pixels: "np.ndarray",
+    palette: "np.ndarray",
+    chunk: int = 4096
+) -> Tuple["np.ndarray", float]:
+    """
+    Map every pixel to its nearest palette entry (premultiplied RGBA distance).
+
+    Works on the frame's unique colors rather than its pixels, which keeps
+    the distance matrix small.
+
+    Returns:
+        Tuple of (palette index per pixel, max per-channel premultiplied error)
+    """
+    flat = np.ascontiguousarray(pixels).reshape(-1, 4)
+    packed = flat.view(np.uint32).ravel()
+    unique, inverse = np.unique(packed, return_inverse=True)
+    unique_colors = unique.view(np.uint8).reshape(-1, 4)
+
+    color_pm = _premultiply(unique_colors)
+    palette_pm = _premultiply(palette)
+
+    nearest = np.empty(unique_colors.shape[0], dtype=np.uint8)
+    for start in range(0, unique_colors.shape[0], chunk):
+        block = color_pm[start:start + chunk]
+        distances = ((block[:, None, :] - palette_pm[None, :, :]) ** 2).sum(axis=2)
+        nearest[start:start + chunk] = distances.argmin(axis=1)
+
+    error = float(np.abs(color_pm - palette_pm[nearest]).max()) if unique.size else 0.0
+    indices = nearest[inverse.ravel()].reshape(pixels.shape[:2])
+    return indices, error
+
+
+def _smallest_png(img: Image.Image) -> bytes:
+    """Encode with every zlib level/strategy combination; keep the smallest."""
+    best = None
+    for level in PNG_COMPRESS_LEVELS:
+        for strategy in PNG_ZLIB_STRATEGIES:
+            buffer = io.BytesIO()
+            img.save(buffer, 'PNG', compress_level=level, compress_type=strategy)
+            data = buffer.getvalue()
+            if best is None or len(data) < len(best):
+                best = data
+    return best
+
+
+# =============================================================================
+# LOTTIE GENERATION
+# =============================================================================
+
+# json separators without whitespace (vs. the indented default output)
+COMPACT_SEPARATORS = (',', ':')
+
+# Output containers understood by create_lottie()
+OUTPUT_FORMATS = ("json", "dotlottie")
+
+# dotLottie container: manifest.json, animations/<id>.json, images/<file>.png
+DOTLOTTIE_SUFFIX = ".lottie"
+DOTLOTTIE_IMAGE_DIR = "images"
+
+
+@dataclass
+class LottieOptions:
+    """Optional size optimizations applied while building a Lottie file."""
+    # Share one asset between repeated frames and merge consecutive repeats
+    dedupe: bool = False
+    # Mean absolute RGBA difference (0-255, alpha-premultiplied) within every
+    # DEDUPE_TILE x DEDUPE_TILE tile still treated as a repeat; 0 means
+    # byte-identical pixels only
+    dedupe_tolerance: float = 0.0
+    # Trim each frame to its alpha bounding box and position it with ks.a
+    crop: bool = False
+    # With crop, shrink the canvas to the union bounding box of all frames
+    crop_canvas: bool = False
+    # Re-encode frames as the smallest of shared-palette / RGBA PNG variants
+    optimize: bool = False
+    # Largest premultiplied per-channel error (0-255) allowed for indexed frames;
+    # 256-color palettes of Ludo sprites typically peak around 30 on AA edges
+    optimize_max_error: float = 32.0
+    # Write compact JSON through the streaming writer instead of indent=2
+    compact: bool = False
+    # Detect the best seamless loop and write intro/loop/outro markers
+    loop_markers: bool = False
+    # Drop intro/outro frames outside a seamless loop (idle animations)
+    trim_loop: bool = False
+    # Drop frames that add little visible change; the previous kept frame is
+    # held in their place, giving non-uniform hold durations
+    decimate: bool = False
+    # Largest RMS difference (0-255, premultiplied thumbnails) between a
+    # dropped frame and the kept frame shown instead
+    decimate_max_error: float = 8.0
+    # Fit the timeline to this duration (ms) instead of frames * frame_hold
+    target_duration_ms: Optional[int] = None
+    # Embed one base image of the static pixels plus each frame's changed
+    # pixels as a small patch layer over it (mostly-static animations)
+    delta: bool = False
+    # "json" (PNGs base64-embedded) or "dotlottie" (zip container with the
+    # PNGs as separate entries, no base64 overhead)
+    output_format: str = "json"
+    # Pack all frames into one atlas image stepped through by hold keyframes
+    # (one decode and texture upload per animation instead of one per frame)
+    atlas: bool = False
+
+    @property
+    def suffix(self) -> str:
+        """File extension of the output container."""
+        return DOTLOTTIE_SUFFIX if self.output_format == "dotlottie" else ".json"
+
+
+def create_lottie(
+    frames: Sequence[Union[Path, EncodedFrame]],
+    output_path: Path,
+    fps: int = 30,
+    frame_hold: int = 3,
+    options: Optional[LottieOptions] = None
+) -> Path:
+    """
+    Create a Lottie JSON animation from a sequence of frame images.
+
+    The animation embeds all frames as base64-encoded images, making it
+    self-contained and portable.
+
+    Args:
+        frames: Frame PNG paths or in-memory EncodedFrames (in order)
+        output_path: Path for the output Lottie JSON file
+        fps: Frames per second for playback (default 30)
+        frame_hold: Number of Lottie frames to hold each sprite frame (default 2)
+                    Higher values = slower animation
+                    At 30fps with frame_hold=2, each sprite frame shows for ~67ms
+        options: Optional LottieOptions (deduplication, cropping, PNG optimization)
+
+    Returns:
+        Path to the created Lottie JSON file
+
+    Technical Notes:
+        - Uses Lottie's image sequence feature
+        - Each frame is a separate asset with a separate image layer
+        - Layers are timed to appear/disappear in sequence
+        - frame_hold controls animation speed independent of fps
+        - With options.dedupe, repeated frames share one asset and runs of
+          consecutive repeats become a single layer with a longer ip/op span
+        - With options.compact, JSON is streamed with compact separators and
+          assets are base64-encoded one at a time (write_lottie_stream)
+        - With options.crop, each frame is only as large as its visible
+          content; the layer anchor is moved so the cell's bottom-center
+          still lands on the same canvas point, keeping frames pixel-aligned
+        - With options.loop_markers, a frame similarity matrix picks the
+          smoothest loop; intro/loop/outro markers are written and, with
+          options.trim_loop, frames outside a seamless loop are dropped
+        - With options.target_duration_ms, frame i starts at
+          round(i * total / n) so the animation lasts exactly that long
+        - With options.decimate, frames close to the last kept frame are
+          not embedded; the kept frame's layer spans their time instead
+        - With options.delta, a base layer spanning the whole animation
+          holds the pixels shared by every frame and each frame layer only
+          its changed sub-rectangle (see encode_delta_frames); full frames
+          are kept if the result is not pixel-exact or not smaller
+        - With options.output_format="dotlottie", the same animation is
+          written as a .lottie container (see write_dotlottie); output_path's
+          suffix becomes .lottie unless it already is. JSON output keeps
+          output_path as given
+        - With options.atlas, the embedded frames are packed into a single
+          atlas image shown through one masked precomp layer whose position
+          and mask use hold keyframes (see build_atlas_animation); per-frame
+          layers are kept if the round-trip render is not exact
+    """
+    options = options or LottieOptions()
+    if options.output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format '{options.output_format}' "
+                         f"(expected one of: {', '.join(OUTPUT_FORMATS)})")
+    if options.atlas and options.delta:
+        raise ValueError("Atlas mode cannot be combined with delta encoding")
+    if options.output_format == "dotlottie" and output_path.suffix != DOTLOTTIE_SUFFIX:
+        output_path = output_path.with_suffix(DOTLOTTIE_SUFFIX)
+
+    print(f"[INFO] Creating Lottie animation from {len(frames)} frames")
+    print(f"[INFO] Settings: {fps} fps, {frame_hold} frame hold")
+
+    if not frames:
+        raise ValueError("No frames provided for Lottie creation")
+
+    # Read each frame file once; in-memory frames are used as-is
+    frames = [
+        frame if isinstance(frame, EncodedFrame) else EncodedFrame.from_file(frame)
+        for frame in frames
+    ]
+
+    # Frame distances are shared by loop detection and decimation
+    distances = None
+    if options.loop_markers or options.trim_loop or options.decimate:
+        distances = frame_similarity_matrix(frames)
+
+    segment = None
+    if options.loop_markers or options.trim_loop:
+        segment = find_loop_segment(distances)
+        print(f"[INFO] Loop: frames {segment.start}-{segment.end} of {len(frames)} "
+              f"(seam cost {segment.seam_cost:.2f}, intro {segment.intro}, outro {segment.outro})")
+        if not segment.seamless:
+            print("[WARN] No seamless loop found; keeping all frames, no markers")
+            segment = None
+        elif options.trim_loop and (segment.intro or segment.outro):
+            frames = frames[segment.start:segment.end + 1]
+            distances = distances[segment.start:segment.end + 1, segment.start:segment.end + 1]
+            print(f"[INFO] Trimmed to loop: {len(frames)} frames "
+                  f"({segment.intro + segment.outro} dropped)")
+            segment = LoopSegment(0, len(frames) - 1, len(frames), segment.seam_cost)
+
+    if options.crop or options.crop_canvas:
+        frames = _crop_frames(frames)
+
+    # Calculate total animation length
+    if options.target_duration_ms:
+        total_lottie_frames = max(len(frames), round(options.target_duration_ms * fps / 1000))
+    else:
+        total_lottie_frames = len(frames) * frame_hold
+    duration_seconds = total_lottie_frames / fps
+
+    # times[i] is the Lottie frame where sprite frame i starts (times[-1] = end)
+    times = [round(i * total_lottie_frames / len(frames)) for i in range(len(frames) + 1)]
+
+    print(f"[INFO] Animation duration: {duration_seconds:.2f}s ({total_lottie_frames} frames)")
+
+    markers = loop_markers(segment, times) if segment else []
+
+    # Decimated frames show the last kept frame (same image, same offsets)
+    if options.decimate:
+        keep = select_keyframes(distances, options.decimate_max_error)
+        report = DecimationReport.measure(frames, keep, distances)
+        frames = [frames[k] for k in keep]
+        report.print_report()
+
+    # Patches replace frames one-for-one, so keep/owner indices still apply
+    base = None
+    if options.delta:
+        base, patches, report = encode_delta_frames(frames)
+        report.print_report()
+        if report.verified and report.bytes_after < report.bytes_before:
+            frames = patches
+        else:
+            reason = "not pixel-exact" if not report.verified else "not smaller"
+            print(f"[WARN] Delta encoding is {reason}; embedding full frames")
+            base = None
+
+    # First frame's grid cell sets the canvas dimensions
+    cell_width, cell_height = frames[0].cell_size
+    frame_width, frame_height = cell_width, cell_height
+
+    # Canvas origin inside the cell (non-zero only when shrinking the canvas)
+    origin_x, origin_y = 0, 0
+    if options.crop_canvas:
+        placed = frames + [base] if base else frames
+        origin_x = min(frame.x for frame in placed)
+        origin_y = min(frame.y for frame in placed)
+        frame_width = max(frame.x + frame.width for frame in placed) - origin_x
+        frame_height = max(frame.y + frame.height for frame in placed) - origin_y
+        print(f"[INFO] Canvas cropped to union bounds at ({origin_x}, {origin_y})")
+
+    print(f"[INFO] Canvas size: {frame_width}x{frame_height}")
+
+    # owners[i] is the index of the frame whose asset frame i displays
+    if options.dedupe:
+        owners = _find_duplicate_frames(frames, options.dedupe_tolerance)
+    elif options.decimate:
+        owners = keep
+    else:
+        owners = list(range(len(frames)))
+
+    # Optimize only the frames that will actually be embedded
+    if options.optimize:
+        unique = [i for i in range(len(frames)) if owners[i] == i]
+        optimized, report = optimize_frames(
+            [frames[i] for i in unique], options.optimize_max_error
+        )
+        for i, frame in zip(unique, optimized):
+            frames[i] = frame
+        report.print_report()
+
+    # Build layers (one per run of identical frames, timed to show in sequence)
+    # Runs only merge when the frames also sit at the same offset in the cell
+    run_keys = [(owners[i], frame.x, frame.y) for i, frame in enumerate(frames)]
+    layers = []
+    for start, end in _frame_runs(run_keys):
+        frame = frames[start]
+        layers.append(_image_layer(
+            ind=len(layers) + 1,
+            name=f"Frame {start + 1}",
+            ref_id=f"frame_{owners[start]:03d}",
+            in_point=times[start],
+            out_point=times[end],
+            # Anchor at bottom-center of the cell, in this image's coordinates
+            anchor=[cell_width / 2 - frame.x, cell_height - frame.y, 0],
+            position=[cell_width / 2 - origin_x, cell_height - origin_y, 0],
+        ))
+
+    # The delta base is the bottom layer, shown for the whole animation
+    if base:
+        layers.append(_image_layer(
+            ind=len(layers) + 1,
+            name="Base",
+            ref_id="frame_base",
+            in_point=0,
+            out_point=total_lottie_frames,
+            anchor=[cell_width / 2 - base.x, cell_height - base.y, 0],
+            position=[cell_width / 2 - origin_x, cell_height - origin_y, 0],
+        ))
+
+    # Single-atlas mode replaces the per-frame assets and layers
+    atlas = None
+    if options.atlas:
+        atlas = build_atlas_animation(
+            frames, owners, times, (origin_x, origin_y), (frame_width, frame_height),
+            options.optimize, options.optimize_max_error
+        )
+        atlas.print_report()
+        if atlas.verified:
+            layers = [atlas.layer]
+        else:
+            print("[WARN] Atlas render does not match the frames; embedding per-frame layers")
+            atlas = None
+    precomps = [atlas.precomp] if atlas else []
+
+    # Images to embed, produced lazily one at a time so the streaming writers
+    # never hold more than one frame's base64 (or PNG entry)
+    def frame_images() -> Iterator[Tuple[str, EncodedFrame]]:
+        if atlas:
+            print(f"  [EMBED] Atlas: {atlas.entries} frames")
+            yield "atlas", atlas.image
+            return
+
+        if base:
+            print("  [EMBED] Delta base")
+            yield "frame_base", base
+
+        for i, frame in enumerate(frames):
+            if owners[i] != i:
+                print(f"  [SHARE] Frame {i + 1}/{len(frames)}: {frame.name} -> frame_{owners[i]:03d}")
+                continue
+
+            print(f"  [EMBED] Frame {i + 1}/{len(frames)}: {frame.name}")
+            yield f"frame_{i:03d}", frame
+
+    # The atlas report covers what is embedded in atlas mode
+    if options.dedupe and not atlas:
+        asset_count = sum(1 for i in range(len(frames)) if owners[i] == i)
+        # dotLottie stores raw PNG entries, JSON embeds them as base64 data URIs
+        asset_size = len if options.output_format == "dotlottie" else _data_uri_size
+        saved_bytes = sum(
+            asset_size(frame.png) for i, frame in enumerate(frames) if owners[i] != i
+        )
+        print(f"[INFO] Dedupe: {len(frames)} frames -> {asset_count} assets, {len(layers)} layers")
+        print(f"[INFO] Dedupe saved {saved_bytes:,} bytes ({saved_bytes / 1024:.1f} KB)")
 
     # Build complete Lottie structure
     lottie = {
@@ -535,21 +2705,839 @@ def create_lottie(
         "h": frame_height,
         "nm": output_path.stem,
         "ddd": 0,
-        "assets": assets,
-        "layers": layers,
-        "markers": []
+        # Base64 encoding runs on the thread pool, still in asset order
+        "assets": itertools.chain(
+            ordered_map(lambda image: _embedded_asset(*image), frame_images()),
+            precomps,
+        ),
+        "layers": layers,
+        "markers": markers
+    }
+
+    # Save to file
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if options.output_format == "dotlottie":
+        write_dotlottie(lottie, frame_images(), output_path, precomps)
+    else:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            if options.compact:
+                write_lottie_stream(lottie, f)
+            else:
+                lottie["assets"] = list(lottie["assets"])
+                json.dump(lottie, f, indent=2)
+
+    file_size = output_path.stat().st_size
+    print(f"[OK] Created Lottie: {output_path}")
+    print(f"[INFO] File size: {file_size:,} bytes ({file_size / 1024:.1f} KB)")
+
+    return output_path
+
+
+def write_lottie_stream(lottie: dict, fp: IO[str]) -> None:
+    """
+    Write a Lottie structure as compact JSON, streaming its assets.
+
+    lottie["assets"] may be any iterable (typically a generator); each asset
+    is serialized and written as soon as it is produced, so only one asset
+    is alive at a time. The bytes written are identical to
+    json.dump(lottie_with_asset_list, fp, separators=(',', ':')).
+    """
+    fp.write('{')
+    for n, (key, value) in enumerate(lottie.items()):
+        if n:
+            fp.write(',')
+        fp.write(json.dumps(key))
+        fp.write(':')
+
+        if key == "assets" and not isinstance(value, (list, tuple)):
+            fp.write('[')
+            for i, asset in enumerate(value):
+                if i:
+                    fp.write(',')
+                fp.write(json.dumps(asset, separators=COMPACT_SEPARATORS))
+            fp.write(']')
+        else:
+            fp.write(json.dumps(value, separators=COMPACT_SEPARATORS))
+    fp.write('}')
+
+
+def _embedded_asset(asset_id: str, frame: EncodedFrame) -> dict:
+    """Image asset with the frame's PNG embedded as a base64 data URI."""
+    frame_data = base64.b64encode(frame.png).decode('utf-8')
+    return {
+        "id": asset_id,
+        "w": frame.width,
+        "h": frame.height,
+        "e": 1,  # 1 = embedded (base64)
+        "u": "",
+        "p": f"data:image/png;base64,{frame_data}"
+    }
+
+
+def write_dotlottie(
+    lottie: dict,
+    images: Iterable[Tuple[str, EncodedFrame]],
+    output_path: Path,
+    precomps: Sequence[dict] = ()
+) -> None:
+    """
+    Write a Lottie structure as a dotLottie (.lottie) container.
+
+    The zip holds manifest.json, animations/<nm>.json and one
+    images/<asset id>.png entry per image; assets reference their entry
+    instead of embedding base64. PNG entries are stored (they are already
+    deflated), JSON entries deflated. Images are written as they are
+    produced, so only one frame is held at a time.
+
+    Args:
+        lottie: Lottie structure; its "assets" are replaced by the images
+        images: (asset id, frame) pairs to write, in asset order
+        output_path: Path for the .lottie file
+        precomps: Precomposition assets listed after the images
+    """
+    animation_id = lottie["nm"]
+    manifest = {
+        "version": "1",
+        "generator": "spritesheet_processor.py",
+        "animations": [
+            {"id": animation_id, "speed": 1, "loop": True, "autoplay": True}
+        ],
+    }
+
+    assets = []
+    with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+        for asset_id, frame in images:
+            file_name = f"{asset_id}.png"
+            archive.writestr(f"{DOTLOTTIE_IMAGE_DIR}/{file_name}", frame.png,
+                             compress_type=zipfile.ZIP_STORED)
+            assets.append({
+                "id": asset_id,
+                "w": frame.width,
+                "h": frame.height,
+                "e": 0,  # 0 = external file (inside the container)
+                "u": f"/{DOTLOTTIE_IMAGE_DIR}/",
+                "p": file_name
+            })
+        archive.writestr(
+            f"animations/{animation_id}.json",
+            json.dumps({**lottie, "assets": assets + list(precomps)}, separators=COMPACT_SEPARATORS)
+        )
+
+
+def load_lottie(path: Path) -> dict:
+    """Load a Lottie JSON file, or the first animation of a .lottie container."""
+    if path.suffix == DOTLOTTIE_SUFFIX:
+        with zipfile.ZipFile(path) as archive:
+            manifest = json.loads(archive.read("manifest.json"))
+            animation_id = manifest["animations"][0]["id"]
+            return json.loads(archive.read(f"animations/{animation_id}.json"))
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _image_layer(
+    ind: int,
+    name: str,
+    ref_id: str,
+    in_point: int,
+    out_point: int,
+    anchor: List[float],
+    position: List[float]
+) -> dict:
+    """Build one image layer shown from in_point until out_point."""
+    return {
+        "ddd": 0,
+        "ind": ind,
+        "ty": 2,  # Image layer type
+        "nm": name,
+        "refId": ref_id,
+        "sr": 1,
+        "ks": {
+            "o": {"a": 0, "k": 100},  # Opacity 100%
+            "r": {"a": 0, "k": 0},    # No rotation
+            # Anchor at bottom-center to keep feet planted across frames
+            "a": {"a": 0, "k": anchor},
+            "p": {"a": 0, "k": position},
+            "s": {"a": 0, "k": [100, 100, 100]}  # 100% scale
+        },
+        "ip": in_point,   # Layer appears at this frame
+        "op": out_point,  # Layer disappears at this frame
+        "st": 0
+    }
+
+
+def _frame_runs(keys: List[Any]) -> List[Tuple[int, int]]:
+    """Split the frame sequence into (start, end) runs with equal keys."""
+    runs = []
+    start = 0
+    for i in range(1, len(keys) + 1):
+        if i == len(keys) or keys[i] != keys[start]:
+            runs.append((start, i))
+            start = i
+    return runs
+
+
+def _crop_frames(frames: List[EncodedFrame]) -> List[EncodedFrame]:
+    """
+    Trim frames to their alpha bounding boxes and report the savings.
+
+    Frames that were already cropped while encoding are kept as-is; others
+    (e.g. loaded from disk) are decoded, trimmed and re-encoded once.
+    """
+    before = sum(w * h for w, h in (frame.cell_size for frame in frames))
+
+    cropped = []
+    for frame in frames:
+        if frame.cell is not None:
+            cropped.append(frame)
+            continue
+        with Image.open(io.BytesIO(frame.png)) as img:
+            img.load()
+            cropped.append(EncodedFrame.from_image(frame.name, img, crop=True))
+
+    after = sum(frame.width * frame.height for frame in cropped)
+    if before > 0:
+        print(f"[INFO] Crop: decoded pixels {before:,} -> {after:,} "
+              f"({100 * (before - after) / before:.0f}% less texture memory)")
+    return cropped
+
+
+# Side of the square tiles compared by --dedupe-tolerance: small enough that a
+# local change (a blink) is not averaged away over the whole frame
+DEDUPE_TILE = 16
+
+
+def _tile_difference(a: "np.ndarray", b: "np.ndarray", tile: int = DEDUPE_TILE) -> float:
+    """
+    Largest per-tile mean absolute difference of two same-sized RGBA arrays.
+
+    Edge tiles are averaged over their actual (smaller) area.
+    """
+    diff = np.abs(a - b).mean(axis=2)
+    starts_y = np.arange(0, diff.shape[0], tile)
+    starts_x = np.arange(0, diff.shape[1], tile)
+    sums = np.add.reduceat(np.add.reduceat(diff, starts_y, axis=0), starts_x, axis=1)
+    heights = np.diff(np.append(starts_y, diff.shape[0]))
+    widths = np.diff(np.append(starts_x, diff.shape[1]))
+    return float((sums / np.outer(heights, widths)).max())
+
+
+def _find_duplicate_frames(frames: List[EncodedFrame], tolerance: float = 0.0) -> List[int]:
+    """
+    Map every frame to the first frame it repeats (or to itself if unique).
+
+    Frames are compared on decoded pixels: an exact SHA-256 match first, then,
+    if tolerance > 0, the mean absolute difference of alpha-premultiplied RGBA
+    in each DEDUPE_TILE tile (see _tile_difference) against each unique frame
+    of the same size. Every tile must be within tolerance, so a change
+    confined to a small region is not averaged out over a large canvas.
+
+    Digests and mean colors come from the sheet's cell statistics when the
+    frames were encoded in memory; frames are only decoded when that is
+    missing or a tolerance comparison cannot be ruled out by mean color
+    (the largest tile difference is never below the mean-color distance).
+    """
+    owners = []
+    by_digest = {}
+    unique = []  # (frame index, mean color, premultiplied pixels) for tolerance matching
+
+    def decode(frame: EncodedFrame) -> "np.ndarray":
+        with Image.open(io.BytesIO(frame.png)) as img:
+            return np.asarray(img.convert('RGBA'))
+
+    for i, frame in enumerate(frames):
+        pixels = None
+        digest = frame.digest
+        if digest is None:
+            pixels = decode(frame)
+            digest = _pixel_digest(pixels)
+        if digest in by_digest:
+            owners.append(by_digest[digest])
+            continue
+
+        owner = i
+        if tolerance > 0:
+            if pixels is None:
+                pixels = decode(frame)
+            premultiplied = _premultiply(pixels)
+            mean = frame.mean_color or tuple(premultiplied.mean(axis=(0, 1)))
+            for j, other_mean, other in unique:
+                bound = sum(abs(a - b) for a, b in zip(mean, other_mean)) / 4
+                if bound > tolerance + 1e-6 or other.shape != premultiplied.shape:
+                    continue
+                if _tile_difference(premultiplied, other) <= tolerance:
+                    owner = j
+                    break
+            if owner == i:
+                unique.append((i, mean, premultiplied))
+
+        by_digest[digest] = owner
+        owners.append(owner)
+
+    return owners
+
+
+def _premultiply(pixels: "np.ndarray") -> "np.ndarray":
+    """Premultiply RGB by alpha so invisible pixels compare as equal."""
+    rgba = pixels.astype(np.float32)
+    rgba[..., :3] *= rgba[..., 3:4] / 255.0
+    return rgba
+
+
+def _data_uri_size(png: bytes) -> int:
+    """Size in bytes of the base64 data URI that would embed this PNG."""
+    return len("data:image/png;base64,") + 4 * ((len(png) + 2) // 3)
+
+
+# =============================================================================
+# LOOP DETECTION
+# =============================================================================
+
+@dataclass
+class LoopSegment:
+    """Best seamless loop found in a frame sequence (indices inclusive)."""
+    start: int
+    end: int
+    frame_count: int
+    # |distance(end -> start) - typical step| / typical step; 0 = seam looks
+    # exactly like an ordinary frame-to-frame step
+    seam_cost: float
+
+    @property
+    def intro(self) -> int:
+        return self.start
+
+    @property
+    def outro(self) -> int:
+        return self.frame_count - 1 - self.end
+
+    @property
+    def seamless(self) -> bool:
+        return self.seam_cost <= LOOP_MAX_SEAM_COST
+
+
+# Seam costs above this are reported as "no seamless loop" and never trimmed
+LOOP_MAX_SEAM_COST = 1.0
+
+
+def frame_similarity_matrix(frames: Sequence[EncodedFrame], size: int = 48) -> "np.ndarray":
+    """
+    RMS distance between every pair of frames (0-255 scale).
+
+    Each frame is placed on its cell (honouring crop offsets), reduced to a
+    small alpha-premultiplied thumbnail, and flattened; all pairwise
+    distances then come from one Gram-matrix product.
+    """
+    cell_w, cell_h = frames[0].cell_size
+    scale = size / max(cell_w, cell_h)
+    thumb_size = (max(1, round(cell_w * scale)), max(1, round(cell_h * scale)))
+
+    vectors = np.empty((len(frames), thumb_size[0] * thumb_size[1] * 4), dtype=np.float32)
+    for i, frame in enumerate(frames):
+        with Image.open(io.BytesIO(frame.png)) as img:
+            canvas = Image.new('RGBA', frame.cell_size)
+            canvas.paste(img.convert('RGBA'), (frame.x, frame.y))
+        thumb = canvas.convert('RGBa').resize(thumb_size, Image.BOX)
+        vectors[i] = np.asarray(thumb, dtype=np.float32).ravel()
+
+    norms = (vectors ** 2).sum(axis=1)
+    squared = norms[:, None] + norms[None, :] - 2.0 * (vectors @ vectors.T)
+    return np.sqrt(np.clip(squared, 0, None) / vectors.shape[1])
+
+
+def find_loop_segment(
+    distances: "np.ndarray",
+    min_loop: Optional[int] = None,
+    drop_penalty: float = 1.0
+) -> LoopSegment:
+    """
+    Pick the loop [start, end] whose wrap-around looks like a normal step.
+
+    Every (start, end) pair is scored at once: the seam cost compares the
+    jump end -> start with the median consecutive-frame distance, plus
+    drop_penalty times the fraction of frames left outside the loop, so a
+    shorter loop only wins when its seam is clearly smoother.
+
+    Args:
+        distances: Frame distance matrix (frame_similarity_matrix)
+        min_loop: Shortest loop considered (default: a third of the frames, >= 4)
+        drop_penalty: Cost of leaving every frame out of the loop
+
+    Returns:
+        LoopSegment with the best start/end and its seam cost
+    """
+    n = distances.shape[0]
+    if n < 3:
+        return LoopSegment(start=0, end=n - 1, frame_count=n, seam_cost=0.0)
+
+    min_loop = min(n, max(4, n // 3) if min_loop is None else min_loop)
+    steps = np.diagonal(distances, offset=1)
+    step = float(np.median(steps)) or 1.0
+
+    starts, ends = np.meshgrid(np.arange(n), np.arange(n), indexing='ij')
+    length = ends - starts + 1
+    seam = np.abs(distances.T - step) / step  # seam[s, e] uses distance e -> s
+    total = seam + drop_penalty * (n - length) / n
+    total[length < min_loop] = np.inf
+
+    start, end = np.unravel_index(np.argmin(total), total.shape)
+    return LoopSegment(
+        start=int(start), end=int(end), frame_count=n, seam_cost=round(float(seam[start, end]), 3)
+    )
+
+
+def loop_markers(segment: LoopSegment, times: Sequence[int]) -> List[dict]:
+    """
+    Lottie markers (intro / loop / outro) for a loop segment.
+
+    Args:
+        segment: Detected loop
+        times: Lottie start frame of every sprite frame, plus the end frame
+    """
+    def marker(name: str, first: int, last: int) -> dict:
+        return {"tm": times[first], "cm": name, "dr": times[last + 1] - times[first]}
+
+    markers = []
+    if segment.intro:
+        markers.append(marker("intro", 0, segment.start - 1))
+    markers.append(marker("loop", segment.start, segment.end))
+    if segment.outro:
+        markers.append(marker("outro", segment.end + 1, segment.frame_count - 1))
+    return markers
+
+
+# =============================================================================
+# TEMPORAL DECIMATION
+# =============================================================================
+
+@dataclass
+class DecimationReport:
+    """Frames kept, embedded bytes saved and motion error for one animation."""
+    frames: int = 0
+    kept: int = 0
+    bytes_saved: int = 0
+    # RMS difference (0-255) between each dropped frame and the frame shown
+    max_error: float = 0.0
+    mean_error: float = 0.0
+
+    @classmethod
+    def measure(
+        cls,
+        frames: Sequence[EncodedFrame],
+        keep: Sequence[int],
+        distances: "np.ndarray"
+    ) -> "DecimationReport":
+        errors = distances[np.asarray(keep), np.arange(len(frames))]
+        dropped = [i for i, k in enumerate(keep) if k != i]
+        return cls(
+            frames=len(frames),
+            kept=len(frames) - len(dropped),
+            bytes_saved=sum(_data_uri_size(frames[i].png) for i in dropped),
+            max_error=round(float(errors.max()), 2),
+            mean_error=round(float(errors.mean()), 2),
+        )
+
+    def print_report(self) -> None:
+        print(f"[INFO] Decimate: kept {self.kept}/{self.frames} frames, "
+              f"saved {self.bytes_saved:,} bytes ({self.bytes_saved / 1024:.1f} KB)")
+        print(f"[INFO] Decimate: motion error max {self.max_error:.1f}, "
+              f"mean {self.mean_error:.2f} (RMS, 0-255)")
+
+
+def select_keyframes(distances: "np.ndarray", max_error: float) -> List[int]:
+    """
+    Choose which frames to embed.
+
+    Walks the sequence measuring the motion accumulated since the last kept
+    frame (its distance to the current one); a frame is kept as soon as
+    showing the last kept frame in its place would differ by more than
+    max_error. The first frame is always kept, so still stretches collapse
+    into one long hold while fast motion keeps every frame.
+
+    Returns:
+        keep[i] = index of the frame displayed at frame i's time (i if kept)
+    """
+    keep = [0]
+    current = 0
+    for i in range(1, distances.shape[0]):
+        if distances[current, i] > max_error:
+            current = i
+        keep.append(current)
+    return keep
+
+
+# =============================================================================
+# DELTA ENCODING
+# =============================================================================
+
+@dataclass
+class DeltaReport:
+    """Static/changing pixel split and embedded size of a delta-encoded animation."""
+    frames: int = 0
+    static_pixels: int = 0
+    cell_pixels: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+    verified: bool = False
+
+    def print_report(self) -> None:
+        saved = self.bytes_before - self.bytes_after
+        percent = 100 * saved / self.bytes_before if self.bytes_before else 0
+        static = 100 * self.static_pixels / self.cell_pixels if self.cell_pixels else 0
+        print(f"[INFO] Delta: {self.frames} frames over one base, "
+              f"{static:.1f}% of the cell static")
+        print(f"[INFO] Delta: {self.bytes_before:,} -> {self.bytes_after:,} bytes "
+              f"({percent:.0f}% smaller), pixel-exact: {'yes' if self.verified else 'NO'}")
+
+
+def encode_delta_frames(
+    frames: Sequence[EncodedFrame]
+) -> Tuple[EncodedFrame, List[EncodedFrame], DeltaReport]:
+    """
+    Split an animation into one base image and small per-frame patches.
+
+    Pixels that are identical in every frame (RGB under zero alpha ignored)
+    go into the base; each frame keeps only its remaining pixels, trimmed to
+    their bounding box. The base is transparent wherever any frame differs
+    and each patch is transparent wherever the base is drawn, so a patch
+    composited over the base reproduces its frame exactly, including
+    semi-transparent edges (nothing is ever blended twice).
+
+    Repeated frame objects (e.g. decimated holds) are encoded once and the
+    returned patch list repeats the same object, so owner indices built on
+    the input frames stay valid.
+
+    Args:
+        frames: Frames of one animation sharing a cell size
+
+    Returns:
+        Tuple of (base frame, patch per input frame, DeltaReport)
+    """
+    cell = frames[0].cell_size
+    if any(frame.cell_size != cell for frame in frames):
+        raise ValueError("Delta encoding needs frames with the same cell size")
+
+    unique = list({id(frame): frame for frame in frames}.values())
+    canvases = np.stack([_frame_canvas(frame) for frame in unique])
+    static = (canvases == canvases[0]).all(axis=(0, 3))
+
+    base = EncodedFrame.from_image(
+        "base", Image.fromarray(np.where(static[..., None], canvases[0], 0)), crop=True
+    )
+    patches = {}
+    for frame, canvas in zip(unique, canvases):
+        pixels = np.where(static[..., None], 0, canvas)
+        patches[id(frame)] = EncodedFrame.from_image(frame.name, Image.fromarray(pixels), crop=True)
+
+    report = DeltaReport(
+        frames=len(unique),
+        static_pixels=int(static.sum()),
+        cell_pixels=static.size,
+        bytes_before=sum(len(frame.png) for frame in unique),
+        bytes_after=len(base.png) + sum(len(patch.png) for patch in patches.values()),
+    )
+    report.verified = all(
+        verify_delta_frame(base, patches[id(frame)], canvas)
+        for frame, canvas in zip(unique, canvases)
+    )
+    return base, [patches[id(frame)] for frame in frames], report
+
+
+def verify_delta_frame(base: EncodedFrame, patch: EncodedFrame, expected: "np.ndarray") -> bool:
+    """
+    Check that patch-over-base renders exactly the expected cell pixels.
+
+    Both images are decoded from their PNG bytes and alpha-composited the
+    way a Lottie player stacks the layers; RGB under zero alpha is ignored.
+    """
+    rendered = np.asarray(Image.alpha_composite(
+        Image.fromarray(_frame_canvas(base)), Image.fromarray(_frame_canvas(patch))
+    ))
+    return bool(np.array_equal(_clear_transparent(rendered), expected))
+
+
+def _frame_canvas(frame: EncodedFrame) -> "np.ndarray":
+    """Decode a frame onto its full transparent cell (RGB cleared under zero alpha)."""
+    width, height = frame.cell_size
+    canvas = np.zeros((height, width, 4), dtype=np.uint8)
+    with Image.open(io.BytesIO(frame.png)) as img:
+        canvas[frame.y:frame.y + frame.height, frame.x:frame.x + frame.width] = (
+            np.asarray(img.convert('RGBA'))
+        )
+    return _clear_transparent(canvas)
+
+
+def _clear_transparent(pixels: "np.ndarray") -> "np.ndarray":
+    """Zero RGB under fully transparent pixels so invisible color never differs."""
+    return np.where(pixels[..., 3:4] == 0, 0, pixels).astype(np.uint8)
+
+
+# =============================================================================
+# ATLAS MODE
+# =============================================================================
+
+# Transparent gutter between atlas entries so scaled sampling never bleeds
+ATLAS_PADDING = 2
+
+# Largest texture side guaranteed on every supported device
+ATLAS_MAX_SIZE = 4096
+
+
+@dataclass
+class AtlasAnimation:
+    """One atlas image plus the masked precomp that steps through it."""
+    image: EncodedFrame
+    # Precomp asset holding the atlas layer, and the main-comp layer showing it
+    precomp: dict
+    layer: dict
+    entries: int = 0
+    # Round-trip result: largest premultiplied per-channel difference (0-255)
+    # between the rendered atlas frames and the per-frame output
+    max_error: float = 0.0
+    verified: bool = False
+
+    def print_report(self) -> None:
+        print(f"[INFO] Atlas: {self.entries} frames in one {self.image.width}x{self.image.height} "
+              f"image, {len(self.image.png):,} bytes")
+        print(f"[INFO] Atlas: round-trip max pixel error {self.max_error:.1f} "
+              f"({'ok' if self.verified else 'MISMATCH'})")
+        if max(self.image.width, self.image.height) > ATLAS_MAX_SIZE:
+            print(f"[WARN] Atlas exceeds {ATLAS_MAX_SIZE}px; older devices may not load it")
+
+
+def pack_atlas(
+    sizes: Sequence[Tuple[int, int]],
+    padding: int = ATLAS_PADDING
+) -> Tuple[List[Tuple[int, int]], Tuple[int, int]]:
+    """
+    Shelf-pack rectangles into a roughly square atlas.
+
+    Rectangles are placed tallest first, left to right on shelves as wide as
+    the square root of the total (padded) area, never narrower than the
+    widest rectangle.
+
+    Args:
+        sizes: (width, height) of each rectangle
+        padding: Gap kept between rectangles
+
+    Returns:
+        Tuple of (top-left position per rectangle in input order, atlas size)
+    """
+    area = sum((w + padding) * (h + padding) for w, h in sizes)
+    shelf_width = max(max(w for w, _ in sizes), int(np.ceil(np.sqrt(area))))
+
+    positions = [(0, 0)] * len(sizes)
+    x = y = shelf_height = width = 0
+    for i in sorted(range(len(sizes)), key=lambda i: -sizes[i][1]):
+        w, h = sizes[i]
+        if x and x + w > shelf_width:
+            x, y = 0, y + shelf_height + padding
+            shelf_height = 0
+        positions[i] = (x, y)
+        x += w + padding
+        shelf_height = max(shelf_height, h)
+        width = max(width, x - padding)
+    return positions, (width, y + shelf_height)
+
+
+def build_atlas_animation(
+    frames: Sequence[EncodedFrame],
+    owners: Sequence[int],
+    times: Sequence[int],
+    origin: Tuple[int, int],
+    canvas: Tuple[int, int],
+    optimize: bool = False,
+    max_error: float = 32.0
+) -> AtlasAnimation:
+    """
+    Pack an animation's frames into one atlas and step through it.
+
+    Every embedded frame (owners[i] == i) is placed once in the atlas. The
+    main composition gets a single precomp layer whose rectangular mask
+    covers the current frame's image; inside the precomp, the atlas image
+    layer's position uses hold keyframes to slide the current frame under
+    that mask. Runs of identical frames share one keyframe.
+
+    The result is checked by rendering every frame from the emitted
+    keyframes and the decoded atlas PNG and comparing it to the per-frame
+    output (AtlasAnimation.verified): pixel-exact, or within max_error when
+    the atlas was re-encoded by optimize_frames().
+
+    Args:
+        frames: Frames of the animation, in order
+        owners: owners[i] = index of the frame whose pixels frame i shows
+        times: Lottie frame where sprite frame i starts (len(frames) + 1)
+        origin: Canvas origin inside the cell
+        canvas: Canvas (width, height)
+        optimize: Re-encode the atlas with optimize_frames(); the frames
+                  were already optimized, so the atlas is usually indexed
+        max_error: Largest per-channel error allowed by optimize
+
+    Returns:
+        AtlasAnimation
+    """
+    unique = sorted(set(owners))
+    positions, (atlas_width, atlas_height) = pack_atlas(
+        [(frames[i].width, frames[i].height) for i in unique]
+    )
+    placement = dict(zip(unique, positions))
+
+    atlas_pixels = np.zeros((atlas_height, atlas_width, 4), dtype=np.uint8)
+    for i in unique:
+        x, y = placement[i]
+        atlas_pixels[y:y + frames[i].height, x:x + frames[i].width] = _decode_frame_pixels(frames[i])
+    image = EncodedFrame.from_image("atlas", Image.fromarray(atlas_pixels))
+    if optimize:
+        optimized, report = optimize_frames([image], max_error)
+        image = optimized[0]
+        report.print_report()
+
+    # One hold keyframe per run of identical frames at the same cell offset
+    origin_x, origin_y = origin
+    run_keys = [(owners[i], frame.x, frame.y) for i, frame in enumerate(frames)]
+    position_keys, mask_keys = [], []
+    for start, _ in _frame_runs(run_keys):
+        frame = frames[start]
+        atlas_x, atlas_y = placement[owners[start]]
+        left, top = frame.x - origin_x, frame.y - origin_y
+        position_keys.append({"t": times[start], "s": [left - atlas_x, top - atlas_y, 0], "h": 1})
+        mask_keys.append({"t": times[start], "s": [_rect_shape(left, top, frame.width, frame.height)], "h": 1})
+
+    total = times[-1]
+    atlas_layer = _image_layer(
+        ind=1,
+        name="Atlas",
+        ref_id="atlas",
+        in_point=0,
+        out_point=total,
+        anchor=[0, 0, 0],
+        position=[0, 0, 0],
+    )
+    atlas_layer["ks"]["p"] = _hold_property(position_keys)
+
+    width, height = canvas
+    layer = {
+        "ddd": 0,
+        "ind": 1,
+        "ty": 0,  # Precomp layer type
+        "nm": "Atlas Frames",
+        "refId": "atlas_comp",
+        "sr": 1,
+        "ks": {
+            "o": {"a": 0, "k": 100},
+            "r": {"a": 0, "k": 0},
+            "a": {"a": 0, "k": [0, 0, 0]},
+            "p": {"a": 0, "k": [0, 0, 0]},
+            "s": {"a": 0, "k": [100, 100, 100]}
+        },
+        "hasMask": True,
+        "masksProperties": [{
+            "inv": False,
+            "mode": "a",  # Add: only the masked rectangle is visible
+            "pt": _hold_property(mask_keys, shape=True),
+            "o": {"a": 0, "k": 100},
+            "x": {"a": 0, "k": 0},
+            "nm": "Frame"
+        }],
+        "w": width,
+        "h": height,
+        "ip": 0,
+        "op": total,
+        "st": 0
     }
 
-    # Save to file
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(lottie, f, indent=2)
+    atlas = AtlasAnimation(
+        image=image,
+        precomp={"id": "atlas_comp", "nm": "Atlas", "layers": [atlas_layer]},
+        layer=layer,
+        entries=len(unique),
+    )
+    atlas.max_error = verify_atlas_animation(atlas, frames, owners, times, origin, canvas)
+    atlas.verified = atlas.max_error <= (max_error if optimize else 0.0)
+    return atlas
+
+
+def verify_atlas_animation(
+    atlas: AtlasAnimation,
+    frames: Sequence[EncodedFrame],
+    owners: Sequence[int],
+    times: Sequence[int],
+    origin: Tuple[int, int],
+    canvas: Tuple[int, int]
+) -> float:
+    """
+    Render every frame of an atlas animation and compare it to the per-frame output.
 
-    file_size = output_path.stat().st_size
-    print(f"[OK] Created Lottie: {output_path}")
-    print(f"[INFO] File size: {file_size:,} bytes ({file_size / 1024:.1f} KB)")
+    The atlas is decoded from its PNG bytes; at each frame's start time the
+    hold keyframes give the atlas position and mask rectangle, exactly as a
+    player evaluates them. The expected image is what the per-frame Lottie
+    shows at that time: the owner frame's pixels at the frame's cell offset.
+
+    Returns:
+        Largest per-channel difference of alpha-premultiplied RGBA (0 = exact)
+    """
+    with Image.open(io.BytesIO(atlas.image.png)) as img:
+        atlas_pixels = _clear_transparent(np.asarray(img.convert('RGBA')))
+
+    width, height = canvas
+    position_prop = atlas.precomp["layers"][0]["ks"]["p"]
+    mask_prop = atlas.layer["masksProperties"][0]["pt"]
+    decoded = {}
+    worst = 0.0
+
+    for i, frame in enumerate(frames):
+        t = times[i]
+        offset_x, offset_y, _ = _hold_value(position_prop, t)
+        shape = _hold_value(mask_prop, t)
+        shape = shape[0] if isinstance(shape, list) else shape
+        (left, top), (right, bottom) = shape["v"][0], shape["v"][2]
+
+        rendered = np.zeros((height, width, 4), dtype=np.uint8)
+        rendered[top:bottom, left:right] = atlas_pixels[
+            top - offset_y:bottom - offset_y, left - offset_x:right - offset_x
+        ]
+
+        owner = owners[i]
+        if owner not in decoded:
+            decoded[owner] = _decode_frame_pixels(frames[owner])
+        expected = np.zeros((height, width, 4), dtype=np.uint8)
+        x, y = frame.x - origin[0], frame.y - origin[1]
+        expected[y:y + frame.height, x:x + frame.width] = decoded[owner]
+
+        if not np.array_equal(rendered, expected):
+            worst = max(worst, float(np.abs(_premultiply(rendered) - _premultiply(expected)).max()))
+    return worst
+
+
+def _rect_shape(left: int, top: int, width: int, height: int) -> dict:
+    """Closed rectangular Lottie bezier path (straight edges)."""
+    right, bottom = left + width, top + height
+    return {
+        "c": True,
+        "v": [[left, top], [right, top], [right, bottom], [left, bottom]],
+        "i": [[0, 0]] * 4,
+        "o": [[0, 0]] * 4
+    }
+
+
+def _hold_property(keyframes: List[dict], shape: bool = False) -> dict:
+    """Animated property from hold keyframes, or static if it never changes."""
+    if len(keyframes) == 1:
+        value = keyframes[0]["s"]
+        return {"a": 0, "k": value[0] if shape else value}
+    return {"a": 1, "k": keyframes}
 
-    return output_path
+
+def _hold_value(prop: dict, t: float) -> Any:
+    """Value of a static or hold-keyframed property at Lottie frame t."""
+    if not prop["a"]:
+        return prop["k"]
+    value = prop["k"][0]["s"]
+    for key in prop["k"]:
+        if key["t"] <= t:
+            value = key["s"]
+    return value
 
 
 # =============================================================================
@@ -562,7 +3550,12 @@ def process_ludo_asset(
     fps: int = 30,
     frame_hold: int = 2,
     grid: Optional[Tuple[int, int]] = None,
-    keep_frames: bool = False
+    keep_frames: bool = False,
+    in_memory: bool = False,
+    lottie_options: Optional[LottieOptions] = None,
+    layout: str = "grid",
+    scales: Optional[Sequence[float]] = None,
+    max_memory: Optional[int] = None
 ) -> Path:
     """
     Main entry point - process a Ludo.ai ZIP or sprite sheet PNG to Lottie.
@@ -573,81 +3566,764 @@ def process_ludo_asset(
     3. Extract individual frames
     4. Generate Lottie JSON with embedded frames
 
-    Args:
-        input_path: Path to ZIP file or sprite sheet PNG
-        output_path: Path for the output Lottie JSON file
-        fps: Frames per second (default 30)
-        frame_hold: Frames to hold each sprite (default 2)
-        grid: Optional (rows, cols) tuple; auto-detected if None
-        keep_frames: If True, keep extracted frames in a subdirectory
+    Args:
+        input_path: Path to ZIP file or sprite sheet PNG
+        output_path: Path for the output Lottie JSON file
+        fps: Frames per second (default 30)
+        frame_hold: Frames to hold each sprite (default 2)
+        grid: Optional (rows, cols) tuple; auto-detected if None
+        keep_frames: If True, keep extracted frames in a subdirectory
+        in_memory: If True, decode the sheet straight from the ZIP and encode
+                   frames to PNG buffers; no temp directory or frame files
+                   are written (unless keep_frames asks for them)
+        lottie_options: Optional LottieOptions for the Lottie stage
+        layout: "grid" for uniform cells, or "sprites" to find sprites on an
+                irregularly packed sheet by connected components (grid is
+                ignored)
+        scales: Optional extra resolution variants (e.g. [0.667, 0.5]); each
+                gets its own Lottie next to output_path plus a shared
+                manifest (see create_lottie_variants)
+        max_memory: Peak-memory ceiling in bytes for decoding the sheet; the
+                    sheet is then decoded one band of cell rows at a time
+                    and frames are encoded in memory (grid layout only)
+
+    Returns:
+        Path to the created Lottie JSON file
+
+    Example:
+        >>> process_ludo_asset(
+        ...     Path("character_walk.zip"),
+        ...     Path("character_walk.json"),
+        ...     fps=24,
+        ...     frame_hold=3
+        ... )
+    """
+    print("=" * 60)
+    print("SPRITE SHEET PROCESSOR - Ludo.ai to Lottie")
+    print("=" * 60)
+    print(f"Input: {input_path}")
+    print(f"Output: {output_path}")
+    print()
+
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown layout '{layout}' (expected one of {', '.join(LAYOUTS)})")
+
+    if max_memory is not None:
+        return _process_ludo_asset_bounded(
+            input_path, output_path, fps, frame_hold, grid, keep_frames, lottie_options, layout,
+            scales, max_memory
+        )
+
+    if in_memory:
+        return _process_ludo_asset_in_memory(
+            input_path, output_path, fps, frame_hold, grid, keep_frames, lottie_options, layout,
+            scales
+        )
+
+    # Determine working directory for temp files
+    work_dir = output_path.parent / f".{output_path.stem}_temp"
+    frames_dir = output_path.parent / f"{output_path.stem}_frames"
+
+    try:
+        # Step 1: Get sprite sheet path
+        with progress_stage("read"):
+            if input_path.suffix.lower() == '.zip':
+                spritesheet_path = extract_zip(input_path, work_dir)
+            elif input_path.suffix.lower() == '.png':
+                spritesheet_path = input_path
+            else:
+                raise ValueError(f"Unsupported input format: {input_path.suffix}")
+
+        if layout == "sprites":
+            # Steps 2-3: Locate and extract sprites (no grid)
+            with progress_stage("frames") as stage:
+                frames = extract_sprites(spritesheet_path, frames_dir)
+                stage["frames"] = len(frames)
+        else:
+            # Step 2: Detect grid if not provided
+            with progress_stage("detect_grid") as stage, Image.open(spritesheet_path) as img:
+                if grid is None:
+                    grid = detect_grid(img)
+                else:
+                    print(f"[INFO] Using provided grid: {grid[0]}x{grid[1]}")
+                stage["grid"] = f"{grid[0]}x{grid[1]}"
+
+            # Step 3: Extract frames
+            with progress_stage("frames") as stage:
+                frames = extract_frames(spritesheet_path, grid, frames_dir)
+                stage["frames"] = len(frames)
+
+        if not frames:
+            raise ValueError("No valid frames extracted from sprite sheet")
+
+        # Step 4: Create Lottie
+        with progress_stage("lottie") as stage:
+            result = create_lottie(frames, output_path, fps, frame_hold, lottie_options)
+            stage["bytes"] = result.stat().st_size
+
+        # Step 5: Resolution variants (one more decode, shared by all scales)
+        manifest = None
+        if scales:
+            with progress_stage("variants", scales=list(scales)), Image.open(spritesheet_path) as img:
+                img.load()
+                manifest = create_lottie_variants(
+                    img, result, scales, fps, frame_hold, grid, layout, lottie_options
+                )
+
+        print()
+        print("=" * 60)
+        print("[DONE] Processing complete!")
+        print(f"  Lottie file: {result}")
+        if manifest:
+            print(f"  Variants manifest: {manifest}")
+        if keep_frames:
+            print(f"  Frames directory: {frames_dir}")
+        print("=" * 60)
+
+        return result
+
+    finally:
+        # Cleanup temp files
+        if work_dir.exists():
+            import shutil
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        # Cleanup frames unless keeping them
+        if not keep_frames and frames_dir.exists():
+            import shutil
+            shutil.rmtree(frames_dir, ignore_errors=True)
+
+
+def _process_ludo_asset_in_memory(
+    input_path: Path,
+    output_path: Path,
+    fps: int,
+    frame_hold: int,
+    grid: Optional[Tuple[int, int]],
+    keep_frames: bool,
+    lottie_options: Optional[LottieOptions] = None,
+    layout: str = "grid",
+    scales: Optional[Sequence[float]] = None
+) -> Path:
+    """
+    In-memory variant of process_ludo_asset().
+
+    The sprite sheet is decoded once, every frame is PNG-encoded once, and the
+    encoded buffers go straight into create_lottie().
+    """
+    # Step 1: Decode sprite sheet
+    with progress_stage("read"):
+        if input_path.suffix.lower() == '.zip':
+            spritesheet = read_spritesheet_from_zip(input_path)
+        elif input_path.suffix.lower() == '.png':
+            spritesheet = Image.open(input_path)
+            spritesheet.load()
+        else:
+            raise ValueError(f"Unsupported input format: {input_path.suffix}")
+
+    crop = lottie_options is not None and (lottie_options.crop or lottie_options.crop_canvas)
+
+    if layout == "sprites":
+        # Steps 2-3: Locate and encode sprites (no grid)
+        with progress_stage("frames") as stage:
+            frames = encode_sprites(spritesheet, crop=crop)
+            stage["frames"] = len(frames)
+    else:
+        # Step 2: Detect grid if not provided
+        with progress_stage("detect_grid") as stage:
+            if grid is None:
+                grid = detect_grid(spritesheet)
+            else:
+                print(f"[INFO] Using provided grid: {grid[0]}x{grid[1]}")
+            stage["grid"] = f"{grid[0]}x{grid[1]}"
+
+        # Step 3: Encode frames (cropping here avoids a second encode later)
+        with progress_stage("frames") as stage:
+            frames = encode_frames(spritesheet, grid, crop=crop)
+            stage["frames"] = len(frames)
+
+    if not frames:
+        raise ValueError("No valid frames extracted from sprite sheet")
+
+    # Frames are only written out when explicitly requested
+    frames_dir = output_path.parent / f"{output_path.stem}_frames"
+    if keep_frames:
+        frames_dir.mkdir(parents=True, exist_ok=True)
+        for frame in frames:
+            (frames_dir / frame.name).write_bytes(frame.png)
+
+    # Step 4: Create Lottie
+    with progress_stage("lottie") as stage:
+        result = create_lottie(frames, output_path, fps, frame_hold, lottie_options)
+        stage["bytes"] = result.stat().st_size
+
+    # Step 5: Resolution variants from the same decoded sheet
+    manifest = None
+    if scales:
+        with progress_stage("variants", scales=list(scales)):
+            manifest = create_lottie_variants(
+                spritesheet, result, scales, fps, frame_hold, grid, layout, lottie_options
+            )
+
+    print()
+    print("=" * 60)
+    print("[DONE] Processing complete!")
+    print(f"  Lottie file: {result}")
+    if manifest:
+        print(f"  Variants manifest: {manifest}")
+    if keep_frames:
+        print(f"  Frames directory: {frames_dir}")
+    print("=" * 60)
+
+    return result
+
+
+def check_bounded_options(
+    layout: str,
+    scales: Optional[Sequence[float]],
+    lottie_options: Optional[LottieOptions]
+) -> None:
+    """
+    Reject settings that --max-memory cannot bound.
+
+    The ceiling is enforced while the sheet is decoded band by band. These
+    settings work on the whole sheet or decode every frame at once
+    afterwards, so they would blow past it unchecked.
+
+    Raises:
+        ValueError: Naming the first incompatible setting
+    """
+    if layout != "grid":
+        raise ValueError("--max-memory needs the grid layout (sprite search sees the whole sheet)")
+    if scales:
+        raise ValueError("--max-memory cannot be combined with --scales (variants resample the whole sheet)")
+
+    options = lottie_options or LottieOptions()
+    unbounded = [
+        ("--atlas", options.atlas),
+        ("--optimize", options.optimize),
+        ("--delta", options.delta),
+        ("--dedupe-tolerance", options.dedupe and options.dedupe_tolerance > 0),
+    ]
+    for flag, enabled in unbounded:
+        if enabled:
+            raise ValueError(f"--max-memory cannot be combined with {flag} "
+                             f"(it decodes every frame at once)")
+
+
+def _process_ludo_asset_bounded(
+    input_path: Path,
+    output_path: Path,
+    fps: int,
+    frame_hold: int,
+    grid: Optional[Tuple[int, int]],
+    keep_frames: bool,
+    lottie_options: Optional[LottieOptions],
+    layout: str,
+    scales: Optional[Sequence[float]],
+    max_memory: int
+) -> Path:
+    """
+    Bounded-memory variant of process_ludo_asset().
+
+    The sheet is streamed from the PNG (or straight out of the ZIP) one band
+    of cell rows at a time, so its decoded size never has to fit in memory.
+    Without a grid, one extra banded pass detects it. The ceiling covers
+    decoding; the encoded frames and the Lottie are held as usual, so the
+    summary also prints the process peak RSS.
+    """
+    check_bounded_options(layout, scales, lottie_options)
+    if input_path.suffix.lower() not in ('.zip', '.png'):
+        raise ValueError(f"Unsupported input format: {input_path.suffix}")
+
+    report = MemoryReport(ceiling=max_memory)
+    print(f"[INFO] Memory ceiling: {format_bytes(max_memory)}")
+
+    # Step 2: Detect grid if not provided (one banded pass)
+    with progress_stage("detect_grid") as stage:
+        if grid is None:
+            grid = analyze_grid_banded(input_path, report).grid
+        else:
+            print(f"[INFO] Using provided grid: {grid[0]}x{grid[1]}")
+        stage["grid"] = f"{grid[0]}x{grid[1]}"
+
+    # Step 3: Encode frames band by band
+    crop = lottie_options is not None and (lottie_options.crop or lottie_options.crop_canvas)
+    with progress_stage("frames") as stage:
+        frames = encode_frames_banded(input_path, grid, report, crop=crop)
+        stage.update(frames=len(frames), bands=report.bands, peak_bytes=report.peak_bytes)
+
+    if not frames:
+        raise ValueError("No valid frames extracted from sprite sheet")
+
+    frames_dir = output_path.parent / f"{output_path.stem}_frames"
+    if keep_frames:
+        frames_dir.mkdir(parents=True, exist_ok=True)
+        for frame in frames:
+            (frames_dir / frame.name).write_bytes(frame.png)
+
+    # Step 4: Create Lottie
+    with progress_stage("lottie") as stage:
+        result = create_lottie(frames, output_path, fps, frame_hold, lottie_options)
+        stage["bytes"] = result.stat().st_size
+
+    print()
+    print("=" * 60)
+    print("[DONE] Processing complete!")
+    print(f"  Lottie file: {result}")
+    print(f"  Decode peak: {format_bytes(report.peak_bytes)} (ceiling {format_bytes(max_memory)})")
+    rss = peak_rss()
+    if rss is not None:
+        print(f"  Process peak RSS: {format_bytes(rss)}")
+    if keep_frames:
+        print(f"  Frames directory: {frames_dir}")
+    print("=" * 60)
+
+    return result
+
+
+# Manifest listing every resolution variant of one animation
+VARIANT_MANIFEST_SUFFIX = ".variants.json"
+
+
+def variant_path(output_path: Path, scale: float) -> Path:
+    """Lottie path for a resolution variant, e.g. bennie_waving_x0.5.json."""
+    if scale == 1.0:
+        return output_path
+    return output_path.with_name(f"{output_path.stem}_x{scale:g}{output_path.suffix}")
+
+
+def create_lottie_variants(
+    spritesheet: Image.Image,
+    native_path: Path,
+    scales: Sequence[float],
+    fps: int,
+    frame_hold: int,
+    grid: Optional[Tuple[int, int]],
+    layout: str = "grid",
+    lottie_options: Optional[LottieOptions] = None
+) -> Path:
+    """
+    Write downscaled Lottie variants of an already-created animation.
+
+    Frames for every scale are resampled from the same decoded sheet, so
+    the sheet is never re-read. The manifest lists all variants (including
+    the native file) smallest first, so the app can load the first one at
+    least as large as its display size.
+
+    Args:
+        spritesheet: Decoded sprite sheet image
+        native_path: The full-resolution Lottie already written
+        scales: Scale factors (1.0 entries refer to the native file)
+        fps: Frames per second
+        frame_hold: Frames to hold each sprite
+        grid: (rows, cols) for layout="grid"
+        layout: "grid" or "sprites"
+        lottie_options: Optional LottieOptions, same as the native file
+
+    Returns:
+        Path to the variants manifest (<name>.variants.json)
+    """
+    crop = lottie_options is not None and (lottie_options.crop or lottie_options.crop_canvas)
+
+    variants = [(1.0, native_path)]
+    for scale in sorted(set(scales), reverse=True):
+        if scale == 1.0:
+            continue
+        if not 0 < scale < 1:
+            raise ValueError(f"Variant scale must be between 0 and 1: {scale}")
+
+        print()
+        print(f"[INFO] Creating {scale:g}x variant")
+        if layout == "sprites":
+            frames = encode_sprites(spritesheet, crop=crop, scale=scale)
+        else:
+            frames = encode_frames(spritesheet, grid, crop=crop, scale=scale)
+        path = create_lottie(frames, variant_path(native_path, scale), fps, frame_hold, lottie_options)
+        variants.append((scale, path))
+
+    entries = []
+    for scale, path in variants:
+        lottie = load_lottie(path)
+        entries.append({
+            "file": path.name,
+            "scale": scale,
+            "width": lottie["w"],
+            "height": lottie["h"],
+            "bytes": path.stat().st_size,
+        })
+    entries.sort(key=lambda entry: entry["width"])
+
+    manifest_path = native_path.with_name(native_path.stem + VARIANT_MANIFEST_SUFFIX)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            "animation": native_path.stem,
+            "fps": fps,
+            "variants": entries,
+        }, f, indent=2)
+
+    print(f"[OK] Wrote {len(entries)} variants: {manifest_path}")
+    for entry in entries:
+        print(f"  {entry['file']}: {entry['width']}x{entry['height']}, {entry['bytes']:,} bytes")
+    return manifest_path
+
+
+# =============================================================================
+# CHARACTER MERGE
+# =============================================================================
+
+@dataclass
+class MergeReport:
+    """Segments, shared images and embedded PNG size of a merged character file."""
+    states: int = 0
+    images: int = 0
+    shared: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+
+    def print_report(self) -> None:
+        saved = self.bytes_before - self.bytes_after
+        percent = 100 * saved / self.bytes_before if self.bytes_before else 0
+        print(f"[INFO] Merge: {self.states} states, {self.images} images embedded, "
+              f"{self.shared} shared")
+        print(f"[INFO] Merge: PNG data {self.bytes_before:,} -> {self.bytes_after:,} bytes "
+              f"({percent:.0f}% smaller)")
+
+
+def merge_lottie_animations(
+    states: Sequence[Tuple[str, Path]],
+    output_path: Path,
+    compact: bool = False
+) -> Path:
+    """
+    Merge several animations of one character into a single Lottie.
+
+    States are laid out one after another on the timeline and each gets a
+    marker named after it spanning its frames, so the app can load one file
+    and play segments by name. Markers already in an input (e.g. loop
+    markers) are kept as "<state>/<name>". Layers move in time by shifting
+    their ip/op/st, so keyframes and precomps (atlas mode) keep working
+    unchanged; they are centered horizontally and bottom-aligned on the
+    largest canvas. Images whose decoded pixels are identical are embedded
+    once and shared by every state that shows them.
+
+    Args:
+        states: (state name, Lottie .json/.lottie path) in timeline order
+        output_path: Merged file; a .lottie suffix writes a dotLottie container
+        compact: Write compact JSON instead of indent=2 (JSON output)
+
+    Returns:
+        Path to the merged file
+    """
+    if not states:
+        raise ValueError("No animations to merge")
+
+    loaded = [(name, path, load_lottie(path)) for name, path in states]
+    fps = loaded[0][2]["fr"]
+    mismatched = [name for name, _, lottie in loaded if lottie["fr"] != fps]
+    if mismatched:
+        raise ValueError(f"Frame rate differs from {fps} fps: {', '.join(mismatched)}")
+
+    width = max(lottie["w"] for _, _, lottie in loaded)
+    height = max(lottie["h"] for _, _, lottie in loaded)
+
+    images: List[Tuple[str, EncodedFrame]] = []
+    by_digest: Dict[str, str] = {}
+    precomps, layers, markers = [], [], []
+    report = MergeReport(states=len(loaded))
+    start = 0
+
+    for name, path, lottie in loaded:
+        duration = lottie["op"] - lottie["ip"]
+        shift = start - lottie["ip"]
+        # Keep the feet planted: same bottom-center point on the larger canvas
+        dx, dy = (width - lottie["w"]) // 2, height - lottie["h"]
+
+        # Asset ids are prefixed with the state unless an earlier image is reused
+        ids = {}
+        pngs = _lottie_images(path, lottie)
+        for asset in lottie["assets"]:
+            if "layers" in asset:
+                ids[asset["id"]] = f"{name}_{asset['id']}"
+                continue
+            png = pngs[asset["id"]]
+            report.bytes_before += len(png)
+            with Image.open(io.BytesIO(png)) as img:
+                digest = _pixel_digest(np.asarray(img.convert('RGBA')))
+            if digest in by_digest:
+                ids[asset["id"]] = by_digest[digest]
+                report.shared += 1
+                continue
+            ids[asset["id"]] = by_digest[digest] = f"{name}_{asset['id']}"
+            images.append((ids[asset["id"]], EncodedFrame(
+                name=ids[asset["id"]], png=png, width=asset["w"], height=asset["h"]
+            )))
+            report.bytes_after += len(png)
+
+        for asset in lottie["assets"]:
+            if "layers" in asset:
+                precomps.append({
+                    **asset,
+                    "id": ids[asset["id"]],
+                    "layers": [_retarget_layer(layer, ids) for layer in asset["layers"]],
+                })
+
+        indices = {layer.get("ind"): len(layers) + n + 1 for n, layer in enumerate(lottie["layers"])}
+        for layer in lottie["layers"]:
+            moved = _retarget_layer(layer, ids)
+            moved["ind"] = indices[layer.get("ind")]
+            if "parent" in moved:
+                moved["parent"] = indices[moved["parent"]]
+            moved["ip"] += shift
+            moved["op"] += shift
+            moved["st"] = moved.get("st", 0) + shift
+            moved["ks"] = {**moved["ks"], "p": _offset_property(moved["ks"]["p"], dx, dy)}
+            layers.append(moved)
+
+        markers.append({"tm": start, "cm": name, "dr": duration})
+        for marker in lottie.get("markers", []):
+            markers.append({**marker, "tm": marker["tm"] + shift, "cm": f"{name}/{marker['cm']}"})
+        print(f"  [STATE] {name}: frames {start}-{start + duration} from {path.name}")
+        start += duration
+
+    report.images = len(images)
+    merged = {
+        "v": "5.7.4",
+        "fr": fps,
+        "ip": 0,
+        "op": start,
+        "w": width,
+        "h": height,
+        "nm": output_path.stem,
+        "ddd": 0,
+        "assets": [],
+        "layers": layers,
+        "markers": markers
+    }
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if output_path.suffix == DOTLOTTIE_SUFFIX:
+        write_dotlottie(merged, images, output_path, precomps)
+    else:
+        merged["assets"] = list(ordered_map(lambda image: _embedded_asset(*image), images)) + precomps
+        with open(output_path, 'w', encoding='utf-8') as f:
+            if compact:
+                json.dump(merged, f, separators=COMPACT_SEPARATORS)
+            else:
+                json.dump(merged, f, indent=2)
+
+    report.print_report()
+    file_size = output_path.stat().st_size
+    print(f"[OK] Merged {len(loaded)} animations: {output_path}")
+    print(f"[INFO] File size: {file_size:,} bytes ({file_size / 1024:.1f} KB)")
+    return output_path
+
+
+def parse_merge_inputs(values: Sequence[str]) -> List[Tuple[str, Path]]:
+    """
+    Parse merge inputs given as NAME=PATH or plain paths.
+
+    Plain paths are named after their file stem without the prefix shared by
+    all inputs (bennie_idle.json, bennie_happy.json -> idle, happy).
+    """
+    paths = [Path(value.split('=', 1)[1]) if '=' in value else Path(value) for value in values]
+    stems = [path.stem for path in paths]
+    prefix = os.path.commonprefix(stems) if len(stems) > 1 else ""
+    prefix = prefix[:prefix.rfind('_') + 1]
+
+    states = []
+    for value, path, stem in zip(values, paths, stems):
+        name = value.split('=', 1)[0] if '=' in value else stem[len(prefix):]
+        states.append((name, path))
+
+    names = [name for name, _ in states]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate state names: {', '.join(duplicates)}")
+    return states
+
+
+def _lottie_images(path: Path, lottie: dict) -> Dict[str, bytes]:
+    """PNG bytes of every image asset, embedded or stored in a .lottie container."""
+    assets = [asset for asset in lottie["assets"] if "p" in asset]
+    if path.suffix == DOTLOTTIE_SUFFIX:
+        with zipfile.ZipFile(path) as archive:
+            return {
+                asset["id"]: archive.read((asset.get("u", "") + asset["p"]).lstrip("/"))
+                for asset in assets
+            }
+    return {asset["id"]: base64.b64decode(asset["p"].split(",", 1)[1]) for asset in assets}
+
+
+def _retarget_layer(layer: dict, ids: Dict[str, str]) -> dict:
+    """Copy of a layer pointing at renamed asset ids."""
+    moved = dict(layer)
+    if "refId" in moved:
+        moved["refId"] = ids.get(moved["refId"], moved["refId"])
+    return moved
+
+
+def _offset_property(prop: dict, dx: float, dy: float) -> dict:
+    """Position property (static or keyframed) moved by (dx, dy)."""
+    def moved(value: List[float]) -> List[float]:
+        return [value[0] + dx, value[1] + dy] + list(value[2:])
+
+    if not prop["a"]:
+        return {**prop, "k": moved(prop["k"])}
+    return {**prop, "k": [{**key, "s": moved(key["s"])} if "s" in key else key for key in prop["k"]]}
+
+
+# =============================================================================
+# BATCH CACHE
+# =============================================================================
+
+# Bump whenever the Lottie produced for identical inputs and settings changes,
+# so batch caches built by older versions are invalidated.
+PROCESSOR_VERSION = "5"
 
-    Returns:
-        Path to the created Lottie JSON file
+# Manifest stored in each batch output directory (not *.json so directory
+# scans for Lottie files never pick it up)
+BATCH_CACHE_FILE = ".spritesheet_cache"
 
-    Example:
-        >>> process_ludo_asset(
-        ...     Path("character_walk.zip"),
-        ...     Path("character_walk.json"),
-        ...     fps=24,
-        ...     frame_hold=3
-        ... )
-    """
-    print("=" * 60)
-    print("SPRITE SHEET PROCESSOR - Ludo.ai to Lottie")
-    print("=" * 60)
-    print(f"Input: {input_path}")
-    print(f"Output: {output_path}")
-    print()
 
-    # Determine working directory for temp files
-    work_dir = output_path.parent / f".{output_path.stem}_temp"
-    frames_dir = output_path.parent / f"{output_path.stem}_frames"
+def load_batch_cache(output_dir: Path) -> Dict[str, Any]:
+    """Load the batch cache manifest for an output directory."""
+    cache_path = output_dir / BATCH_CACHE_FILE
+    if cache_path.exists():
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if "entries" in data:
+                return data
+        except json.JSONDecodeError:
+            print(f"[WARN] Ignoring corrupt batch cache: {cache_path}")
+    return {"version": PROCESSOR_VERSION, "entries": {}}
+
+
+def save_batch_cache(output_dir: Path, cache: Dict[str, Any]) -> None:
+    """Save the batch cache manifest (written atomically via a temp file)."""
+    cache_path = output_dir / BATCH_CACHE_FILE
+    tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, cache_path)
+
+
+def batch_cache_params(
+    fps: int,
+    frame_hold: int,
+    grid: Optional[Tuple[int, int]],
+    lottie_options: Optional[LottieOptions],
+    layout: str = "grid",
+    scales: Optional[Sequence[float]] = None
+) -> Dict[str, Any]:
+    """All settings that affect the produced Lottie, in JSON-stable form."""
+    return {
+        "fps": fps,
+        "frame_hold": frame_hold,
+        "grid": list(grid) if grid else None,
+        "layout": layout,
+        "scales": sorted(scales) if scales else None,
+        "lottie_options": asdict(lottie_options or LottieOptions()),
+    }
 
-    try:
-        # Step 1: Get sprite sheet path
-        if input_path.suffix.lower() == '.zip':
-            spritesheet_path = extract_zip(input_path, work_dir)
-        elif input_path.suffix.lower() == '.png':
-            spritesheet_path = input_path
-        else:
-            raise ValueError(f"Unsupported input format: {input_path.suffix}")
 
-        # Step 2: Detect grid if not provided
-        with Image.open(spritesheet_path) as img:
-            if grid is None:
-                grid = detect_grid(img)
-            else:
-                print(f"[INFO] Using provided grid: {grid[0]}x{grid[1]}")
+def batch_cache_key(zip_path: Path, params: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Compute the cache key for one input.
 
-        # Step 3: Extract frames
-        frames = extract_frames(spritesheet_path, grid, frames_dir)
+    The key covers the ZIP's content hash, every processing parameter and
+    PROCESSOR_VERSION, so renaming/touching a ZIP never triggers work but
+    any change to its bytes or the settings does.
 
-        if not frames:
-            raise ValueError("No valid frames extracted from sprite sheet")
+    Returns:
+        Tuple of (cache key, input SHA-256)
+    """
+    digest = hashlib.sha256()
+    with open(zip_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    input_hash = digest.hexdigest()
+
+    key_source = json.dumps(
+        {"input": input_hash, "params": params, "version": PROCESSOR_VERSION},
+        sort_keys=True,
+    )
+    return hashlib.sha256(key_source.encode('utf-8')).hexdigest(), input_hash
 
-        # Step 4: Create Lottie
-        result = create_lottie(frames, output_path, fps, frame_hold)
 
-        print()
-        print("=" * 60)
-        print("[DONE] Processing complete!")
-        print(f"  Lottie file: {result}")
-        if keep_frames:
-            print(f"  Frames directory: {frames_dir}")
-        print("=" * 60)
+def record_batch_cache_entry(
+    cache: Dict[str, Any],
+    zip_path: Path,
+    output_path: Path,
+    key: str,
+    input_hash: str,
+    params: Dict[str, Any]
+) -> None:
+    """Record a successfully processed input in the cache manifest."""
+    cache["version"] = PROCESSOR_VERSION
+    cache["entries"][zip_path.name] = {
+        "key": key,
+        "input": str(zip_path.resolve()),
+        "input_sha256": input_hash,
+        "output": output_path.name,
+        "output_size": output_path.stat().st_size if output_path.exists() else 0,
+        "params": params,
+        "version": PROCESSOR_VERSION,
+        "processed_at": datetime.now().isoformat(),
+    }
 
-        return result
 
-    finally:
-        # Cleanup temp files
-        if work_dir.exists():
-            import shutil
-            shutil.rmtree(work_dir, ignore_errors=True)
+def prune_batch_cache(output_dir: Path, cache: Dict[str, Any]) -> List[str]:
+    """
+    Drop entries whose input ZIP or output file no longer exists, or that
+    were written by a different PROCESSOR_VERSION.
 
-        # Cleanup frames unless keeping them
-        if not keep_frames and frames_dir.exists():
-            import shutil
-            shutil.rmtree(frames_dir, ignore_errors=True)
+    Returns:
+        Names of the removed entries
+    """
+    removed = []
+    for name, entry in list(cache["entries"].items()):
+        stale = (
+            entry.get("version") != PROCESSOR_VERSION
+            or not Path(entry.get("input", "")).exists()
+            or not (output_dir / entry.get("output", "")).exists()
+        )
+        if stale:
+            del cache["entries"][name]
+            removed.append(name)
+    return removed
+
+
+def show_batch_cache(output_dir: Path) -> None:
+    """Print the cache manifest of an output directory."""
+    cache = load_batch_cache(output_dir)
+    entries = cache["entries"]
+
+    print("=" * 60)
+    print(f"BATCH CACHE: {output_dir / BATCH_CACHE_FILE}")
+    print("=" * 60)
+    print(f"Processor version: {PROCESSOR_VERSION}")
+    print(f"Entries: {len(entries)}")
+    print()
+
+    for name in sorted(entries):
+        entry = entries[name]
+        params = entry.get("params", {})
+        grid = params.get("grid")
+        if entry.get("version") != PROCESSOR_VERSION:
+            state = "OUTDATED"
+        elif not Path(entry.get("input", "")).exists():
+            state = "INPUT MISSING"
+        elif not (output_dir / entry.get("output", "")).exists():
+            state = "OUTPUT MISSING"
+        else:
+            state = "OK"
+        print(f"  {name} -> {entry.get('output')} [{state}]")
+        print(f"      key {entry.get('key', '')[:12]}  input {entry.get('input_sha256', '')[:12]}  "
+              f"{params.get('fps')} fps, hold {params.get('frame_hold')}, "
+              f"grid {'x'.join(map(str, grid)) if grid else 'auto'}")
+        print(f"      {entry.get('output_size', 0):,} bytes, {entry.get('processed_at', '')[:19]}")
 
 
 # =============================================================================
@@ -661,11 +4337,24 @@ def batch_process(
     frame_hold: int = 2,
     grid: Optional[Tuple[int, int]] = None,
     keep_frames: bool = False,
-    force: bool = False
+    force: bool = False,
+    in_memory: bool = False,
+    jobs: int = 1,
+    log_dir: Optional[Path] = None,
+    lottie_options: Optional[LottieOptions] = None,
+    use_cache: bool = True,
+    layout: str = "grid",
+    scales: Optional[Sequence[float]] = None,
+    max_memory: Optional[int] = None,
+    job_log_level: str = "warn"
 ) -> int:
     """
     Batch process all ZIP files in a directory to Lottie animations.
 
+    A cache manifest in the output directory remembers the content hash and
+    settings each output was built from; only inputs whose key changed are
+    reprocessed (see batch_cache_key).
+
     Args:
         input_dir: Directory containing ZIP files to process
         output_dir: Directory for output JSON files (default: same as input)
@@ -673,11 +4362,27 @@ def batch_process(
         frame_hold: Frames to hold each sprite (default 2)
         grid: Optional (rows, cols) tuple; auto-detected if None
         keep_frames: If True, keep extracted frames in subdirectories
-        force: If True, reprocess files even if output exists
+        force: If True, reprocess every file regardless of cache/output
+        in_memory: If True, process each ZIP without temp files
+        jobs: Number of worker processes (1 = sequential, 0 = one per CPU core)
+        log_dir: Optional directory for per-ZIP log files (parallel mode)
+        lottie_options: Optional LottieOptions applied to every ZIP
+        use_cache: If False, skip only when the output file already exists.
+                   An output directory without a cache manifest (e.g. from
+                   before the cache existed) is adopted: existing outputs
+                   are recorded for the current settings and skipped
+        layout: "grid" or "sprites" (see process_ludo_asset)
+        scales: Optional resolution variants per ZIP (see process_ludo_asset)
+        max_memory: Optional peak-memory ceiling per ZIP, i.e. per worker
+                    process (see process_ludo_asset)
+        job_log_level: Least severe per-ZIP messages to show (default "warn":
+                       only the progress table plus warnings and errors)
 
     Returns:
         Exit code (0 for success, 1 for errors)
     """
+    start = time.perf_counter()
+
     # Validate input directory
     if not input_dir.exists():
         print(f"[ERROR] Input directory not found: {input_dir}", file=sys.stderr)
@@ -700,6 +4405,9 @@ def batch_process(
         print(f"[WARN] No ZIP files found in: {input_dir}")
         return 0
 
+    # Output files are named after their ZIP, with the container's extension
+    suffix = (lottie_options or LottieOptions()).suffix
+
     print("=" * 60)
     print("BATCH SPRITE SHEET PROCESSOR")
     print("=" * 60)
@@ -711,46 +4419,64 @@ def batch_process(
     else:
         print("Grid: auto-detect")
     print(f"Force reprocess: {force}")
+    print(f"Cache: {'on' if use_cache else 'off'}")
+    if max_memory is not None:
+        try:
+            check_bounded_options(layout, scales, lottie_options)
+        except ValueError as e:
+            print(f"[ERROR] {e}", file=sys.stderr)
+            return 1
+        print(f"Memory ceiling: {format_bytes(max_memory)} per job")
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    if jobs > 1:
+        print(f"Parallel jobs: {jobs}")
     print()
     print(f"Processing {len(zip_files)} ZIP file(s)...")
     print()
 
+    cache = load_batch_cache(output_dir) if use_cache else None
+    seed = cache is not None and not (output_dir / BATCH_CACHE_FILE).exists()
+    params = batch_cache_params(fps, frame_hold, grid, lottie_options, layout, scales)
+    options = {
+        "fps": fps,
+        "frame_hold": frame_hold,
+        "grid": grid,
+        "keep_frames": keep_frames,
+        "in_memory": in_memory,
+        "lottie_options": lottie_options,
+        "layout": layout,
+        "scales": scales,
+        "max_memory": max_memory,
+    }
+
+    if jobs > 1:
+        results = _batch_process_parallel(
+            zip_files, output_dir, options, force, jobs, log_dir, cache, params, job_log_level, seed
+        )
+        return _print_batch_summary(results, time.perf_counter() - start)
+
     # Track results
-    processed = 0
-    skipped = 0
-    failed = 0
     results = []
 
     for i, zip_file in enumerate(zip_files, 1):
         # Generate output filename from input filename
-        output_name = zip_file.stem + ".json"
+        output_name = zip_file.stem + suffix
         output_path = output_dir / output_name
 
-        # Check if output already exists
-        if output_path.exists() and not force:
-            status = "SKIPPED (exists)"
-            skipped += 1
-            results.append((zip_file.name, output_name, status))
-            print(f"[{i}/{len(zip_files)}] {zip_file.name} -> {output_name} [{status}]")
+        # Check cache (or, without cache, whether output already exists)
+        skip, key, input_hash = _batch_skip_check(zip_file, output_path, force, cache, params, seed)
+        if skip:
+            results.append((zip_file.name, output_name, skip))
+            print(f"[{i}/{len(zip_files)}] {zip_file.name} -> {output_name} [{skip}]")
+            emit_progress("job", input=zip_file.name, output=output_name, status=skip, seconds=0.0)
             continue
 
-        # Process the file
-        try:
-            # Suppress verbose output during batch processing
-            # by redirecting stdout temporarily
-            process_ludo_asset(
-                input_path=zip_file,
-                output_path=output_path,
-                fps=fps,
-                frame_hold=frame_hold,
-                grid=grid,
-                keep_frames=keep_frames
-            )
-            status = "OK"
-            processed += 1
-        except Exception as e:
-            status = f"FAILED ({e})"
-            failed += 1
+        # Process the file; per-ZIP output is filtered down to job_log_level
+        status = _process_batch_job(zip_file, output_path, options, job_log_level)
+        if status == "OK" and cache is not None:
+            record_batch_cache_entry(cache, zip_file, output_path, key, input_hash, params)
+            save_batch_cache(output_dir, cache)
 
         results.append((zip_file.name, output_name, status))
 
@@ -760,9 +4486,219 @@ def batch_process(
         else:
             print(f"[{i}/{len(zip_files)}] {zip_file.name} -> {output_name} [{status}]")
 
-    # Print summary
+    return _print_batch_summary(results, time.perf_counter() - start)
+
+
+def batch_output_paths(output_path: Path, scales: Optional[Sequence[float]] = None) -> List[Path]:
+    """Every file a batch job writes: the Lottie plus, with scales, its variants and manifest."""
+    paths = [output_path]
+    if scales:
+        paths += [variant_path(output_path, scale) for scale in sorted(set(scales)) if scale != 1.0]
+        paths.append(output_path.with_name(output_path.stem + VARIANT_MANIFEST_SUFFIX))
+    return paths
+
+
+def _batch_skip_check(
+    zip_file: Path,
+    output_path: Path,
+    force: bool,
+    cache: Optional[Dict[str, Any]],
+    params: Dict[str, Any],
+    seed: bool = False
+) -> Tuple[Optional[str], str, str]:
+    """
+    Decide whether a ZIP can be skipped.
+
+    A job is only skipped when all of its outputs (including --scales
+    variants) exist. With seed (output directory has no cache manifest yet),
+    existing outputs are adopted: recorded in the cache for the current
+    settings and skipped, as before the cache existed, instead of all being
+    reprocessed once.
+
+    Returns:
+        Tuple of (skip status or None, cache key, input hash); key and hash
+        are empty strings when the cache is disabled
+    """
+    outputs_exist = all(path.exists() for path in batch_output_paths(output_path, params["scales"]))
+    if cache is None:
+        if outputs_exist and not force:
+            return "SKIPPED (exists)", "", ""
+        return None, "", ""
+
+    key, input_hash = batch_cache_key(zip_file, params)
+    entry = cache["entries"].get(zip_file.name)
+    if not force and entry and entry.get("key") == key and outputs_exist:
+        return "SKIPPED (cached)", key, input_hash
+    if not force and seed and entry is None and outputs_exist:
+        record_batch_cache_entry(cache, zip_file, output_path, key, input_hash, params)
+        save_batch_cache(output_path.parent, cache)
+        return "SKIPPED (exists)", key, input_hash
+    return None, key, input_hash
+
+
+def _process_batch_job(
+    zip_file: Path,
+    output_path: Path,
+    options: Dict[str, Any],
+    job_log_level: str
+) -> str:
+    """
+    Process one ZIP of a batch, showing only messages at job_log_level.
+
+    Stage events are tagged with the ZIP name and a "job" event closes the
+    run. Returns the status shown in the batch table.
+    """
+    start = time.perf_counter()
+    with progress_context(input=zip_file.name), log_level(job_log_level):
+        try:
+            process_ludo_asset(input_path=zip_file, output_path=output_path, **options)
+            status = "OK"
+        except Exception as e:
+            status = f"FAILED ({e})"
+        emit_progress("job", output=output_path.name, status=status,
+                      seconds=round(time.perf_counter() - start, 3))
+    return status
+
+
+def _run_batch_job(
+    zip_file: Path,
+    output_path: Path,
+    options: Dict[str, Any],
+    encode_workers: int = 1,
+    job_log_level: str = "warn",
+    progress: bool = False
+) -> Tuple[str, str, str]:
+    """
+    Process one ZIP inside a worker process with its output captured.
+
+    Args:
+        encode_workers: Frame encoding threads for this process (see
+                        set_encode_workers)
+        job_log_level: Least severe messages kept in the captured log; the
+                       log is for files and failure reports, not the
+                       terminal, so it keeps at least info
+        progress: Collect JSON progress events for the parent to write
+
+    Returns:
+        Tuple of (status, log, events) where log is everything the job
+        printed and events its JSON-lines progress ("" unless progress)
+    """
+    set_encode_workers(encode_workers)
+    capture_level = min(job_log_level, "info", key=LOG_LEVELS.index)
+    log = io.StringIO()
+    with capture_progress(progress) as events, \
+            contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        status = _process_batch_job(zip_file, output_path, options, capture_level)
+        if status != "OK":
+            print(f"[ERROR] {zip_file.name} {status}")
+    return status, log.getvalue(), events.getvalue()
+
+
+def _batch_process_parallel(
+    zip_files: List[Path],
+    output_dir: Path,
+    options: Dict[str, Any],
+    force: bool,
+    jobs: int,
+    log_dir: Optional[Path],
+    cache: Optional[Dict[str, Any]],
+    params: Dict[str, Any],
+    job_log_level: str = "warn",
+    seed: bool = False
+) -> List[Tuple[str, str, str]]:
+    """
+    Spread ZIPs across a process pool.
+
+    Progress lines are printed as jobs finish; the returned results keep the
+    input order so the summary table is stable between runs.
+    """
+    total = len(zip_files)
+    suffix = (options["lottie_options"] or LottieOptions()).suffix
+    results: List[Optional[Tuple[str, str, str]]] = [None] * total
+    logs: Dict[int, str] = {}
+    keys: Dict[int, Tuple[str, str]] = {}
+
+    if log_dir is not None:
+        log_dir.mkdir(parents=True, exist_ok=True)
+
+    # Share the cores between processes instead of giving each one a full pool
+    encode_workers = min(_encode_workers, max(1, (os.cpu_count() or 1) // jobs))
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {}
+        for index, zip_file in enumerate(zip_files):
+            output_name = zip_file.stem + suffix
+            output_path = output_dir / output_name
+
+            skip, key, input_hash = _batch_skip_check(zip_file, output_path, force, cache, params, seed)
+            if skip:
+                results[index] = (zip_file.name, output_name, skip)
+                print(f"[{index + 1}/{total}] {zip_file.name} -> {output_name} [{skip}]")
+                emit_progress("job", input=zip_file.name, output=output_name, status=skip, seconds=0.0)
+                continue
+
+            keys[index] = (key, input_hash)
+            future = pool.submit(
+                _run_batch_job, zip_file, output_path, options, encode_workers, job_log_level,
+                _progress_stream is not None
+            )
+            futures[future] = index
+
+        for future in as_completed(futures):
+            index = futures[future]
+            zip_file = zip_files[index]
+            output_name = zip_file.stem + suffix
+
+            try:
+                status, log, events = future.result()
+            except Exception as e:
+                # Worker died (e.g. killed or out of memory) before returning
+                status, log = f"FAILED ({e})", ""
+                events = ""
+                emit_progress("job", input=zip_file.name, output=output_name, status=status)
+
+            relay_progress(events)
+
+            results[index] = (zip_file.name, output_name, status)
+            logs[index] = log
+
+            if status == "OK" and cache is not None:
+                record_batch_cache_entry(
+                    cache, zip_file, output_dir / output_name, *keys[index], params
+                )
+                save_batch_cache(output_dir, cache)
+
+            if log_dir is not None:
+                (log_dir / f"{zip_file.stem}.log").write_text(log, encoding='utf-8')
+
+            print(f"[{index + 1}/{total}] {zip_file.name} -> {output_name} [{status}]")
+
+    # Without a log directory, surface the captured logs of failed jobs
+    if log_dir is None:
+        for index in sorted(logs):
+            if results[index][2] != "OK" and logs[index]:
+                print()
+                print(f"--- Log: {zip_files[index].name} ---")
+                print(logs[index].rstrip())
+    else:
+        print(f"[INFO] Per-job logs written to: {log_dir}")
+
+    return results
+
+
+def _print_batch_summary(results: List[Tuple[str, str, str]], seconds: float = 0.0) -> int:
+    """Print the per-file results table and totals; returns the exit code."""
+    processed = sum(1 for _, _, status in results if status == "OK")
+    skipped = sum(1 for _, _, status in results if status.startswith("SKIPPED"))
+    failed = len(results) - processed - skipped
+    emit_progress("batch", processed=processed, skipped=skipped, failed=failed,
+                  seconds=round(seconds, 3))
+
     print()
     print("=" * 60)
+    for zip_name, output_name, status in results:
+        print(f"  {zip_name} -> {output_name} [{status}]")
+    print("-" * 60)
     print(f"Summary: {processed} processed, {skipped} skipped, {failed} failed")
     print("=" * 60)
 
@@ -789,6 +4725,139 @@ def parse_grid(grid_str: str) -> Tuple[int, int]:
     return (rows, cols)
 
 
+def parse_scales(scales_str: str) -> List[float]:
+    """Parse a scale list like '0.667,0.5' into floats."""
+    try:
+        scales = [float(part) for part in scales_str.split(',') if part.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid scales: {scales_str}. Use format like '0.667,0.5'")
+    if not scales or any(not 0 < scale <= 1 for scale in scales):
+        raise argparse.ArgumentTypeError(f"Scales must be in (0, 1]: {scales_str}")
+    return scales
+
+
+# Suffixes accepted by --max-memory
+MEMORY_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+
+def parse_memory_size(size_str: str) -> int:
+    """Parse a memory size like '512M', '1.5G' or '800MB' into bytes."""
+    text = size_str.strip().upper().removesuffix('B')
+    unit = text[-1:] if text[-1:] in MEMORY_UNITS else ""
+    try:
+        size = int(float(text[:len(text) - len(unit)]) * MEMORY_UNITS[unit])
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid memory size: {size_str}. Use format like '512M'")
+    if size <= 0:
+        raise argparse.ArgumentTypeError(f"Memory size must be positive: {size_str}")
+    return size
+
+
+def add_lottie_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the LottieOptions flags shared by the process and batch commands."""
+    parser.add_argument(
+        '--dedupe',
+        action='store_true',
+        help='Share one asset between repeated frames and merge consecutive repeats'
+    )
+    parser.add_argument(
+        '--dedupe-tolerance',
+        type=float,
+        default=0.0,
+        help='Mean RGBA difference (0-255) per 16px tile still treated as a repeat (default: 0 = exact)'
+    )
+    parser.add_argument(
+        '--crop',
+        action='store_true',
+        help='Trim each frame to its visible pixels (placed via layer anchor)'
+    )
+    parser.add_argument(
+        '--crop-canvas',
+        action='store_true',
+        help='With --crop, also shrink the canvas to the union of all frame bounds'
+    )
+    parser.add_argument(
+        '--optimize',
+        action='store_true',
+        help='Try shared-palette PNGs and per-frame zlib settings; keep the smallest'
+    )
+    parser.add_argument(
+        '--max-error',
+        type=float,
+        default=32.0,
+        help='Largest per-channel pixel error (0-255) allowed by --optimize (default: 32)'
+    )
+    parser.add_argument(
+        '--compact',
+        action='store_true',
+        help='Stream compact JSON (no indentation, one frame in memory at a time)'
+    )
+    parser.add_argument(
+        '--loop-markers',
+        action='store_true',
+        help='Detect the seamless loop segment and write intro/loop/outro markers'
+    )
+    parser.add_argument(
+        '--trim-loop',
+        action='store_true',
+        help='Drop frames outside the detected loop (idle animations; implies --loop-markers)'
+    )
+    parser.add_argument(
+        '--decimate',
+        action='store_true',
+        help='Skip frames with little visible change and hold the previous frame longer'
+    )
+    parser.add_argument(
+        '--decimate-max-error',
+        type=float,
+        default=8.0,
+        help='Largest RMS difference (0-255) a skipped frame may have (default: 8)'
+    )
+    parser.add_argument(
+        '--duration-ms',
+        type=int,
+        default=None,
+        help='Fit the animation to this duration instead of frames x frame hold'
+    )
+    parser.add_argument(
+        '--delta',
+        action='store_true',
+        help='Embed one base image plus only the changed region of each frame'
+    )
+    parser.add_argument(
+        '--format',
+        choices=OUTPUT_FORMATS,
+        default='json',
+        help='Output container: json (base64 images) or dotlottie (.lottie zip)'
+    )
+    parser.add_argument(
+        '--atlas',
+        action='store_true',
+        help='Pack all frames into one atlas image stepped through by hold keyframes'
+    )
+
+
+def lottie_options_from_args(args: argparse.Namespace) -> LottieOptions:
+    """Build LottieOptions from parsed add_lottie_arguments() flags."""
+    return LottieOptions(
+        dedupe=args.dedupe or args.dedupe_tolerance > 0,
+        dedupe_tolerance=args.dedupe_tolerance,
+        crop=args.crop or args.crop_canvas,
+        crop_canvas=args.crop_canvas,
+        optimize=args.optimize,
+        optimize_max_error=args.max_error,
+        compact=args.compact,
+        loop_markers=args.loop_markers or args.trim_loop,
+        trim_loop=args.trim_loop,
+        decimate=args.decimate,
+        decimate_max_error=args.decimate_max_error,
+        target_duration_ms=args.duration_ms,
+        delta=args.delta,
+        output_format=args.format,
+        atlas=args.atlas,
+    )
+
+
 def main():
     """CLI entry point for sprite sheet processor."""
     parser = argparse.ArgumentParser(
@@ -805,18 +4874,73 @@ Examples:
   # Specify grid dimensions explicitly
   python spritesheet_processor.py process spritesheet.png --output animation.json --grid 6x6
 
+  # Irregularly packed sheet: find sprites by connected components
+  python spritesheet_processor.py process packed.png --output animation.json --layout sprites
+  python spritesheet_processor.py extract packed.png --output-dir frames/ --layout sprites
+
+  # Native plus 2/3 and 1/2 scale variants, listed in animation.variants.json
+  python spritesheet_processor.py process download.zip --output animation.json --in-memory --scales 0.667,0.5
+
+  # Idle loop: mark intro/loop/outro and drop frames outside the loop
+  python spritesheet_processor.py process idle.zip --output idle.json --trim-loop
+
+  # Fewer embedded frames, same 2s timeline (non-uniform holds)
+  python spritesheet_processor.py process idle.zip --output idle.json --decimate --duration-ms 2000
+
+  # Mostly-static animation: one base image plus changed regions per frame
+  python spritesheet_processor.py process idle.zip --output idle.json --delta --dedupe
+
+  # dotLottie containers (PNG entries instead of base64 JSON)
+  python spritesheet_processor.py batch ./downloads/ --output ./lottie/ --format dotlottie
+
+  # One atlas image per animation, stepped through by hold keyframes
+  python spritesheet_processor.py process walk.zip --output walk.json --atlas --crop --dedupe
+
+  # One file per character: each state becomes a named marker segment
+  python spritesheet_processor.py merge lottie/bennie_*.json --output bennie.json
+
   # Customize animation timing
   python spritesheet_processor.py process spritesheet.png --output animation.json --fps 24 --frame-hold 3
 
   # Keep extracted frames for inspection
   python spritesheet_processor.py process spritesheet.png --output animation.json --keep-frames
 
+  # Skip temp extraction and frame files entirely
+  python spritesheet_processor.py process download.zip --output animation.json --in-memory
+
+  # Encode frames serially (default: one thread per core, up to 8)
+  python spritesheet_processor.py process download.zip --output animation.json --threads 1
+
+  # Very large sheets: decode one band of cell rows at a time under a memory ceiling
+  python spritesheet_processor.py process sheet_8k.zip --output animation.json --max-memory 256M
+  python spritesheet_processor.py batch ludo/downloads/ --output ludo/output/ --jobs 4 --max-memory 512M
+
+  # Share assets between repeated (or near-identical) frames
+  python spritesheet_processor.py process download.zip --output animation.json --dedupe-tolerance 1.5
+
+  # Smallest PNG per frame (shared palette when within the error bound)
+  python spritesheet_processor.py process download.zip --output animation.json --optimize --max-error 24
+
   # Batch process all ZIPs in a directory
   python spritesheet_processor.py batch ludo/downloads/ --output ../BennieGame/Resources/Lottie/
 
   # Batch with force reprocessing
   python spritesheet_processor.py batch ludo/downloads/ --output ludo/output/ --force
 
+  # Inspect or prune the batch cache (reprocessing is keyed on ZIP content + settings)
+  python spritesheet_processor.py cache show ludo/output/
+  python spritesheet_processor.py cache prune ludo/output/
+
+  # Batch across 4 worker processes, one log file per ZIP
+  python spritesheet_processor.py batch ludo/downloads/ --output ludo/output/ --jobs 4 --log-dir ludo/logs/
+
+  # Log levels: per-frame lines only at debug; batch shows per-ZIP output at --log-level info
+  python spritesheet_processor.py process download.zip --output animation.json --log-level debug
+  python spritesheet_processor.py batch ludo/downloads/ --output ludo/output/ --log-level info
+
+  # JSON-lines progress on stdout (one event per stage/job, human log on stderr)
+  python spritesheet_processor.py batch ludo/downloads/ --output ludo/output/ --progress json
+
 Grid Format:
   Use ROWSxCOLUMNS format, e.g.:
     --grid 4x4    (4 rows, 4 columns = 16 frames)
@@ -856,6 +4980,12 @@ Frame Hold:
         default=None,
         help='Grid dimensions as ROWSxCOLUMNS (e.g., "6x6"). Auto-detected if not specified.'
     )
+    process_parser.add_argument(
+        '--layout',
+        choices=LAYOUTS,
+        default='grid',
+        help='Frame layout: uniform grid (default) or irregularly packed sprites'
+    )
     process_parser.add_argument(
         '--fps',
         type=int,
@@ -873,6 +5003,32 @@ Frame Hold:
         action='store_true',
         help='Keep extracted frames in a subdirectory'
     )
+    process_parser.add_argument(
+        '--in-memory',
+        action='store_true',
+        help='Decode and encode frames in memory (no temp files)'
+    )
+    process_parser.add_argument(
+        '--scales',
+        type=parse_scales,
+        default=None,
+        help='Also write downscaled variants plus a manifest, e.g. "0.667,0.5"'
+    )
+    process_parser.add_argument(
+        '--threads',
+        type=int,
+        default=0,
+        help=f'Frame encoding threads (default: 0 = {DEFAULT_ENCODE_WORKERS}, 1 = serial)'
+    )
+    process_parser.add_argument(
+        '--max-memory',
+        type=parse_memory_size,
+        default=None,
+        help='Decode-memory ceiling, e.g. 512M: decode the sheet one band of cell rows at a time '
+             '(grid layout; not with --scales, --atlas, --optimize, --delta or --dedupe-tolerance)'
+    )
+    add_lottie_arguments(process_parser)
+    add_output_arguments(process_parser)
 
     # Extract command (just extract frames, no Lottie)
     extract_parser = subparsers.add_parser(
@@ -896,6 +5052,25 @@ Frame Hold:
         default=None,
         help='Grid dimensions as ROWSxCOLUMNS (auto-detected if not specified)'
     )
+    extract_parser.add_argument(
+        '--layout',
+        choices=LAYOUTS,
+        default='grid',
+        help='Frame layout: uniform grid (default) or irregularly packed sprites'
+    )
+    extract_parser.add_argument(
+        '--threads',
+        type=int,
+        default=0,
+        help=f'Frame encoding threads (default: 0 = {DEFAULT_ENCODE_WORKERS}, 1 = serial)'
+    )
+    extract_parser.add_argument(
+        '--max-memory',
+        type=parse_memory_size,
+        default=None,
+        help='Decode-memory ceiling, e.g. 512M: decode the sheet one band of cell rows at a time'
+    )
+    add_output_arguments(extract_parser)
 
     # Detect command (just detect grid, for debugging)
     detect_parser = subparsers.add_parser(
@@ -930,6 +5105,12 @@ Frame Hold:
         default=None,
         help='Grid dimensions as ROWSxCOLUMNS (auto-detected if not specified)'
     )
+    batch_parser.add_argument(
+        '--layout',
+        choices=LAYOUTS,
+        default='grid',
+        help='Frame layout: uniform grid (default) or irregularly packed sprites'
+    )
     batch_parser.add_argument(
         '--fps',
         type=int,
@@ -952,6 +5133,86 @@ Frame Hold:
         action='store_true',
         help='Reprocess files even if output already exists'
     )
+    batch_parser.add_argument(
+        '--in-memory',
+        action='store_true',
+        help='Decode and encode frames in memory (no temp files)'
+    )
+    batch_parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=1,
+        help='Worker processes (default: 1 = sequential, 0 = one per CPU core)'
+    )
+    batch_parser.add_argument(
+        '--threads',
+        type=int,
+        default=0,
+        help=f'Frame encoding threads (default: 0 = {DEFAULT_ENCODE_WORKERS}, 1 = serial); split across --jobs workers'
+    )
+    batch_parser.add_argument(
+        '--max-memory',
+        type=parse_memory_size,
+        default=None,
+        help='Decode-memory ceiling per job, e.g. 512M (banded decoding, see process)'
+    )
+    batch_parser.add_argument(
+        '--log-dir',
+        type=Path,
+        default=None,
+        help='Write each job\'s captured log to this directory (parallel mode)'
+    )
+    batch_parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Ignore the cache manifest; skip only when the output file exists'
+    )
+    batch_parser.add_argument(
+        '--scales',
+        type=parse_scales,
+        default=None,
+        help='Also write downscaled variants plus a manifest, e.g. "0.667,0.5"'
+    )
+    add_lottie_arguments(batch_parser)
+    add_output_arguments(batch_parser, default_level='warn')
+
+    # Cache command (inspect or prune a batch output directory's cache)
+    cache_parser = subparsers.add_parser(
+        'cache',
+        help='Inspect or prune the batch cache of an output directory'
+    )
+    cache_parser.add_argument(
+        'action',
+        choices=['show', 'prune', 'clear'],
+        help='show entries, prune stale ones, or clear all'
+    )
+    cache_parser.add_argument(
+        'output_dir',
+        type=Path,
+        help='Batch output directory containing the cache manifest'
+    )
+
+    # Merge command (one character's states into one Lottie with markers)
+    merge_parser = subparsers.add_parser(
+        'merge',
+        help='Merge a character\'s animations into one Lottie with a marker per state'
+    )
+    merge_parser.add_argument(
+        'inputs',
+        nargs='+',
+        help='Lottie files (.json/.lottie) in timeline order, optionally as NAME=PATH'
+    )
+    merge_parser.add_argument(
+        '--output', '-o',
+        type=Path,
+        required=True,
+        help='Merged file (.json, or .lottie for a dotLottie container)'
+    )
+    merge_parser.add_argument(
+        '--compact',
+        action='store_true',
+        help='Write compact JSON (no indentation)'
+    )
 
     args = parser.parse_args()
 
@@ -959,85 +5220,146 @@ Frame Hold:
         parser.print_help()
         return 1
 
-    try:
-        if args.command == 'process':
-            # Parse grid if provided
-            grid = parse_grid(args.grid) if args.grid else None
-
-            process_ludo_asset(
-                input_path=args.input,
-                output_path=args.output,
-                fps=args.fps,
-                frame_hold=args.frame_hold,
-                grid=grid,
-                keep_frames=args.keep_frames
-            )
-
-        elif args.command == 'extract':
-            # Parse grid if provided
-            grid = parse_grid(args.grid) if args.grid else None
-
-            # Handle ZIP input
-            if args.input.suffix.lower() == '.zip':
-                work_dir = args.output_dir / '.temp_extract'
-                spritesheet_path = extract_zip(args.input, work_dir)
-            else:
-                spritesheet_path = args.input
-                work_dir = None
+    if getattr(args, 'threads', 0):
+        set_encode_workers(args.threads)
 
-            # Detect grid if not provided
-            with Image.open(spritesheet_path) as img:
-                if grid is None:
-                    grid = detect_grid(img)
+    # Batch keeps its own progress table at info; --log-level filters per-ZIP output
+    level = 'info' if args.command == 'batch' else getattr(args, 'log_level', 'info')
+    with output_mode(level, getattr(args, 'progress', 'text')):
+        try:
+            if args.command == 'process':
+                # Parse grid if provided
+                grid = parse_grid(args.grid) if args.grid else None
+
+                start = time.perf_counter()
+                result = process_ludo_asset(
+                    input_path=args.input,
+                    output_path=args.output,
+                    fps=args.fps,
+                    frame_hold=args.frame_hold,
+                    grid=grid,
+                    keep_frames=args.keep_frames,
+                    in_memory=args.in_memory,
+                    lottie_options=lottie_options_from_args(args),
+                    layout=args.layout,
+                    scales=args.scales,
+                    max_memory=args.max_memory
+                )
+                emit_progress("job", input=args.input.name, output=result.name, status="OK",
+                              seconds=round(time.perf_counter() - start, 3))
+
+            elif args.command == 'extract':
+                # Parse grid if provided
+                grid = parse_grid(args.grid) if args.grid else None
+
+                if args.max_memory is not None:
+                    if args.layout != 'grid':
+                        raise ValueError("--max-memory needs the grid layout")
+                    # Banded: read straight from the PNG or ZIP, never decoding it whole
+                    if grid is None:
+                        grid = analyze_grid_banded(args.input, MemoryReport(args.max_memory)).grid
+                    extract_frames(args.input, grid, args.output_dir, args.max_memory)
+                    return 0
+
+                # Handle ZIP input
+                if args.input.suffix.lower() == '.zip':
+                    work_dir = args.output_dir / '.temp_extract'
+                    spritesheet_path = extract_zip(args.input, work_dir)
+                else:
+                    spritesheet_path = args.input
+                    work_dir = None
 
-            # Extract frames
-            extract_frames(spritesheet_path, grid, args.output_dir)
-
-            # Cleanup temp
-            if work_dir and work_dir.exists():
-                import shutil
-                shutil.rmtree(work_dir, ignore_errors=True)
-
-        elif args.command == 'detect':
-            if not args.input.exists():
-                print(f"[ERROR] File not found: {args.input}", file=sys.stderr)
-                return 1
-
-            with Image.open(args.input) as img:
-                rows, cols = detect_grid(img)
-                width, height = img.size
-
-            print()
-            print("Detected Grid Information:")
-            print(f"  Image size: {width}x{height}")
-            print(f"  Grid: {rows} rows x {cols} columns")
-            print(f"  Frame size: {width // cols}x{height // rows}")
-            print(f"  Total frames: {rows * cols}")
-
-        elif args.command == 'batch':
-            return batch_process(
-                input_dir=args.input_dir,
-                output_dir=args.output,
-                fps=args.fps,
-                frame_hold=args.frame_hold,
-                grid=parse_grid(args.grid) if args.grid else None,
-                keep_frames=args.keep_frames,
-                force=args.force
-            )
+                if args.layout == 'sprites':
+                    # Locate sprites; source rectangles go to sprites.json
+                    extract_sprites(spritesheet_path, args.output_dir)
+                else:
+                    # Detect grid if not provided
+                    with Image.open(spritesheet_path) as img:
+                        if grid is None:
+                            grid = detect_grid(img)
+
+                    # Extract frames
+                    extract_frames(spritesheet_path, grid, args.output_dir)
+
+                # Cleanup temp
+                if work_dir and work_dir.exists():
+                    import shutil
+                    shutil.rmtree(work_dir, ignore_errors=True)
+
+            elif args.command == 'detect':
+                if not args.input.exists():
+                    print(f"[ERROR] File not found: {args.input}", file=sys.stderr)
+                    return 1
+
+                with Image.open(args.input) as img:
+                    detection = analyze_grid(img)
+                    width, height = img.size
+                rows, cols = detection.grid
+
+                print()
+                print("Detected Grid Information:")
+                print(f"  Image size: {width}x{height}")
+                print(f"  Method: {detection.method}")
+                if detection.confidence is not None:
+                    print(f"  Periodicity confidence: {detection.confidence:.2f}")
+                print(f"  Grid: {rows} rows x {cols} columns")
+                print(f"  Frame size: {width // cols}x{height // rows}")
+                print(f"  Total frames: {rows * cols}")
+                for label, gaps in (("Column", detection.col_gaps), ("Row", detection.row_gaps)):
+                    for gap in gaps:
+                        print(f"  {label} gap {gap.start}-{gap.end}: confidence {gap.confidence:.2f}")
+
+            elif args.command == 'batch':
+                return batch_process(
+                    input_dir=args.input_dir,
+                    output_dir=args.output,
+                    fps=args.fps,
+                    frame_hold=args.frame_hold,
+                    grid=parse_grid(args.grid) if args.grid else None,
+                    keep_frames=args.keep_frames,
+                    force=args.force,
+                    in_memory=args.in_memory,
+                    jobs=args.jobs,
+                    log_dir=args.log_dir,
+                    lottie_options=lottie_options_from_args(args),
+                    use_cache=not args.no_cache,
+                    layout=args.layout,
+                    scales=args.scales,
+                    max_memory=args.max_memory,
+                    job_log_level=args.log_level
+                )
+
+            elif args.command == 'merge':
+                merge_lottie_animations(parse_merge_inputs(args.inputs), args.output, args.compact)
+
+            elif args.command == 'cache':
+                if args.action == 'show':
+                    show_batch_cache(args.output_dir)
+                elif args.action == 'prune':
+                    cache = load_batch_cache(args.output_dir)
+                    removed = prune_batch_cache(args.output_dir, cache)
+                    save_batch_cache(args.output_dir, cache)
+                    for name in removed:
+                        print(f"  [PRUNED] {name}")
+                    print(f"[OK] Pruned {len(removed)} stale entr{'y' if len(removed) == 1 else 'ies'}, "
+                          f"{len(cache['entries'])} remaining")
+                else:
+                    save_batch_cache(args.output_dir, {"version": PROCESSOR_VERSION, "entries": {}})
+                    print(f"[OK] Cleared batch cache in: {args.output_dir}")
 
-        return 0
+            return 0
 
-    except FileNotFoundError as e:
-        print(f"[ERROR] File not found: {e}", file=sys.stderr)
-        return 1
-    except ValueError as e:
-        print(f"[ERROR] {e}", file=sys.stderr)
-        return 1
-    except Exception as e:
-        print(f"[ERROR] Unexpected error: {e}", file=sys.stderr)
-        import traceback
-        traceback.print_exc()
-        return 1
+        except FileNotFoundError as e:
+            print(f"[ERROR] File not found: {e}", file=sys.stderr)
+            return 1
+        except ValueError as e:
+            print(f"[ERROR] {e}", file=sys.stderr)
+            return 1
+        except Exception as e:
+            print(f"[ERROR] Unexpected error: {e}", file=sys.stderr)
+            import traceback
+            traceback.print_exc()
+            return 1
 
 
 if __name__ == "__main__":
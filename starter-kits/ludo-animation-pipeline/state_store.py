@@ -0,0 +1,531 @@
+#!/usr/bin/env python3
+"""
+Pipeline State Store
+====================
+
+SQLite-backed state shared by process.py and pipeline.py:
+
+- processed ZIPs (what process.py has already converted and deployed)
+- animation status per character/animation
+- PipelineJob phases (one row per character/emotion)
+
+The database runs in WAL mode, so readers never block the writer and
+several workers (process.py --watch, parallel pipeline runs) can update it
+at once. Every change is a single-row upsert in its own transaction instead
+of rewriting a whole JSON file.
+
+animation_status.json and pipeline_state.json remain the exchange format.
+Opening the store merges in either file whose content changed since it was
+last imported or exported (a new database, a failed earlier import, or a
+version pulled from git); process.py exports animation_status.json at the
+end of every run. Both can also be imported or exported at any time.
+
+Usage:
+    python state_store.py show                 # Row counts and recent jobs
+    python state_store.py import               # JSON files -> database
+    python state_store.py export               # Database -> JSON files
+    python state_store.py export --status-file status.json --pipeline-file jobs.json
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+SCRIPT_DIR = Path(__file__).parent.resolve()
+STATE_DB = SCRIPT_DIR / "pipeline_state.db"
+
+# Legacy JSON files (import/export)
+STATUS_JSON = SCRIPT_DIR / "animation_status.json"
+PIPELINE_JSON = SCRIPT_DIR / "pipeline_state.json"
+
+SCHEMA_VERSION = 1
+
+# Seconds to wait for another writer's transaction before giving up
+BUSY_TIMEOUT = 30.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS processed_zips (
+    zip_name     TEXT PRIMARY KEY,
+    character    TEXT,
+    animation    TEXT,
+    output       TEXT,
+    processed_at TEXT,
+    size_bytes   INTEGER,
+    qa_passed    INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_processed_animation ON processed_zips (character, animation);
+CREATE INDEX IF NOT EXISTS idx_processed_at ON processed_zips (processed_at);
+
+CREATE TABLE IF NOT EXISTS animations (
+    character   TEXT NOT NULL,
+    animation   TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    lottie_file TEXT,
+    frames      INTEGER,
+    updated_at  TEXT,
+    PRIMARY KEY (character, animation)
+);
+CREATE INDEX IF NOT EXISTS idx_animations_status ON animations (status);
+
+CREATE TABLE IF NOT EXISTS pipeline_jobs (
+    character      TEXT NOT NULL,
+    emotion        TEXT NOT NULL,
+    phase          TEXT NOT NULL,
+    keyframe_start TEXT,
+    keyframe_end   TEXT,
+    motion_hint    TEXT,
+    download_path  TEXT,
+    lottie_output  TEXT,
+    started_at     TEXT,
+    completed_at   TEXT,
+    error          TEXT,
+    updated_at     TEXT,
+    PRIMARY KEY (character, emotion)
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_phase ON pipeline_jobs (phase);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+PROCESSED_FIELDS = ("character", "animation", "output", "processed_at", "size_bytes", "qa_passed")
+JOB_FIELDS = (
+    "character", "emotion", "phase", "keyframe_start", "keyframe_end", "motion_hint",
+    "download_path", "lottie_output", "started_at", "completed_at", "error",
+)
+
+
+# =============================================================================
+# STATE STORE
+# =============================================================================
+
+class StateStore:
+    """
+    Transactional pipeline state in one SQLite database.
+
+    Each process opens its own StateStore; SQLite serializes writers and
+    WAL mode lets readers continue while a write is in progress. The dict
+    views (load_status, load_pipeline_state) have the same shape as the
+    legacy JSON files.
+    """
+
+    def __init__(self, path: Path = STATE_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Autocommit mode: transactions are opened explicitly in transaction()
+        self.conn = sqlite3.connect(
+            self.path, timeout=BUSY_TIMEOUT, isolation_level=None
+        )
+        self.conn.row_factory = sqlite3.Row
+        try:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self._migrate()
+            self._import_changed_json()
+        except BaseException:
+            self.conn.close()
+            raise
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "StateStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _migrate(self) -> None:
+        """Create the schema (idempotent) and record its version."""
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise ValueError(
+                f"{self.path} has schema version {version}, this script knows {SCHEMA_VERSION}"
+            )
+        if version < SCHEMA_VERSION:
+            self.conn.executescript(SCHEMA)
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run statements as one atomic write.
+
+        BEGIN IMMEDIATE takes the write lock up front, so concurrent writers
+        wait (up to BUSY_TIMEOUT) instead of failing halfway through.
+        """
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def _touch(self, conn: sqlite3.Connection, key: str) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            (key, datetime.now().isoformat()),
+        )
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def _import_changed_json(self) -> None:
+        """
+        Import the JSON files whose content differs from the last sync.
+
+        The digest of each file is stored in meta by the same transaction
+        that imports or exports it, so an import that failed is retried on
+        the next open and a file changed outside the store (e.g. by a git
+        pull) is merged in once.
+        """
+        changed = [
+            path if self.get_meta(_digest_key(path)) != _file_digest(path) else None
+            for path in (STATUS_JSON, PIPELINE_JSON)
+        ]
+        if any(changed):
+            self.import_json(*changed)
+
+    # -------------------------------------------------------------------------
+    # Processed ZIPs and animation status (process.py)
+    # -------------------------------------------------------------------------
+
+    def record_processed(
+        self,
+        zip_name: str,
+        entry: Dict[str, Any],
+        frames: Optional[int] = None
+    ) -> None:
+        """
+        Mark a ZIP as processed and its animation as complete, atomically.
+
+        Args:
+            zip_name: ZIP file name (e.g. bennie_waving.zip)
+            entry: process.py "processed" entry (character, animation, output, ...)
+            frames: Frame count for the animation row (skipped if the entry
+                    has no character/animation)
+        """
+        with self.transaction() as conn:
+            self._upsert_processed(conn, zip_name, entry)
+            if entry.get("character") and entry.get("animation"):
+                self._upsert_animation(conn, entry["character"], entry["animation"], {
+                    "status": "complete",
+                    "lottie_file": entry.get("output"),
+                    "frames": frames or 0,
+                })
+            self._touch(conn, "status_updated")
+
+    def _upsert_processed(self, conn: sqlite3.Connection, zip_name: str, entry: Dict[str, Any]) -> None:
+        values = [entry.get(name) for name in PROCESSED_FIELDS]
+        qa_index = PROCESSED_FIELDS.index("qa_passed")
+        if values[qa_index] is not None:
+            values[qa_index] = int(bool(values[qa_index]))
+        conn.execute(
+            f"INSERT OR REPLACE INTO processed_zips (zip_name, {', '.join(PROCESSED_FIELDS)}) "
+            f"VALUES (?, {', '.join('?' * len(PROCESSED_FIELDS))})",
+            [zip_name, *values],
+        )
+
+    def _upsert_animation(
+        self,
+        conn: sqlite3.Connection,
+        character: str,
+        animation: str,
+        info: Dict[str, Any]
+    ) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO animations "
+            "(character, animation, status, lottie_file, frames, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (character, animation, info.get("status", "complete"), info.get("lottie_file"),
+             info.get("frames"), datetime.now().isoformat()),
+        )
+
+    def is_processed(self, zip_name: str) -> bool:
+        row = self.conn.execute(
+            "SELECT 1 FROM processed_zips WHERE zip_name = ?", (zip_name,)
+        ).fetchone()
+        return row is not None
+
+    def processed(self) -> Dict[str, Dict[str, Any]]:
+        """All processed ZIPs as {zip_name: entry}, oldest first."""
+        rows = self.conn.execute(
+            "SELECT * FROM processed_zips ORDER BY processed_at, zip_name"
+        ).fetchall()
+        result = {}
+        for row in rows:
+            entry = {name: row[name] for name in PROCESSED_FIELDS}
+            if entry["qa_passed"] is not None:
+                entry["qa_passed"] = bool(entry["qa_passed"])
+            result[row["zip_name"]] = entry
+        return result
+
+    def animations(self, status: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Animation rows as {"<character>_<animation>": info}, optionally by status."""
+        query = "SELECT * FROM animations"
+        params: tuple = ()
+        if status is not None:
+            query += " WHERE status = ?"
+            params = (status,)
+        rows = self.conn.execute(query + " ORDER BY character, animation", params).fetchall()
+        return {
+            f"{row['character']}_{row['animation']}": {
+                "status": row["status"],
+                "lottie_file": row["lottie_file"],
+                "frames": row["frames"],
+            }
+            for row in rows
+        }
+
+    def clear_processed(self) -> None:
+        """Forget processed ZIPs (animations keep their status) so all are reprocessed."""
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM processed_zips")
+            self._touch(conn, "status_updated")
+
+    def load_status(self) -> Dict[str, Any]:
+        """Status in the animation_status.json shape."""
+        return {
+            "processed": self.processed(),
+            "animations": self.animations(),
+            "last_updated": self.get_meta("status_updated"),
+        }
+
+    def save_status(self, status: Dict[str, Any]) -> None:
+        """Upsert every entry of an animation_status.json-shaped dict in one transaction."""
+        with self.transaction() as conn:
+            for zip_name, entry in status.get("processed", {}).items():
+                self._upsert_processed(conn, zip_name, entry)
+            for key, info in status.get("animations", {}).items():
+                character, _, animation = key.partition("_")
+                self._upsert_animation(conn, character, animation, info)
+            self._touch(conn, "status_updated")
+
+    # -------------------------------------------------------------------------
+    # Pipeline jobs (pipeline.py)
+    # -------------------------------------------------------------------------
+
+    def save_job(self, job: Dict[str, Any]) -> None:
+        """Insert or update one job (PipelineJob.to_dict()), keyed by character/emotion."""
+        with self.transaction() as conn:
+            self._upsert_job(conn, job)
+            self._touch(conn, "pipeline_run")
+
+    def _upsert_job(self, conn: sqlite3.Connection, job: Dict[str, Any]) -> None:
+        conn.execute(
+            f"INSERT OR REPLACE INTO pipeline_jobs ({', '.join(JOB_FIELDS)}, updated_at) "
+            f"VALUES ({', '.join('?' * len(JOB_FIELDS))}, ?)",
+            [*(job.get(name) for name in JOB_FIELDS), datetime.now().isoformat()],
+        )
+
+    def save_pipeline_state(self, state: Dict[str, Any]) -> None:
+        """Upsert every job of a pipeline_state.json-shaped dict in one transaction."""
+        with self.transaction() as conn:
+            for job in state.get("jobs", []):
+                self._upsert_job(conn, job)
+            self._touch(conn, "pipeline_run")
+
+    def get_job(self, character: str, emotion: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute(
+            "SELECT * FROM pipeline_jobs WHERE character = ? AND emotion = ?",
+            (character, emotion),
+        ).fetchone()
+        return {name: row[name] for name in JOB_FIELDS} if row else None
+
+    def jobs(self, phase: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Jobs in the order they were last updated, optionally only one phase."""
+        query = "SELECT * FROM pipeline_jobs"
+        params: tuple = ()
+        if phase is not None:
+            query += " WHERE phase = ?"
+            params = (phase,)
+        rows = self.conn.execute(query + " ORDER BY updated_at", params).fetchall()
+        return [{name: row[name] for name in JOB_FIELDS} for row in rows]
+
+    def load_pipeline_state(self) -> Dict[str, Any]:
+        """Jobs in the pipeline_state.json shape."""
+        return {"jobs": self.jobs(), "last_run": self.get_meta("pipeline_run")}
+
+    # -------------------------------------------------------------------------
+    # JSON import / export
+    # -------------------------------------------------------------------------
+
+    def import_json(
+        self,
+        status_file: Optional[Path] = STATUS_JSON,
+        pipeline_file: Optional[Path] = PIPELINE_JSON
+    ) -> Dict[str, int]:
+        """
+        Merge the legacy JSON files into the database (missing files are skipped).
+
+        Rows are upserted (rows from the files win), so importing twice is
+        harmless. Timestamps from the files are kept, and each file's digest
+        is recorded (see _import_changed_json).
+
+        Returns:
+            Number of imported rows per table
+        """
+        counts = {"processed_zips": 0, "animations": 0, "pipeline_jobs": 0}
+        status, status_digest = _read_json(status_file)
+        pipeline, pipeline_digest = _read_json(pipeline_file)
+
+        with self.transaction() as conn:
+            for zip_name, entry in status.get("processed", {}).items():
+                self._upsert_processed(conn, zip_name, entry)
+                counts["processed_zips"] += 1
+            for key, info in status.get("animations", {}).items():
+                character, _, animation = key.partition("_")
+                self._upsert_animation(conn, character, animation, info)
+                counts["animations"] += 1
+            for job in pipeline.get("jobs", []):
+                self._upsert_job(conn, job)
+                counts["pipeline_jobs"] += 1
+
+            for key, value in (("status_updated", status.get("last_updated")),
+                               ("pipeline_run", pipeline.get("last_run")),
+                               (_digest_key(status_file), status_digest),
+                               (_digest_key(pipeline_file), pipeline_digest)):
+                if value:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+                    )
+        return counts
+
+    def export_json(
+        self,
+        status_file: Optional[Path] = STATUS_JSON,
+        pipeline_file: Optional[Path] = PIPELINE_JSON
+    ) -> None:
+        """
+        Write the database back out as animation_status.json / pipeline_state.json.
+
+        Pass None to skip a file. The written files' digests are recorded,
+        so they are not imported again on the next open.
+        """
+        # One read transaction so both files come from the same snapshot
+        self.conn.execute("BEGIN")
+        try:
+            status = self.load_status()
+            pipeline = self.load_pipeline_state()
+        finally:
+            self.conn.execute("COMMIT")
+
+        digests = {}
+        if status_file is not None:
+            digests[_digest_key(status_file)] = _write_json(status_file, status)
+        if pipeline_file is not None:
+            digests[_digest_key(pipeline_file)] = _write_json(pipeline_file, pipeline)
+
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", digests.items()
+            )
+
+
+def _digest_key(path: Optional[Path]) -> Optional[str]:
+    """meta key holding the digest of a JSON file at its last import/export."""
+    return f"json_digest:{Path(path).name}" if path is not None else None
+
+
+def _file_digest(path: Optional[Path]) -> Optional[str]:
+    """SHA-256 of a file's bytes, or None if there is no file."""
+    if path is None or not Path(path).exists():
+        return None
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def _read_json(path: Optional[Path]) -> Tuple[Dict[str, Any], Optional[str]]:
+    """Parse a JSON file; returns (data, digest of its bytes), ({}, None) if missing."""
+    if path is None or not Path(path).exists():
+        return {}, None
+    raw = Path(path).read_bytes()
+    try:
+        return json.loads(raw.decode('utf-8')), hashlib.sha256(raw).hexdigest()
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Cannot import {path}: {e}")
+
+
+def _write_json(path: Path, data: Dict[str, Any]) -> str:
+    """
+    Write JSON via a temp file so readers never see a half-written file.
+
+    Returns:
+        SHA-256 of the bytes written
+    """
+    raw = json.dumps(data, indent=2, default=str).encode('utf-8')
+    tmp_path = Path(path).with_suffix(".tmp")
+    tmp_path.write_bytes(raw)
+    tmp_path.replace(path)
+    return hashlib.sha256(raw).hexdigest()
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def show_store(store: StateStore) -> None:
+    """Print row counts per table and the most recent jobs."""
+    print(f"Database: {store.path}")
+    print(f"  Processed ZIPs: {len(store.processed())}")
+    print(f"  Complete animations: {len(store.animations(status='complete'))}")
+    jobs = store.jobs()
+    print(f"  Pipeline jobs: {len(jobs)}")
+    for job in jobs[-5:]:
+        print(f"    {job['character']}_{job['emotion']}: {job['phase']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="SQLite state store for process.py and pipeline.py",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python state_store.py show
+  python state_store.py import    # merge animation_status.json + pipeline_state.json
+  python state_store.py export    # write them back from the database
+        """
+    )
+    parser.add_argument('action', choices=['show', 'import', 'export'])
+    parser.add_argument('--db', type=Path, default=STATE_DB,
+                        help=f'Database file (default: {STATE_DB.name})')
+    parser.add_argument('--status-file', type=Path, default=STATUS_JSON,
+                        help=f'process.py status JSON (default: {STATUS_JSON.name})')
+    parser.add_argument('--pipeline-file', type=Path, default=PIPELINE_JSON,
+                        help=f'pipeline.py state JSON (default: {PIPELINE_JSON.name})')
+
+    args = parser.parse_args()
+
+    try:
+        with StateStore(args.db) as store:
+            if args.action == 'show':
+                show_store(store)
+            elif args.action == 'import':
+                counts = store.import_json(args.status_file, args.pipeline_file)
+                print(f"[OK] Imported {counts['processed_zips']} processed ZIP(s), "
+                      f"{counts['animations']} animation(s), {counts['pipeline_jobs']} job(s)")
+            else:
+                store.export_json(args.status_file, args.pipeline_file)
+                print(f"[OK] Exported to {args.status_file} and {args.pipeline_file}")
+    except (ValueError, sqlite3.Error) as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,9 +7,11 @@ Automated quality checks for Lottie animations:
 - Dimension consistency
 - Duration reasonableness
 - Asset/layer integrity
+- dotLottie (.lottie) container integrity
 
 Usage:
     python validate_lottie.py animation.json
+    python validate_lottie.py animation.lottie
     python validate_lottie.py --all BennieGame/Resources/Lottie/
 """
 
@@ -17,11 +19,15 @@ import argparse
 import base64
 import json
 import sys
+import zipfile
 from io import BytesIO
 from pathlib import Path
 
 from PIL import Image
 
+# dotLottie containers: zip with manifest.json, animations/<id>.json, images/...
+DOTLOTTIE_SUFFIX = '.lottie'
+
 
 class ValidationResult:
     def __init__(self, name: str):
@@ -67,7 +73,7 @@ class ValidationResult:
 
 def validate_lottie(lottie_path: Path) -> ValidationResult:
     """
-    Validate a Lottie animation file.
+    Validate a Lottie animation file (.json, or a .lottie container).
 
     Returns ValidationResult with errors/warnings.
     """
@@ -78,6 +84,9 @@ def validate_lottie(lottie_path: Path) -> ValidationResult:
         result.error(f"File not found: {lottie_path}")
         return result
 
+    if lottie_path.suffix == DOTLOTTIE_SUFFIX:
+        return validate_dotlottie(lottie_path, result)
+
     # Load JSON
     try:
         with open(lottie_path, 'r') as f:
@@ -86,10 +95,117 @@ def validate_lottie(lottie_path: Path) -> ValidationResult:
         result.error(f"Invalid JSON: {e}")
         return result
 
+    check_lottie_data(data, result)
+    return result
+
+
+def validate_dotlottie(lottie_path: Path, result: ValidationResult = None) -> ValidationResult:
+    """
+    Validate a dotLottie (.lottie) container.
+
+    Checks the zip itself (CRC of every entry), manifest.json, that every
+    animation listed in the manifest exists, and that every external image
+    asset resolves to an entry; entries nothing references are flagged.
+    Each animation then gets the same checks as a .json Lottie file.
+
+    Returns ValidationResult with errors/warnings.
+    """
+    result = result or ValidationResult(lottie_path.name)
+
+    try:
+        archive = zipfile.ZipFile(lottie_path)
+    except zipfile.BadZipFile as e:
+        result.error(f"Not a valid zip container: {e}")
+        return result
+
+    with archive:
+        corrupt = archive.testzip()
+        if corrupt:
+            result.error(f"Corrupt container entry: {corrupt}")
+            return result
+
+        names = {name for name in archive.namelist() if not name.endswith('/')}
+        if 'manifest.json' not in names:
+            result.error("Missing manifest.json - not a valid dotLottie file")
+            return result
+
+        try:
+            manifest = json.loads(archive.read('manifest.json'))
+        except json.JSONDecodeError as e:
+            result.error(f"Invalid manifest.json: {e}")
+            return result
+
+        animations = manifest.get('animations', [])
+        result.add_info(f"Container: {len(names)} entries, {len(animations)} animation(s)")
+        if not animations:
+            result.error("Manifest lists no animations")
+            return result
+
+        referenced = {'manifest.json'}
+        for entry in animations:
+            animation_path = f"animations/{entry.get('id', '')}.json"
+            if animation_path not in names:
+                result.error(f"Manifest animation missing from container: {animation_path}")
+                continue
+            referenced.add(animation_path)
+
+            try:
+                data = json.loads(archive.read(animation_path))
+            except json.JSONDecodeError as e:
+                result.error(f"{animation_path}: Invalid JSON: {e}")
+                continue
+
+            # External image assets point at entries via their "u" + "p" path
+            images = {}
+            for asset in data.get('assets', []):
+                if 'p' not in asset or asset.get('e', 0) != 0:
+                    continue
+                image_path = (asset.get('u', '') + asset['p']).lstrip('/')
+                if image_path not in names:
+                    result.error(f"Asset {asset.get('id', 'unknown')}: missing image entry {image_path}")
+                    continue
+                referenced.add(image_path)
+                images[asset.get('id')] = archive.read(image_path)
+
+            check_lottie_data(data, result, images)
+
+        unused = sorted(names - referenced)
+        if unused:
+            result.warn(f"{len(unused)} unreferenced container entries (e.g. {unused[0]})")
+
+    return result
+
+
+# Markers written by --loop-markers; anything else names a state segment
+LOOP_MARKER_NAMES = ('intro', 'loop', 'outro')
+
+
+def state_segments(data: dict) -> list[dict]:
+    """
+    State segment markers of a merged animation (spritesheet_processor.py merge).
+
+    Merged files hold one segment per state, each with its own frame count
+    and possibly frame size; loop markers of the inputs are nested as
+    "<state>/<name>" and are not segments.
+    """
+    return [
+        m for m in data.get('markers', [])
+        if isinstance(m.get('cm'), str) and '/' not in m['cm']
+        and m['cm'] not in LOOP_MARKER_NAMES
+    ]
+
+
+def check_lottie_data(data: dict, result: ValidationResult, images: dict = None) -> None:
+    """
+    Run the Lottie structure checks on parsed animation JSON.
+
+    images maps asset ids to the bytes of external image files (dotLottie
+    entries); embedded base64 assets are decoded directly.
+    """
     # Basic Lottie structure checks
     if 'v' not in data:
         result.error("Missing 'v' (version) field - not a valid Lottie file")
-        return result
+        return
 
     result.add_info(f"Lottie version: {data.get('v', 'unknown')}")
 
@@ -105,8 +221,19 @@ def validate_lottie(lottie_path: Path) -> ValidationResult:
     result.add_info(f"Frame rate: {fr} fps")
     result.add_info(f"Duration: {duration:.2f} seconds")
 
-    # Duration checks
-    if duration < 0.5:
+    # Duration checks (per state for merged animations)
+    segments = state_segments(data)
+    if segments:
+        result.add_info(f"State segments: {len(segments)} ({', '.join(m['cm'] for m in segments)})")
+        for marker in segments:
+            start, length = marker.get('tm', 0), marker.get('dr', 0)
+            if start < ip or start + length > op:
+                result.error(f"Segment '{marker['cm']}' ({start}-{start + length}) "
+                             f"is outside the frame range {ip}-{op}")
+            seconds = length / fr if fr > 0 else 0
+            if seconds < 0.5:
+                result.warn(f"Segment '{marker['cm']}' is very short ({seconds:.2f}s) - may look choppy")
+    elif duration < 0.5:
         result.warn(f"Very short duration ({duration:.2f}s) - may look choppy")
     elif duration > 10:
         result.warn(f"Long duration ({duration:.2f}s) - may be slow to load")
@@ -129,20 +256,31 @@ def validate_lottie(lottie_path: Path) -> ValidationResult:
     # Validate each image asset
     frame_sizes = []
     for i, asset in enumerate(assets):
+        img_data = None
         if 'p' in asset and asset.get('e', 0) == 1:
             # Embedded image
             data_uri = asset['p']
             if data_uri.startswith('data:image/png;base64,'):
-                try:
-                    b64_data = data_uri.split(',', 1)[1]
-                    img_data = base64.b64decode(b64_data)
-                    img = Image.open(BytesIO(img_data))
-                    frame_sizes.append(img.size)
-                except Exception as e:
-                    result.error(f"Asset {i} ({asset.get('id', 'unknown')}): Invalid image data - {e}")
-
-    # Check frame size consistency
-    if frame_sizes:
+                img_data = data_uri.split(',', 1)[1]
+        elif images and asset.get('id') in images:
+            # External image file (dotLottie entry)
+            img_data = images[asset['id']]
+
+        if img_data is not None:
+            try:
+                if isinstance(img_data, str):
+                    img_data = base64.b64decode(img_data)
+                img = Image.open(BytesIO(img_data))
+                frame_sizes.append(img.size)
+            except Exception as e:
+                result.error(f"Asset {i} ({asset.get('id', 'unknown')}): Invalid image data - {e}")
+
+    # Check frame size consistency; merged states are sized and counted
+    # independently, so only single animations are checked
+    if frame_sizes and segments:
+        result.add_info(f"Images across all states: {len(frame_sizes)} "
+                        f"({len(set(frame_sizes))} distinct sizes)")
+    elif frame_sizes:
         unique_sizes = set(frame_sizes)
         if len(unique_sizes) > 1:
             result.warn(f"Inconsistent frame sizes: {unique_sizes}")
@@ -150,8 +288,12 @@ def validate_lottie(lottie_path: Path) -> ValidationResult:
             result.add_info(f"Frame dimensions: {frame_sizes[0][0]}x{frame_sizes[0][1]}")
 
         # Check expected frame count (Ludo.ai typically generates 42 frames)
+        # Atlas animations (one image stepped through by a precomp) are exempt
         expected_frames = [42, 36, 24, 12, 8]  # Common frame counts
-        if len(frame_sizes) not in expected_frames:
+        precomps = [a for a in assets if 'layers' in a]
+        if precomps and len(frame_sizes) == 1:
+            result.add_info("Single atlas image shown through a precomp")
+        elif len(frame_sizes) not in expected_frames:
             result.warn(f"Unusual frame count ({len(frame_sizes)}) - expected one of {expected_frames}")
 
     # Check layers
@@ -161,11 +303,13 @@ def validate_lottie(lottie_path: Path) -> ValidationResult:
     if len(layers) == 0:
         result.error("No layers found - animation is empty")
 
-    # Check for sequence layer (animated sprite)
+    # Check for sequence layer (animated sprite), including image layers
+    # inside precompositions
     has_sequence = False
-    for layer in layers:
-        if layer.get('ty') == 2:  # Image layer
-            has_sequence = True
+    all_layers = layers + [l for a in assets for l in a.get('layers', [])]
+    for layer in all_layers:
+        if layer.get('ty') in (0, 2):  # Precomp or image layer
+            has_sequence = has_sequence or layer.get('ty') == 2
             # Check if it references assets
             ref_id = layer.get('refId', '')
             if not any(a.get('id') == ref_id for a in assets):
@@ -174,16 +318,17 @@ def validate_lottie(lottie_path: Path) -> ValidationResult:
     if not has_sequence and assets:
         result.warn("Has assets but no image layers - frames may not animate")
 
-    return result
-
 
 def validate_directory(dir_path: Path) -> list[ValidationResult]:
     """Validate all Lottie files in a directory."""
     results = []
-    lottie_files = list(dir_path.glob('*.json'))
+    # Resolution variant manifests (spritesheet_processor.py --scales) aren't Lottie
+    lottie_files = [f for f in dir_path.glob('*.json') if not f.name.endswith('.variants.json')]
+
+    lottie_files += list(dir_path.glob(f'*{DOTLOTTIE_SUFFIX}'))
 
     if not lottie_files:
-        print(f"No .json files found in {dir_path}")
+        print(f"No .json or {DOTLOTTIE_SUFFIX} files found in {dir_path}")
         return results
 
     for lottie_file in sorted(lottie_files):
@@ -196,9 +341,9 @@ def main():
     parser = argparse.ArgumentParser(
         description='Validate Lottie animation files'
     )
-    parser.add_argument('input', help='Input Lottie JSON file or directory')
+    parser.add_argument('input', help='Input Lottie JSON / .lottie file or directory')
     parser.add_argument('--all', '-a', action='store_true',
-                        help='Validate all .json files in directory')
+                        help='Validate all .json and .lottie files in directory')
 
     args = parser.parse_args()
 